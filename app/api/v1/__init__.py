@@ -3,6 +3,8 @@ from fastapi import APIRouter
 from .activity import activity_router
 from .auth import auth_router
 from .journal import journal_router
+from .metrics import metrics_router
+from .report import report_router
 
 v1_router = APIRouter(prefix="/v1")
 
@@ -15,3 +17,5 @@ def welcome():
 v1_router.include_router(auth_router)
 v1_router.include_router(activity_router)
 v1_router.include_router(journal_router)
+v1_router.include_router(metrics_router)
+v1_router.include_router(report_router)
@@ -1,3 +1,4 @@
+from datetime import date as Date
 from typing import List
 from uuid import UUID
 
@@ -7,7 +8,9 @@ from app.constants.roles import UserRole
 from app.core.schema import AppResponse
 from app.dependencies.activity import validate_activity
 from app.dependencies.auth import CurrentUser, ValidateRole
+from app.dependencies.conditional import activity_types_version, conditional_get, user_activities_version
 from app.dependencies.db_session import DbSession
+from app.dependencies.idempotency import Idempotent
 from app.domain.activity import (
     ActivityBase,
     ActivityTypeBase,
@@ -17,17 +20,26 @@ from app.domain.activity import (
 from app.domain.activity_task import ActivityTaskBase
 from app.domain.worklog import WorklogBase
 from app.dto.activity import (
+    AutosaveDto,
+    AutosaveStatus,
     CreateActivityDto,
     CreateActivityTaskDto,
     CreateUserActivityDto,
+    SetWorklogCellDto,
     TaskBatchDto,
+    WorklogCell,
 )
 from app.services.activity import ActivityService
+from app.services.autosave import AutosaveService
 
 activity_router = APIRouter(prefix="/activity", tags=["Activities"])
 
 
-@activity_router.get("/types", response_model=AppResponse[List[ActivityTypeBase]])
+@activity_router.get(
+    "/types",
+    dependencies=[Depends(conditional_get(activity_types_version))],
+    response_model=AppResponse[List[ActivityTypeBase]],
+)
 async def get_all(session: DbSession) -> AppResponse[List[ActivityTypeBase]]:
     """Get all activity types for tracking"""
     activity_service = ActivityService(session)
@@ -48,11 +60,15 @@ async def get_all_activities(session: DbSession) -> AppResponse[List[ActivityBas
 @activity_router.post(
     "/", dependencies=[Depends(ValidateRole(UserRole.ADMIN))], response_model=AppResponse[ActivityBase]
 )
-async def add_activity(session: DbSession, data: CreateActivityDto) -> AppResponse[ActivityBase]:
+async def add_activity(
+    session: DbSession, data: CreateActivityDto, idempotency: Idempotent
+) -> AppResponse[ActivityBase]:
     """Create an activity"""
     activity_service = ActivityService(session)
     result = await activity_service.create_activity(data)
-    return AppResponse(data=result)
+    response = AppResponse(data=result)
+    await idempotency.save(response)
+    return response
 
 
 @activity_router.post(
@@ -60,14 +76,22 @@ async def add_activity(session: DbSession, data: CreateActivityDto) -> AppRespon
     dependencies=[Depends(ValidateRole(UserRole.ADMIN))],
     response_model=AppResponse[ActivityUserBase],
 )
-async def assign_user_activity_item(session: DbSession, data: CreateUserActivityDto) -> AppResponse[ActivityUserBase]:
+async def assign_user_activity_item(
+    session: DbSession, data: CreateUserActivityDto, idempotency: Idempotent
+) -> AppResponse[ActivityUserBase]:
     """Assign a specific employee to an activity, so the employee can track their time spent on it"""
     activity_service = ActivityService(session)
     result = await activity_service.assign_user_to_activity_item(data)
-    return AppResponse(data=result)
+    response = AppResponse(data=result)
+    await idempotency.save(response)
+    return response
 
 
-@activity_router.get("/employee", response_model=AppResponse[List[ActivityWithType]])
+@activity_router.get(
+    "/employee",
+    dependencies=[Depends(conditional_get(user_activities_version))],
+    response_model=AppResponse[List[ActivityWithType]],
+)
 async def get_user_activities(session: DbSession, user: CurrentUser) -> AppResponse[List[ActivityWithType]]:
     """Get all activities performed by the current employee"""
     activity_service = ActivityService(session)
@@ -93,14 +117,16 @@ async def get_activity_tasks(session: DbSession, user: CurrentUser) -> AppRespon
     response_model=AppResponse[ActivityTaskBase],
 )
 async def add_activity_task(
-    session: DbSession, user: CurrentUser, data: CreateActivityTaskDto, activity_id: UUID
+    session: DbSession, user: CurrentUser, data: CreateActivityTaskDto, activity_id: UUID, idempotency: Idempotent
 ) -> AppResponse[ActivityTaskBase]:
     """Add a task to a given activity for the currently logged-in employee"""
     data.activity_id = activity_id
     await validate_activity(session, user, activity_id)
     activity_service = ActivityService(session)
     result = await activity_service.add_activity_task(data, user.id)
-    return AppResponse(data=result)
+    response = AppResponse(data=result)
+    await idempotency.save(response)
+    return response
 
 
 @activity_router.post(
@@ -108,8 +134,46 @@ async def add_activity_task(
     dependencies=[Depends(ValidateRole(UserRole.USER))],
     response_model=AppResponse[List[WorklogBase]],
 )
-async def worklog_batch(session: DbSession, user: CurrentUser, data: TaskBatchDto) -> AppResponse[List[WorklogBase]]:
-    """Add/update/delete worklog batch for multiple activities, core endpoint for employee tracking their hours"""
+async def worklog_batch(
+    session: DbSession, user: CurrentUser, data: TaskBatchDto, idempotency: Idempotent
+) -> AppResponse[List[WorklogBase]]:
+    """
+    Add/update/delete worklog batch for multiple activities, core endpoint for employee tracking their hours.
+    Send an `Idempotency-Key` header to safely retry a batch, retries receive the response of the first request.
+    """
     activity_service = ActivityService(session)
     worklogs = await activity_service.batch_worklog(data, user.id)
-    return AppResponse(data=worklogs)
+    response = AppResponse(data=worklogs)
+    await idempotency.save(response)
+    return response
+
+
+@activity_router.patch(
+    "/task/{task_id}/worklog/{date}",
+    dependencies=[Depends(ValidateRole(UserRole.USER))],
+    response_model=AppResponse[WorklogCell],
+)
+async def set_worklog_cell(
+    session: DbSession, user: CurrentUser, task_id: UUID, date: Date, data: SetWorklogCellDto
+) -> AppResponse[WorklogCell]:
+    """
+    Set the hours of one task for one day (a journal cell) of the currently logged-in employee, a null duration
+    clears the cell. Returns the cell along with the new total of the day, exceeding the daily limit is rejected.
+    """
+    activity_service = ActivityService(session)
+    result = await activity_service.set_worklog_cell(task_id, date, data, user.id)
+    return AppResponse(data=result)
+
+
+@activity_router.post(
+    "/autosave", dependencies=[Depends(ValidateRole(UserRole.USER))], response_model=AppResponse[AutosaveStatus]
+)
+async def autosave(session: DbSession, user: CurrentUser, data: AutosaveDto) -> AppResponse[AutosaveStatus]:
+    """
+    Autosave journal cell edits, edits are buffered and written to the database in bulk shortly after the
+    employee stops editing. A null duration clears the cell. The journal already reflects buffered edits,
+    edits rejected when written (e.g. exceeding the daily limit) are reported by the next autosave.
+    """
+    autosave_service = AutosaveService(session)
+    result = await autosave_service.save_cells(data, user.id)
+    return AppResponse(data=result)
@@ -7,6 +7,7 @@ from app.core.exceptions import NotFoundException
 from app.core.schema import AppResponse
 from app.core.security.jwt import JwtManager
 from app.dependencies.auth import CurrentUser, RtCookie
+from app.dependencies.conditional import conditional_get, current_user_version
 from app.dependencies.db_session import DbSession
 from app.domain.user import UserWithoutPassword
 from app.dto.auth import LoginUserDto, RegisterUserDto, UserSession
@@ -49,7 +50,11 @@ async def register_user(body: RegisterUserDto, session: DbSession) -> AppRespons
         raise HTTPException(status_code=500, detail="Something went wrong") from e
 
 
-@auth_router.get("/me", response_model=AppResponse[UserWithoutPassword])
+@auth_router.get(
+    "/me",
+    dependencies=[Depends(conditional_get(current_user_version))],
+    response_model=AppResponse[UserWithoutPassword],
+)
 async def get_user(user: CurrentUser) -> AppResponse[UserWithoutPassword]:
     """Get the current user information"""
     return AppResponse(data=user)
@@ -1,22 +1,67 @@
+from typing import List
+
 from fastapi import APIRouter, Depends, Query
 
 from app.constants.roles import UserRole
 from app.core.schema import AppResponse
 from app.dependencies.auth import CurrentUser, ValidateRole
+from app.dependencies.conditional import conditional_get, journal_version
 from app.dependencies.db_session import DbSession
-from app.dto.journal import GetJournalDto
+from app.domain.worklog import WorklogDailyTotalBase
+from app.dto.journal import GetJournalDto, GetTeamJournalDto, JournalFormat
 from app.services.journal import JournalService
 
 journal_router = APIRouter(prefix="/journal", tags=["Journal"])
 
 
-@journal_router.get("/", dependencies=[Depends(ValidateRole(UserRole.USER))])
+@journal_router.get("/", dependencies=[Depends(ValidateRole(UserRole.USER)), Depends(conditional_get(journal_version))])
 async def get_journal(session: DbSession, user: CurrentUser, query: GetJournalDto = Query(...)):
     """
     Represents the matrix the employee will see in an excel-sheet style for a given monthly period, this
     is still experimental, so response should include necessary data for the employee to perform their
     intended operation. Response model are yet to be fully determined.
+
+    With `since` (the watermark of a previous response), only the tasks and worklogs changed or deleted after
+    it are returned, along with a new watermark. A watermark older than 30 days is rejected with 410.
+
+    With `format=matrix`, the period dates are sent once and each task carries `durations` and `ids` arrays
+    parallel to them (null for empty days), along with per-task, per-day and period totals.
+
+    The full journal is sent with an `ETag`, send it back as `If-None-Match` to get `304 Not Modified`
+    while the journal is unchanged.
+    """
+    journal_service = JournalService(session)
+    if query.since:
+        result = await journal_service.get_journal_delta(query, user.id)
+    elif query.format == JournalFormat.MATRIX:
+        result = await journal_service.get_journal_matrix(query, user.id)
+    else:
+        result = await journal_service.get_journal(query, user.id)
+    return AppResponse(data=result)
+
+
+@journal_router.get("/team", dependencies=[Depends(ValidateRole(UserRole.ADMIN))])
+async def get_team_journal(session: DbSession, query: GetTeamJournalDto = Query(...)):
     """
+    The journals of a team for a given period in one matrix: the employees assigned to `activityId` (their
+    tasks of that activity only), or the employees given as `userIds` (all of their tasks). The period dates are
+    sent once, each employee carries their tasks with `durations` arrays parallel to them (null for empty days)
+    and their totals per day, along with the team totals per day. Admin Only
+    """
+    journal_service = JournalService(session)
+    result = await journal_service.get_team_journal(query)
+    return AppResponse(data=result)
+
+
+@journal_router.get(
+    "/totals",
+    dependencies=[Depends(ValidateRole(UserRole.USER))],
+    response_model=AppResponse[List[WorklogDailyTotalBase]],
+)
+async def get_daily_totals(
+    session: DbSession, user: CurrentUser, query: GetJournalDto = Query(...)
+) -> AppResponse[List[WorklogDailyTotalBase]]:
+    """Hours logged by the current employee per day for a given period, days without hours are omitted"""
     journal_service = JournalService(session)
-    result = await journal_service.get_journal(query, user.id)
+    result = await journal_service.get_daily_totals(query, user.id)
     return AppResponse(data=result)
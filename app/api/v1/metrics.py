@@ -0,0 +1,21 @@
+from typing import Dict
+
+from fastapi import APIRouter, Depends
+
+from app.constants.roles import UserRole
+from app.core.metrics import metrics
+from app.core.schema import AppResponse
+from app.dependencies.auth import ValidateRole
+
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@metrics_router.get(
+    "/", dependencies=[Depends(ValidateRole(UserRole.ADMIN))], response_model=AppResponse[Dict[str, int]]
+)
+async def get_metrics() -> AppResponse[Dict[str, int]]:
+    """
+    Counters of the application since the worker started, e.g. `upsert.worklogs.touched` and
+    `upsert.worklogs.unchanged` count the rows written by upserts and the ones skipped as already up to date.
+    """
+    return AppResponse(data=metrics.snapshot())
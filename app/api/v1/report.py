@@ -0,0 +1,50 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.constants.roles import UserRole
+from app.core.schema import AppResponse
+from app.dependencies.auth import ValidateRole
+from app.dependencies.db_session import DbSession
+from app.dto.report import ActivityHoursRow, ExportWorklogsDto, GetActivityHoursDto
+from app.services.export import ExportService
+from app.services.report import ReportService
+
+report_router = APIRouter(prefix="/report", tags=["Reports"])
+
+
+@report_router.get(
+    "/activity-hours",
+    dependencies=[Depends(ValidateRole(UserRole.ADMIN))],
+    response_model=AppResponse[List[ActivityHoursRow]],
+)
+async def get_activity_hours(
+    session: DbSession, query: GetActivityHoursDto = Query(...)
+) -> AppResponse[List[ActivityHoursRow]]:
+    """
+    Hours logged by all employees per month, e.g. for billing. Each month has rows per activity and employee,
+    per activity, per activity type, per employee and a total, told apart by `level`. Admin Only
+    """
+    report_service = ReportService(session)
+    result = await report_service.get_activity_hours(query)
+    return AppResponse(data=result)
+
+
+@report_router.get(
+    "/worklogs/export", dependencies=[Depends(ValidateRole(UserRole.ADMIN))], response_class=StreamingResponse
+)
+async def export_worklogs(session: DbSession, query: ExportWorklogsDto = Query(...)) -> StreamingResponse:
+    """
+    Every worklog of a period (e.g. a month for payroll) with the employee, activity and task names, as a CSV
+    file (`gzip=true` to compress it) or with `format=xlsx` as a spreadsheet. The file is streamed while it is
+    read from the database, exports of any size are sent without being held in memory. Admin Only
+    """
+    export_service = ExportService(session)
+    content = await export_service.export_worklogs(query)
+    filename = export_service.export_filename(query)
+    return StreamingResponse(
+        content,
+        media_type=export_service.export_media_type(query),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,6 +1,24 @@
-from .base import Base
+from .base import Base, UUIDPrimaryKey
+from .ids import uuid7
+from .locks import advisory_xact_lock
 from .mixin import BaseModelDatabaseMixin
 from .session import SessionManager, session_manager
+from .timeouts import statement_timeout
+from .types import Tenths, TenthsTotal
+from .unit_of_work import UnitOfWork
 from .url import DATABASE_URL
 
-__all__ = [SessionManager, session_manager, DATABASE_URL, Base, BaseModelDatabaseMixin]
+__all__ = [
+    SessionManager,
+    session_manager,
+    DATABASE_URL,
+    Base,
+    BaseModelDatabaseMixin,
+    UnitOfWork,
+    advisory_xact_lock,
+    statement_timeout,
+    Tenths,
+    TenthsTotal,
+    UUIDPrimaryKey,
+    uuid7,
+]
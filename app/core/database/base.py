@@ -1,18 +1,26 @@
 from datetime import datetime
-from typing import Any, Callable, Dict, Literal, Optional, Self, Union, override
+from typing import Any, Callable, ClassVar, Dict, Literal, Optional, Self, Union, override
+from uuid import UUID
 
 from asyncpg.exceptions import ForeignKeyViolationError, UniqueViolationError
 from pydantic import BaseModel
 from sqlalchemy import (
     Column,
+    CompoundSelect,
     DateTime,
+    ScalarSelect,
     Select,
+    and_,
     delete,
     func,
     insert,
+    literal,
     select,
+    tuple_,
     update,
 )
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import Insert
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -23,6 +31,7 @@ from sqlalchemy.orm import (
 from sqlalchemy.orm import (
     Mapped,
     RelationshipProperty,
+    declared_attr,
     mapped_column,
 )
 from sqlalchemy.orm.attributes import InstrumentedAttribute
@@ -34,8 +43,12 @@ from sqlalchemy.sql._typing import _HasClauseElement
 from sqlalchemy.sql.elements import ColumnElement, SQLCoreOperations
 from sqlalchemy.sql.roles import ColumnsClauseRole, TypedColumnsClauseRole
 
+from app.core.metrics import metrics
 from app.core.pagination import PaginatedResult
 
+from .ids import uuid7
+from .unit_of_work import in_unit_of_work
+
 
 class DeclarativeBaseNoMeta(_DeclarativeBaseNoMeta):
     pass
@@ -66,6 +79,9 @@ class DeclarativeAttributeIntercept(_DeclarativeAttributeIntercept):
 class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
     __abstract__ = True
 
+    # factory of the uuid primary keys (see `UUIDPrimaryKey`), ids given explicitly to bulk statements use it too
+    id_factory: ClassVar[Callable[[], UUID]] = staticmethod(uuid7)
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(
             timezone=True,
@@ -78,6 +94,7 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
             timezone=True,
         ),
         server_default=func.now(),
+        onupdate=func.now(),
         nullable=False,
     )
 
@@ -88,10 +105,36 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
     def __repr__(self) -> str:
         return str(self.dict())
 
+    @classmethod
+    async def _commit(cls, session: AsyncSession, commit: bool) -> None:
+        """Commit the session, unless a unit of work is active on it, which will commit once on exit"""
+        if commit and not in_unit_of_work(session):
+            await session.commit()
+
+    @classmethod
+    async def _rollback(cls, session: AsyncSession) -> None:
+        """Rollback the session, unless a unit of work is active on it, which owns the transaction"""
+        if not in_unit_of_work(session):
+            await session.rollback()
+
     @classmethod
     async def count(cls, session: AsyncSession, /) -> int:
         return await session.scalar(func.count(cls.id))
 
+    @classmethod
+    def version(cls, where_clause: Optional[list[ColumnElement[bool]]] = None) -> ScalarSelect[str]:
+        """
+        A cheap validator of the rows matching the where clause: their count, latest and summed update times.
+        It changes whenever a row is inserted, updated or deleted, the sum catches an update stamped before
+        the latest one (by a transaction started earlier).
+        """
+        stmt = select(
+            func.concat_ws(":", func.count(), func.max(cls.updated_at), func.sum(func.extract("epoch", cls.updated_at)))
+        )
+        if where_clause:
+            stmt = stmt.where(*where_clause)
+        return stmt.scalar_subquery()
+
     @classmethod
     def get_select_in_load(cls) -> list[Load]:
         return []
@@ -172,12 +215,11 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
 
             await session.flush()
 
-            if commit:
-                await session.commit()
+            await cls._commit(session, commit)
 
             return obj
         except IntegrityError as e:
-            await session.rollback()
+            await cls._rollback(session)
 
             if e.orig.sqlstate == UniqueViolationError.sqlstate:
                 raise ValueError("Unique Constraint is Violated")
@@ -213,12 +255,11 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
                 insert_result = (await session.execute(statement, payload)).scalars().all()
                 result.extend(insert_result)
 
-            if commit:
-                await session.commit()
+            await cls._commit(session, commit)
 
             return result
         except IntegrityError as e:
-            await session.rollback()
+            await cls._rollback(session)
             raise e
 
     @classmethod
@@ -353,8 +394,7 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
 
         updated_model = await session.scalar(update(cls).values(data).filter(*where_clause).returning(cls))
 
-        if commit:
-            await session.commit()
+        await cls._commit(session, commit)
 
         return updated_model
 
@@ -383,13 +423,12 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
 
             result = await session.scalar(delete(cls).where(*where_cond).returning(cls))
 
-            if commit:
-                await session.commit()
+            await cls._commit(session, commit)
 
             return result
 
         except IntegrityError as e:
-            await session.rollback()
+            await cls._rollback(session)
 
             if e.orig.sqlstate == UniqueViolationError.sqlstate:
                 raise ValueError("Unique Constraint is Violated")
@@ -413,14 +452,13 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
 
             result = await session.scalars(delete(cls).where(*where_clause).returning(cls))
 
-            if commit:
-                await session.commit()
+            await cls._commit(session, commit)
 
             result = result.all()
 
             return result
         except IntegrityError as e:
-            await session.rollback()
+            await cls._rollback(session)
             if e.orig.sqlstate == UniqueViolationError.sqlstate:
                 raise ValueError("Unique Constraint is Violated")
             elif e.orig.sqlstate == ForeignKeyViolationError.sqlstate:
@@ -428,6 +466,93 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
 
             raise e
 
+    @classmethod
+    def excluded(cls):
+        """The row proposed for insertion in `ON CONFLICT DO UPDATE`, to be used in upsert where clauses"""
+        return pg_insert(cls).excluded
+
+    @classmethod
+    def _constraint_keys(cls, constraint: str) -> set[str]:
+        for item in cls.__table__.constraints:
+            if item.name == constraint:
+                return {column.key for column in item.columns}
+
+        raise ValueError(f"Constraint '{constraint}' is not defined on '{cls.__tablename__}'")
+
+    @classmethod
+    def upsert_statement(
+        cls,
+        data_values: list[Dict[str, Any]],
+        index_elements: list[InstrumentedAttribute | str] | None = None,
+        /,
+        *,
+        on_conflict: Literal["do_nothing", "do_update"] = "do_update",
+        constraint: Optional[str] = None,
+        where_clause: Optional[list[ColumnElement[bool]]] = None,
+        skip_unchanged: bool = False,
+    ) -> Insert:
+        """
+        Build a multi-row `INSERT ... ON CONFLICT` statement without executing it, so it can be
+        extended (returning, ctes) before being sent in a single round trip.
+
+        The conflict target is either the index elements (`id` by default) or a named unique constraint,
+        the latter lets rows be matched on their natural key without knowing their id.
+        The columns updated on conflict are the keys of the first row, except the conflict target columns
+        and the primary key, along with `updated_at` which `ON CONFLICT DO UPDATE` doesn't maintain on its own.
+        Rows whose conflicting row doesn't match the where clause are left untouched and not returned.
+
+        With `skip_unchanged`, rows already holding the proposed values are not rewritten (no dead tuple,
+        no WAL, no triggers), they are not returned either, see `with_unchanged_statement` to get them.
+        """
+        if constraint:
+            conflict_target = {"constraint": constraint}
+            conflict_keys = cls._constraint_keys(constraint)
+        else:
+            if not index_elements:
+                index_elements = ["id"]
+            conflict_target = {"index_elements": index_elements}
+            conflict_keys = {item if isinstance(item, str) else item.key for item in index_elements}
+
+        stmt = pg_insert(cls).values(data_values)
+
+        if on_conflict == "do_nothing":
+            return stmt.on_conflict_do_nothing(**conflict_target)
+
+        excluded_keys = conflict_keys | {column.key for column in cls.__table__.primary_key.columns}
+        updated_columns = {
+            key: getattr(stmt.excluded, key) for key in data_values[0].keys() if key not in excluded_keys
+        }
+        where_clause = list(where_clause or [])
+        if skip_unchanged:
+            if not updated_columns:
+                return stmt.on_conflict_do_nothing(**conflict_target)
+
+            current = tuple_(*[getattr(cls, key) for key in updated_columns])
+            proposed = tuple_(*updated_columns.values())
+            where_clause.append(current.is_distinct_from(proposed))
+
+        updated_columns["updated_at"] = func.now()
+
+        where = and_(*where_clause) if where_clause else None
+
+        return stmt.on_conflict_do_update(**conflict_target, set_=updated_columns, where=where)
+
+    @classmethod
+    def with_unchanged_statement(cls, stmt: Insert, unchanged_clause: list[ColumnElement[bool]]) -> CompoundSelect:
+        """
+        Wrap an upsert statement built with `skip_unchanged`, so the rows it left unchanged are returned too.
+        The unchanged rows are read from the statement snapshot, among the rows matching `unchanged_clause`
+        (the natural keys of the data along with any ownership guard), a `touched` column tells them apart.
+        """
+        columns = list(cls.__table__.columns)
+        upserted = stmt.returning(*columns).cte("upserted")
+
+        touched = select(*upserted.c, literal(True).label("touched"))
+        unchanged = select(*columns, literal(False).label("touched")).where(
+            *unchanged_clause, cls.id.not_in(select(upserted.c.id))
+        )
+        return touched.union_all(unchanged)
+
     @classmethod
     async def upsert_one(
         cls,
@@ -438,32 +563,32 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
         *,
         commit: bool = True,
         on_conflict: Literal["do_nothing", "do_update"] = "do_update",
+        constraint: Optional[str] = None,
+        where_clause: Optional[list[ColumnElement[bool]]] = None,
+        skip_unchanged: bool = False,
     ):
         try:
-            if not index_elements:
-                index_elements = ["id"]
-
             data_dict = data.model_dump(exclude_none=True, by_alias=False)
 
-            stmt = pg_insert(cls).values(data_dict)
-
-            if on_conflict == "do_update":
-                updated_columns = {
-                    key: getattr(stmt.excluded, key) for key in data_dict.keys() if key not in index_elements
-                }
-
-                stmt = stmt.on_conflict_do_update(index_elements=index_elements, set_=updated_columns)
-            else:
-                stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+            stmt = cls.upsert_statement(
+                [data_dict],
+                index_elements,
+                on_conflict=on_conflict,
+                constraint=constraint,
+                where_clause=where_clause,
+                skip_unchanged=skip_unchanged,
+            )
 
             result = await session.scalar(stmt.returning(cls))
 
-            if commit:
-                await session.commit()
+            await cls._commit(session, commit)
+
+            if skip_unchanged:
+                metrics.record_upsert(cls.__tablename__, int(result is not None), int(result is None))
 
             return result
         except IntegrityError as e:
-            await session.rollback()
+            await cls._rollback(session)
 
             if e.orig.sqlstate == UniqueViolationError.sqlstate:
                 raise ValueError("Unique Constraint is Violated")
@@ -482,39 +607,37 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
         *,
         commit: bool = True,
         on_conflict: Literal["do_nothing", "do_update"] = "do_update",
+        constraint: Optional[str] = None,
+        where_clause: Optional[list[ColumnElement[bool]]] = None,
+        skip_unchanged: bool = False,
     ):
         try:
-            if not index_elements:
-                index_elements = [cls.id]
-
             data_values = [item.model_dump(exclude_none=True, by_alias=False) for item in data]
 
-            stmt = pg_insert(cls).values(data_values)
-
-            if on_conflict == "do_nothing":
-                stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
-            else:
-                updated_columns = {
-                    key: getattr(stmt.excluded, key)
-                    # Use the first data object's keys
-                    for key in data_values[0].keys()
-                    if key not in index_elements  # Ensure index elements are not updated
-                }
-                stmt = stmt.on_conflict_do_update(index_elements=index_elements, set_=updated_columns)
+            stmt = cls.upsert_statement(
+                data_values,
+                index_elements,
+                on_conflict=on_conflict,
+                constraint=constraint,
+                where_clause=where_clause,
+                skip_unchanged=skip_unchanged,
+            )
 
             updated_or_created_data = await session.scalars(
                 stmt.returning(cls),
                 execution_options={"populate_existing": True},
             )
 
-            if commit:
-                await session.commit()
+            await cls._commit(session, commit)
 
             result = updated_or_created_data.all()
 
+            if skip_unchanged:
+                metrics.record_upsert(cls.__tablename__, len(result), len(data) - len(result))
+
             return result
         except IntegrityError as e:
-            await session.rollback()
+            await cls._rollback(session)
 
             if e.orig.sqlstate == UniqueViolationError.sqlstate:
                 raise ValueError("Unique Constraint is Violated")
@@ -560,12 +683,11 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
 
             await session.execute(stmt, update_items, execution_options={"synchronize_session": None})
 
-            if commit:
-                await session.commit()
+            await cls._commit(session, commit)
 
             return await session.scalars(select(cls).where(cls.id.in_(update_ids)))
         except IntegrityError as e:
-            await session.rollback()
+            await cls._rollback(session)
 
             if e.orig.sqlstate == UniqueViolationError.sqlstate:
                 raise ValueError("Unique Constraint is Violated")
@@ -592,12 +714,11 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
 
             await session.execute(stmt)
 
-            if commit:
-                await session.commit()
+            await cls._commit(session, commit)
 
             return None
         except IntegrityError as e:
-            await session.rollback()
+            await cls._rollback(session)
 
             if e.orig.sqlstate == UniqueViolationError.sqlstate:
                 raise ValueError("Unique Constraint is Violated")
@@ -605,3 +726,15 @@ class Base(DeclarativeBaseNoMeta, metaclass=DeclarativeAttributeIntercept):
                 raise ValueError("Foreig Key Constraint is violated")
 
             raise e
+
+
+class UUIDPrimaryKey:
+    """
+    A uuid primary key `id` generated by the `id_factory` of the model: time-ordered uuid7 by default, so inserts
+    append to the primary key index. A model may set `id_factory = staticmethod(uuid4)` to keep random ids.
+    """
+
+    @declared_attr
+    def id(cls) -> Mapped[UUID]:  # noqa: N805
+        # first column of the table, ahead of the columns of the model
+        return mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=cls.id_factory, sort_order=-1)
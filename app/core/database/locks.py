@@ -0,0 +1,23 @@
+import zlib
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _namespace_key(namespace: str) -> int:
+    """Stable int4 identifying a lock namespace, so locks of different namespaces never collide"""
+    value = zlib.crc32(namespace.encode())
+    return value - 2**32 if value >= 2**31 else value
+
+
+async def advisory_xact_lock(session: AsyncSession, namespace: str, key: Any) -> None:
+    """
+    Take a transaction level advisory lock on `key` within `namespace`, waiting for any other transaction
+    holding it. The lock is released on commit or rollback, so it must be taken inside the transaction it guards
+    (e.g. inside a `UnitOfWork`). Used to serialize the writes of one user without locking any row.
+
+    Usage:
+        await advisory_xact_lock(session, "worklogs", user_id)
+    """
+    await session.execute(select(func.pg_advisory_xact_lock(_namespace_key(namespace), func.hashtext(str(key)))))
@@ -2,6 +2,7 @@ from abc import ABC
 from typing import Any, ClassVar, Dict, List, Literal, Optional, Self, TypeVar, Union
 
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 from sqlalchemy.orm.strategy_options import _AbstractLoad
@@ -112,6 +113,13 @@ class BaseModelDatabaseMixin[T](AppBaseModel, ABC):
         except Exception as e:
             raise e
 
+    @classmethod
+    async def get_version(
+        cls, session: AsyncSession, /, *, where_clause: Optional[list[ColumnElement[bool]]] = None
+    ) -> str:
+        """Validator of the rows matching the where clause, see `Base.version`"""
+        return await session.scalar(select(cls.model.version(where_clause)))
+
     @classmethod
     async def get_all(
         cls,
@@ -213,6 +221,9 @@ class BaseModelDatabaseMixin[T](AppBaseModel, ABC):
         commit: bool = True,
         return_as_base: bool = False,
         on_conflict: Literal["do_nothing", "do_update"] = "do_update",
+        constraint: Optional[str] = None,
+        where_clause: Optional[list[ColumnElement[bool]]] = None,
+        skip_unchanged: bool = False,
     ) -> Union[Self, T]:
         if isinstance(data, dict):
             try:
@@ -220,9 +231,19 @@ class BaseModelDatabaseMixin[T](AppBaseModel, ABC):
             except Exception as e:
                 raise e
 
-        result = await cls.model.upsert_one(session, data, index_elements, commit=commit, on_conflict=on_conflict)
+        result = await cls.model.upsert_one(
+            session,
+            data,
+            index_elements,
+            commit=commit,
+            on_conflict=on_conflict,
+            constraint=constraint,
+            where_clause=where_clause,
+            skip_unchanged=skip_unchanged,
+        )
 
-        if return_as_base:
+        # with skip_unchanged, nothing is returned when the row was already up to date
+        if return_as_base or result is None:
             return result
 
         return cls.model_validate(result, from_attributes=True)
@@ -283,6 +304,9 @@ class BaseModelDatabaseMixin[T](AppBaseModel, ABC):
         commit: bool = True,
         return_as_base: bool = False,
         on_conflict: Literal["do_nothing", "do_update"] = "do_update",
+        constraint: Optional[str] = None,
+        where_clause: Optional[list[ColumnElement[bool]]] = None,
+        skip_unchanged: bool = False,
     ) -> Union[list[Self] | list[type[Base]]]:
         if not data or len(data) == 0:
             return []
@@ -293,7 +317,16 @@ class BaseModelDatabaseMixin[T](AppBaseModel, ABC):
             except Exception as e:
                 raise e
 
-        result = await cls.model.upsert_many(session, data, index_elements, commit=commit, on_conflict=on_conflict)
+        result = await cls.model.upsert_many(
+            session,
+            data,
+            index_elements,
+            commit=commit,
+            on_conflict=on_conflict,
+            constraint=constraint,
+            where_clause=where_clause,
+            skip_unchanged=skip_unchanged,
+        )
 
         if return_as_base:
             return result
@@ -0,0 +1,33 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from asyncpg.exceptions import QueryCanceledError
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def is_statement_timeout(error: BaseException) -> bool:
+    """Check if a database error is a statement cancelled by `statement_timeout`"""
+    if not isinstance(error, DBAPIError):
+        return False
+
+    return getattr(error.orig, "sqlstate", None) == QueryCanceledError.sqlstate
+
+
+@asynccontextmanager
+async def statement_timeout(session: AsyncSession, milliseconds: int) -> AsyncIterator[None]:
+    """
+    Limit the duration of each statement run within the block, the previous limit is restored on exit.
+    The limit is local to the transaction, a statement running over it is cancelled and the transaction
+    aborted (see `is_statement_timeout`), it then has to be rolled back.
+
+    Usage:
+        async with statement_timeout(session, 2000):
+            await session.execute(stmt)
+    """
+    previous = await session.scalar(
+        select(func.current_setting("statement_timeout"), func.set_config("statement_timeout", str(milliseconds), True))
+    )
+    yield
+    await session.execute(select(func.set_config("statement_timeout", previous, True)))
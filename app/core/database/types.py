@@ -0,0 +1,50 @@
+import math
+from typing import Any, Optional
+
+from sqlalchemy import ColumnElement, Float, Integer, SmallInteger, cast
+from sqlalchemy.types import TypeDecorator
+
+TENTHS_PER_HOUR = 10
+
+
+class Tenths(TypeDecorator):
+    """
+    Hours stored as an integer count of tenths of an hour (7.5h is stored as 75), the database sums and compares
+    native integers while the application reads and writes hours: values are converted when bound and loaded,
+    rounded half up to the tenth as `Numeric(3, 1)` did. Expressions of the column keep the type, sums included.
+
+    Usage:
+        duration: Mapped[float] = mapped_column(Tenths, nullable=False)
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[Any], dialect) -> Optional[int]:
+        if value is None:
+            return None
+        return math.floor(float(value) * TENTHS_PER_HOUR + 0.5)
+
+    def process_literal_param(self, value: Optional[Any], dialect) -> str:
+        return "NULL" if value is None else str(self.process_bind_param(value, dialect))
+
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[float]:
+        if value is None:
+            return None
+        return value / TENTHS_PER_HOUR
+
+    @property
+    def python_type(self) -> type:
+        return float
+
+    @staticmethod
+    def hours(expression: ColumnElement) -> ColumnElement[float]:
+        """Hours of a tenths expression computed by the database, for values not loaded through the type (JSON)"""
+        return cast(expression, Float) / TENTHS_PER_HOUR
+
+
+class TenthsTotal(Tenths):
+    """Sums of tenths of an hour (monthly and archived hours), stored in a 4 bytes integer"""
+
+    impl = Integer
+    cache_ok = True
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Callable, Optional, Self, TypeVar
+
+from asyncpg.exceptions import DeadlockDetectedError, SerializationError
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger("uvicorn")
+logger.setLevel(logging.INFO)
+
+R = TypeVar("R")
+
+UNIT_OF_WORK_KEY = "unit_of_work_depth"
+
+RETRYABLE_SQLSTATES = {DeadlockDetectedError.sqlstate, SerializationError.sqlstate}
+
+
+def in_unit_of_work(session: AsyncSession) -> bool:
+    """Check if the session is currently used inside a unit of work, commits are deferred to it when it is"""
+    return session.info.get(UNIT_OF_WORK_KEY, 0) > 0
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Check if a database error is transient (deadlock or serialization failure) and safe to retry"""
+    if not isinstance(error, DBAPIError):
+        return False
+
+    return getattr(error.orig, "sqlstate", None) in RETRYABLE_SQLSTATES
+
+
+class UnitOfWork:
+    """
+    Groups several database operations into a single transaction.
+
+    While a unit of work is active on a session, any `commit=True` passed to `Base` operations is
+    deferred, pending changes are flushed once and a single commit happens when the outermost
+    unit of work exits. Any exception raised inside rolls the whole transaction back.
+
+    Usage:
+        async with UnitOfWork(session):
+            await ActivityBase.create(session, data)
+            await ActivityUserBase.create(session, other_data)
+
+    Or, to retry the whole operation on deadlocks and serialization failures:
+        result = await UnitOfWork(session).run(operation)
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        /,
+        *,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.05,
+        max_backoff_seconds: float = 1.0,
+    ):
+        self.session = session
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+    @property
+    def _depth(self) -> int:
+        return self.session.info.get(UNIT_OF_WORK_KEY, 0)
+
+    @_depth.setter
+    def _depth(self, value: int) -> None:
+        self.session.info[UNIT_OF_WORK_KEY] = value
+
+    async def __aenter__(self) -> Self:
+        self._depth += 1
+        return self
+
+    async def __aexit__(self, exc_type: Optional[type[BaseException]], exc: Optional[BaseException], tb: Any) -> None:
+        self._depth -= 1
+
+        # nested units of work are part of the outermost one
+        if self._depth > 0:
+            return
+
+        if exc is not None:
+            await self.session.rollback()
+            return
+
+        try:
+            await self.session.flush()
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_seconds * (2**attempt), self.max_backoff_seconds)
+        return delay + random.uniform(0, delay)
+
+    async def run(self, operation: Callable[[], Awaitable[R]]) -> R:
+        """
+        Run the operation inside the unit of work and commit once, the operation is retried with an
+        exponential backoff when the transaction fails on a deadlock or a serialization failure.
+        Retrying is only done by the outermost unit of work, since a nested one can't replay the whole transaction.
+        """
+        attempt = 0
+        while True:
+            is_outermost = self._depth == 0
+            try:
+                async with self:
+                    return await operation()
+            except DBAPIError as e:
+                if not is_outermost or not is_retryable_error(e):
+                    raise e
+
+                if attempt >= self.max_retries:
+                    metrics.increment("unit_of_work.retries_exhausted")
+                    raise e
+
+                delay = self._backoff(attempt)
+                attempt += 1
+                metrics.increment("unit_of_work.retries")
+                logger.info(f"[UnitOfWork]: transient failure, retrying ({attempt}/{self.max_retries}) in {delay:.3f}s")
+                await asyncio.sleep(delay)
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Response, status
 
 from app.core.schema import AppResponse
 
@@ -88,3 +88,14 @@ class NotFoundException(AppException):
 
     def __init__(self, message: str = "Resource not found"):
         super().__init__(status_code=status.HTTP_404_NOT_FOUND, message=message)
+
+
+class ShortCircuitException(Exception):
+    """
+    Raised by dependencies to answer a request with an already built response, without running the route
+    (e.g. a replayed idempotent response, a not modified response)
+    """
+
+    def __init__(self, response: Response):
+        self.response = response
+        super().__init__(f"Request answered early with status {response.status_code}")
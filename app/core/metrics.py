@@ -0,0 +1,30 @@
+import threading
+from collections import Counter
+from typing import Dict
+
+
+class Metrics:
+    """
+    In-process counters of the application, reset on restart and kept per worker.
+    Names are dotted paths, e.g. `upsert.worklogs.touched`.
+    """
+
+    def __init__(self):
+        self._counters: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def record_upsert(self, table: str, touched: int, unchanged: int) -> None:
+        """Count the rows an upsert wrote and the ones it skipped since they were already up to date"""
+        self.increment(f"upsert.{table}.touched", touched)
+        self.increment(f"upsert.{table}.unchanged", unchanged)
+
+
+metrics = Metrics()
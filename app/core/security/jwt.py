@@ -25,8 +25,9 @@ def hash_password(plain_password: str) -> str:
     return password_hash.hash(plain_password)
 
 
-def hash_token(refresh_token: str) -> str:
-    return hashlib.sha256(refresh_token.encode()).hexdigest()
+def hash_token(token: str) -> bytes:
+    """SHA-256 digest of a token, stored and looked up as 32 raw bytes (half the size of the hex text)"""
+    return hashlib.sha256(token.encode()).digest()
 
 
 class JwtCookieOptions(BaseModel):
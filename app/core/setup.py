@@ -10,9 +10,11 @@ from fastapi.responses import JSONResponse
 from app.api import api_router
 from app.core.config import Settings, get_settings
 from app.core.database import session_manager
-from app.core.exceptions import AppException
+from app.core.exceptions import AppException, ShortCircuitException
+from app.domain.worklog import WorklogBase
 from app.models import *  # noqa: F403
 from app.redis_client import RedisClient, get_redis_client
+from app.services.autosave import autosave_flusher
 
 logger = logging.getLogger("uvicorn.info")
 logger.setLevel(logging.INFO)
@@ -28,10 +30,21 @@ class FastApp(FastAPI):
     async def _lifespan(self, _: Self, /) -> AsyncGenerator[None, Any]:
         redis_client: RedisClient = get_redis_client()
         await redis_client.connect()
+        await self._create_partitions()
+        autosave_flusher.start()
         yield
+        await autosave_flusher.stop()
         await session_manager.close()
         await redis_client.disconnect()
 
+    async def _create_partitions(self) -> None:
+        try:
+            async with session_manager.session() as session:
+                created = await WorklogBase.create_partitions(session)
+            logger.info(f"[FastApp]: {created} worklog partitions created")
+        except Exception as e:
+            logger.error(f"[FastApp]: failed to create worklog partitions: {e}")
+
     def _setup_middlewares(self) -> None:
         self.add_middleware(
             CORSMiddleware,
@@ -67,6 +80,10 @@ class FastApp(FastAPI):
             )
             return exception_handler(exc)
 
+        @self.exception_handler(ShortCircuitException)
+        async def short_circuit_handler(_: Request, exc: ShortCircuitException):
+            return exc.response
+
         @self.exception_handler(HTTPException)
         async def http_handler(request: Request, exc: HTTPException):
             logger.error(
@@ -0,0 +1,74 @@
+import hashlib
+from typing import Annotated, Awaitable, Callable, Optional
+
+from fastapi import Depends, Query, Request, Response
+
+from app.core.exceptions import ShortCircuitException
+from app.dependencies.auth import CurrentUser
+from app.dependencies.db_session import DbSession
+from app.dto.journal import GetJournalDto
+from app.services.activity import ActivityService
+from app.services.journal import JournalService
+
+# a dependency returning a version of the data a route responds with, None disables conditional requests
+Validator = Callable[..., Awaitable[Optional[str]]]
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def _etag(request: Request, version: str) -> str:
+    digest = hashlib.sha256(f"{request.url.path}?{request.url.query}|{version}".encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of the `If-None-Match` header with the current etag"""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(","))
+
+
+def conditional_get(validator: Validator) -> Callable[..., Awaitable[None]]:
+    """
+    Dependency factory making a GET route conditional on a validator, computed before the route runs.
+
+    The response carries an `ETag` derived from the validator version and the request URL, a request whose
+    `If-None-Match` matches it is answered with `304 Not Modified` without running the route, so unchanged
+    data is neither loaded, serialized nor transferred.
+    """
+
+    async def dependency(
+        request: Request, response: Response, version: Annotated[Optional[str], Depends(validator)]
+    ) -> None:
+        if version is None:
+            return
+
+        etag = _etag(request, version)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if _matches(request.headers.get("If-None-Match"), etag):
+            raise ShortCircuitException(Response(status_code=304, headers=headers))
+
+        response.headers.update(headers)
+
+    return dependency
+
+
+async def journal_version(session: DbSession, user: CurrentUser, query: GetJournalDto = Query(...)) -> Optional[str]:
+    return await JournalService(session).get_journal_version(query, user.id)
+
+
+async def activity_types_version(session: DbSession) -> str:
+    return await ActivityService(session).get_activity_types_version()
+
+
+async def user_activities_version(session: DbSession, user: CurrentUser) -> str:
+    return await ActivityService(session).get_activities_by_user_version(user.id)
+
+
+async def current_user_version(user: CurrentUser) -> str:
+    return user.model_dump_json()
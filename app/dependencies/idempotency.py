@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import logging
+import secrets
+from typing import Annotated, Any, AsyncGenerator, Optional
+
+from fastapi import Depends, Header, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.exceptions import AppException, ShortCircuitException, UnprocessableInputException
+from app.dependencies.auth import CurrentUser
+from app.redis_client import RedisClient, get_redis_client
+
+logger = logging.getLogger("uvicorn")
+logger.setLevel(logging.INFO)
+
+
+class IdempotencyGuard:
+    """
+    Handle given to an idempotent route, the route saves its response through it so retries of the same
+    request (same Idempotency-Key) are answered from the cache instead of being executed again.
+    """
+
+    def __init__(
+        self,
+        redis: Optional[RedisClient] = None,
+        /,
+        *,
+        key: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        ttl_seconds: int = 0,
+    ):
+        self._redis = redis
+        self._key = key
+        self._fingerprint = fingerprint
+        self._ttl_seconds = ttl_seconds
+        self.saved = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._redis is not None
+
+    async def save(self, response: BaseModel | Any, status_code: int = 200) -> None:
+        """Cache the response of the request, the first response is the one every retry will receive"""
+        if not self.enabled:
+            return
+
+        body = jsonable_encoder(response, by_alias=True)
+        cached = {"fingerprint": self._fingerprint, "status_code": status_code, "body": body}
+        self.saved = await self._redis.set(self._key, cached, ex=self._ttl_seconds)
+
+
+class Idempotency:
+    """
+    Dependency making a mutating route idempotent through the `Idempotency-Key` header, keys are scoped per user.
+
+    - The first request with a key takes an in-flight lock, runs the route and saves its response.
+    - A concurrent duplicate waits for the in-flight request and receives its response.
+    - Later duplicates receive the cached response without running the route.
+    - Reusing a key with a different request (method, path or body) is rejected.
+
+    Requests without the header are not affected.
+    """
+
+    HEADER: str = "Idempotency-Key"
+    KEY_PREFIX: str = "idempotency"
+    MAX_KEY_LENGTH: int = 255
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: int = 60 * 60 * 24,
+        lock_seconds: int = 30,
+        wait_seconds: float = 10.0,
+        poll_seconds: float = 0.1,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+
+    @staticmethod
+    async def _fingerprint(request: Request) -> str:
+        body = await request.body()
+        digest = hashlib.sha256()
+        digest.update(request.method.encode())
+        digest.update(request.url.path.encode())
+        digest.update(body)
+        return digest.hexdigest()
+
+    def _replay(self, cached: dict, fingerprint: str) -> Exception:
+        if cached.get("fingerprint") != fingerprint:
+            return UnprocessableInputException(
+                message=f"{self.HEADER} was already used for a different request, use a new key"
+            )
+
+        response = JSONResponse(
+            content=cached.get("body"),
+            status_code=cached.get("status_code", 200),
+            headers={"Idempotent-Replayed": "true"},
+        )
+        return ShortCircuitException(response)
+
+    async def _acquire(self, redis: RedisClient, key: str, lock_key: str, token: str, fingerprint: str) -> None:
+        """Take the in-flight lock of the key, raise the cached response if the request was already answered"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_seconds
+
+        while True:
+            cached = await redis.get(key, as_json=True)
+            if cached:
+                raise self._replay(cached, fingerprint)
+
+            if await redis.set(lock_key, token, ex=self.lock_seconds, nx=True):
+                return
+
+            if loop.time() >= deadline:
+                raise AppException(
+                    status_code=409, message=f"A request with the same {self.HEADER} is still being processed"
+                )
+
+            await asyncio.sleep(self.poll_seconds)
+
+    async def __call__(
+        self,
+        request: Request,
+        user: CurrentUser,
+        idempotency_key: Annotated[Optional[str], Header(alias=HEADER)] = None,
+    ) -> AsyncGenerator[IdempotencyGuard, None]:
+        if not idempotency_key:
+            yield IdempotencyGuard()
+            return
+
+        if len(idempotency_key) > self.MAX_KEY_LENGTH:
+            raise UnprocessableInputException(message=f"{self.HEADER} must be at most {self.MAX_KEY_LENGTH} characters")
+
+        redis = get_redis_client()
+        key = f"{self.KEY_PREFIX}:{user.id}:{idempotency_key}"
+        lock_key = f"{key}:lock"
+        token = secrets.token_hex(16)
+        fingerprint = await self._fingerprint(request)
+
+        await self._acquire(redis, key, lock_key, token, fingerprint)
+
+        guard = IdempotencyGuard(redis, key=key, fingerprint=fingerprint, ttl_seconds=self.ttl_seconds)
+        try:
+            yield guard
+        finally:
+            try:
+                await redis.delete_if_equals(lock_key, token)
+            except Exception as e:
+                logger.error(f"[Idempotency]: failed to release lock {lock_key}: {e}")
+
+
+Idempotent = Annotated[IdempotencyGuard, Depends(Idempotency())]
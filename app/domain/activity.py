@@ -1,16 +1,26 @@
+from datetime import date as Date
 from datetime import datetime
-from typing import ClassVar, Optional
+from typing import ClassVar, List, Optional
 from uuid import UUID
 
 from pydantic import Field
-from sqlalchemy import and_, select
+from sqlalchemy import ColumnElement, ScalarSelect, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import JSON, aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import contains_eager, joinedload, with_loader_criteria
 
 from app.core.database.mixin import BaseModelDatabaseMixin
+from app.core.database.types import Tenths
 from app.domain.activity_type import ActivityTypeBase
-from app.dto.journal import JournalActivity
-from app.models import Activity, ActivityTask, ActivityUser, Worklog
+from app.domain.worklog_archive import WorklogArchiveBase
+from app.dto.journal import JournalDocument
+from app.models import Activity, ActivityTask, ActivityType, ActivityUser, Worklog
+
+EMPTY_JSON_ARRAY = literal_column("'[]'::json")
+
+
+def _json_object(**fields: ColumnElement) -> ColumnElement:
+    """A `json_build_object` of the given keys and values, keys keep their order"""
+    return func.json_build_object(*(item for key, value in fields.items() for item in (literal(key), value)))
 
 
 class ActivityBase(BaseModelDatabaseMixin[Activity]):
@@ -22,28 +32,100 @@ class ActivityBase(BaseModelDatabaseMixin[Activity]):
     activity_type_id: UUID
 
     @classmethod
-    async def get_journal(cls, session: AsyncSession, user_id: UUID, start_date: datetime, end_date: datetime):
-        try:
-            stmt = (
-                select(Activity)
-                .join(Activity.user_activities)
-                .join(Activity.tasks)
-                .where(and_(ActivityUser.user_id == user_id, ActivityTask.user_id == user_id))
-                .order_by(ActivityTask.created_at.desc())
-                .options(
-                    joinedload(Activity.activity_type),
-                    contains_eager(Activity.tasks).selectinload(ActivityTask.worklogs),
-                )
-                .options(
-                    with_loader_criteria(
-                        Worklog, and_(Worklog.date.between(start_date, end_date), Worklog.user_id == user_id)
+    async def get_journal(
+        cls, session: AsyncSession, user_id: UUID, start_date: Date, end_date: Date
+    ) -> JournalDocument:
+        """
+        The journal of a user for a period: the activities assigned to them having tasks of theirs, newest task
+        first, with the worklogs of each task within the period. The nested document is assembled by Postgres
+        (camelCase keys, the shape of `JournalActivity`) and returned as is, without loading any entity.
+        Periods reaching the archive read archived worklogs too, within the archive read budget.
+        """
+        source = WorklogArchiveBase.worklogs_source(start_date, end_date)
+        worklogs = (
+            select(
+                func.json_agg(
+                    aggregate_order_by(
+                        _json_object(id=source.c.id, date=source.c.date, duration=Tenths.hours(source.c.duration)),
+                        source.c.date,
                     )
                 )
             )
-            result = (await session.scalars(stmt)).unique().all()
-            return [JournalActivity.from_activity_model(item) for item in result]
-        except Exception as e:
-            raise e
+            .where(
+                source.c.activity_task_id == ActivityTask.id,
+                source.c.user_id == user_id,
+                source.c.date.between(start_date, end_date),
+            )
+            .scalar_subquery()
+        )
+        task_document = _json_object(
+            id=ActivityTask.id,
+            title=ActivityTask.title,
+            activityId=ActivityTask.activity_id,
+            userId=ActivityTask.user_id,
+            worklogs=func.coalesce(worklogs, EMPTY_JSON_ARRAY),
+        )
+        user_tasks = [ActivityTask.activity_id == Activity.id, ActivityTask.user_id == user_id]
+        tasks = (
+            select(func.json_agg(aggregate_order_by(task_document, ActivityTask.created_at.desc())))
+            .where(*user_tasks)
+            .scalar_subquery()
+        )
+        latest_task = select(func.max(ActivityTask.created_at)).where(*user_tasks).scalar_subquery()
+
+        activities = (
+            select(
+                _json_object(
+                    id=Activity.id,
+                    title=Activity.title,
+                    code=Activity.code,
+                    activityType=ActivityType.title,
+                    tasks=tasks,
+                ).label("document"),
+                latest_task.label("latest_task"),
+            )
+            .join(Activity.activity_type)
+            .where(
+                select(ActivityUser.id)
+                .where(ActivityUser.activity_id == Activity.id, ActivityUser.user_id == user_id)
+                .exists(),
+                select(ActivityTask.id).where(*user_tasks).exists(),
+            )
+            .subquery("activities")
+        )
+        stmt = select(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(activities.c.document, activities.c.latest_task.desc())),
+                EMPTY_JSON_ARRAY,
+            ).cast(JSON)
+        )
+        async with WorklogArchiveBase.read_budget(session, start_date):
+            return await session.scalar(stmt)
+
+    @classmethod
+    async def get_user_activities_version(cls, session: AsyncSession, user_id: UUID) -> str:
+        """Validator of the activities assigned to a user along with their type, see `Base.version`"""
+        stmt = select(*cls._user_activities_versions(user_id))
+        return "|".join(str(version) for version in (await session.execute(stmt)).one())
+
+    @classmethod
+    async def get_journal_version(cls, session: AsyncSession, user_id: UUID, start_date: Date, end_date: Date) -> str:
+        """Validator of the journal of a user for a period, changes whenever any row it is built from changes"""
+        stmt = select(
+            *cls._user_activities_versions(user_id),
+            ActivityTask.version([ActivityTask.user_id == user_id]),
+            Worklog.version([Worklog.user_id == user_id, Worklog.date.between(start_date, end_date)]),
+        )
+        return "|".join(str(version) for version in (await session.execute(stmt)).one())
+
+    @staticmethod
+    def _user_activities_versions(user_id: UUID) -> List[ScalarSelect[str]]:
+        assigned = select(ActivityUser.activity_id).where(ActivityUser.user_id == user_id)
+        return [
+            ActivityUser.version([ActivityUser.user_id == user_id]),
+            Activity.version([Activity.id.in_(assigned)]),
+            ActivityType.version(),
+        ]
 
 
 class ActivityWithType(ActivityBase):
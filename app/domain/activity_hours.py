@@ -0,0 +1,75 @@
+from datetime import date as Date
+from typing import ClassVar, Dict, List
+from uuid import UUID
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.mixin import BaseModelDatabaseMixin
+from app.dto.report import ActivityHoursLevel, ActivityHoursRow
+from app.models import Activity, ActivityHoursMonthly, ActivityType, User
+
+
+class ActivityHoursMonthlyBase(BaseModelDatabaseMixin[ActivityHoursMonthly]):
+    """Hours of a user on an activity for a month, maintained by the database on every worklog write"""
+
+    model: ClassVar[ActivityHoursMonthly] = ActivityHoursMonthly
+
+    # `grouping(activity_type, activity, user)` bits of each grouping set, a set bit is a column rolled up
+    LEVELS: ClassVar[Dict[int, ActivityHoursLevel]] = {
+        0b000: ActivityHoursLevel.ACTIVITY_USER,
+        0b001: ActivityHoursLevel.ACTIVITY,
+        0b011: ActivityHoursLevel.ACTIVITY_TYPE,
+        0b110: ActivityHoursLevel.USER,
+        0b111: ActivityHoursLevel.TOTAL,
+    }
+
+    activity_id: UUID
+    user_id: UUID
+    month: Date
+    hours: float
+
+    @classmethod
+    async def get_rollup(cls, session: AsyncSession, start_month: Date, end_month: Date) -> List[ActivityHoursRow]:
+        """
+        Hours per month of the months within the range (given as their first day), rolled up in a single pass
+        over the summary with `GROUPING SETS`: per activity and user, per activity, per activity type, per user
+        and the total of the month.
+        """
+        model = cls.model
+        activity_type = (ActivityType.id, ActivityType.title)
+        activity = (Activity.id, Activity.code, Activity.title)
+        user = (User.id, User.full_name)
+        grouping = func.grouping(ActivityType.id, Activity.id, User.id)
+
+        stmt = (
+            select(
+                grouping.label("grouping"),
+                model.month,
+                ActivityType.id.label("activity_type_id"),
+                ActivityType.title.label("activity_type"),
+                Activity.id.label("activity_id"),
+                Activity.code.label("activity_code"),
+                Activity.title.label("activity_title"),
+                User.id.label("user_id"),
+                User.full_name.label("user_full_name"),
+                func.sum(model.hours).label("hours"),
+            )
+            .join(Activity, Activity.id == model.activity_id)
+            .join(ActivityType, ActivityType.id == Activity.activity_type_id)
+            .join(User, User.id == model.user_id)
+            .where(model.month.between(start_month, end_month))
+            .group_by(
+                func.grouping_sets(
+                    tuple_(model.month, *activity_type, *activity, *user),
+                    tuple_(model.month, *activity_type, *activity),
+                    tuple_(model.month, *activity_type),
+                    tuple_(model.month, *user),
+                    tuple_(model.month),
+                )
+            )
+            .order_by(model.month, grouping, ActivityType.title, Activity.code, User.full_name)
+        )
+
+        rows = (await session.execute(stmt)).all()
+        return [ActivityHoursRow.model_validate({**row._mapping, "level": cls.LEVELS[row.grouping]}) for row in rows]
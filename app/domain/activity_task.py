@@ -1,21 +1,107 @@
-from typing import ClassVar, List, Optional
+from typing import ClassVar, List, Optional, Self, Sequence, Tuple
 from uuid import UUID
 
+from asyncpg.exceptions import ForeignKeyViolationError, UniqueViolationError
 from pydantic import Field
+from sqlalchemy import Row, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database.mixin import BaseModelDatabaseMixin
+from app.core.metrics import metrics
 from app.domain.worklog import WorklogBase
-from app.models import ActivityTask
+from app.models import Activity, ActivityTask
 
 
 class ActivityTaskBase(BaseModelDatabaseMixin[ActivityTask]):
     model: ClassVar[ActivityTask] = ActivityTask
 
+    # natural key of a task, titles are unique per activity
+    TITLE_CONSTRAINT: ClassVar[str] = "uq_title_activity_id"
+
     id: Optional[UUID] = Field(default=None)
     title: str
     activity_id: UUID
     user_id: UUID
 
+    @classmethod
+    async def save_for_user(cls, session: AsyncSession, user_id: UUID, tasks: List[Self], /) -> Tuple[List[Self], int]:
+        """
+        Upsert tasks of a user, tasks with an id are matched on it (so they can be renamed), the others on
+        their natural key (title, activity_id). Tasks of other users are never updated, nor returned.
+        Tasks sent unchanged are not rewritten but still returned.
+        Returns the tasks along with the number of tasks actually created or updated.
+        """
+        model = cls.model
+        owned_by_user = model.user_id == user_id
+        # rows are sent in key order, so concurrent saves lock them in the same order
+        tasks_by_id = sorted((task for task in tasks if task.id), key=lambda task: task.id)
+        tasks_by_title = sorted(
+            (task for task in tasks if not task.id), key=lambda task: (str(task.activity_id), task.title)
+        )
+
+        statements = []
+        if tasks_by_id:
+            data_values = [task.model_dump(by_alias=False) for task in tasks_by_id]
+            stmt = model.upsert_statement(
+                data_values, where_clause=[model.user_id == model.excluded().user_id], skip_unchanged=True
+            )
+            statements.append(
+                model.with_unchanged_statement(stmt, [owned_by_user, model.id.in_([task.id for task in tasks_by_id])])
+            )
+
+        if tasks_by_title:
+            data_values = [
+                {**task.model_dump(by_alias=False, exclude={"id"}), "id": model.id_factory()} for task in tasks_by_title
+            ]
+            stmt = model.upsert_statement(
+                data_values,
+                constraint=cls.TITLE_CONSTRAINT,
+                where_clause=[model.user_id == model.excluded().user_id],
+                skip_unchanged=True,
+            )
+            keys = [(task.title, task.activity_id) for task in tasks_by_title]
+            statements.append(
+                model.with_unchanged_statement(stmt, [owned_by_user, tuple_(model.title, model.activity_id).in_(keys)])
+            )
+
+        rows = []
+        try:
+            for stmt in statements:
+                rows.extend((await session.execute(stmt)).all())
+        except IntegrityError as e:
+            if e.orig.sqlstate == UniqueViolationError.sqlstate:
+                raise ValueError("Unique Constraint is Violated")
+            elif e.orig.sqlstate == ForeignKeyViolationError.sqlstate:
+                raise ValueError("Foreig Key Constraint is violated")
+
+            raise e
+
+        touched = sum(1 for row in rows if row.touched)
+        metrics.record_upsert(model.__tablename__, touched, len(rows) - touched)
+
+        return [cls.model_validate(row._mapping) for row in rows], touched
+
+    @classmethod
+    async def get_team_tasks(
+        cls, session: AsyncSession, user_ids: List[UUID], /, *, activity_id: Optional[UUID] = None
+    ) -> Sequence[Row]:
+        """
+        Tasks of several users as rows (id, title, activity_id, activity_code, user_id), limited to an activity
+        if given, ordered by activity and title.
+        """
+        model = cls.model
+        stmt = (
+            select(model.id, model.title, model.activity_id, Activity.code.label("activity_code"), model.user_id)
+            .join(Activity, Activity.id == model.activity_id)
+            .where(model.user_id.in_(user_ids))
+            .order_by(Activity.code, model.title, model.id)
+        )
+        if activity_id:
+            stmt = stmt.where(model.activity_id == activity_id)
+
+        return (await session.execute(stmt)).all()
+
 
 class ActivityTaskWorklogs(ActivityTaskBase):
     worklogs: List[WorklogBase]
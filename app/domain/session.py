@@ -12,8 +12,8 @@ class SessionBase(BaseModelDatabaseMixin[Session]):
     model: ClassVar[type[Session]] = Session
 
     id: Optional[UUID] = Field(default=None)
-    refresh_token_hash: str
-    access_token_hash: str
+    refresh_token_hash: bytes
+    access_token_hash: bytes
     expires_at: datetime
 
     is_active: Optional[bool] = Field(default=True)
@@ -0,0 +1,43 @@
+from datetime import date as Date
+from datetime import datetime
+from typing import ClassVar, List, Optional, Self
+from uuid import UUID
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.mixin import BaseModelDatabaseMixin
+from app.models import SyncTombstone
+
+
+class SyncTombstoneBase(BaseModelDatabaseMixin[SyncTombstone]):
+    """A deleted task or worklog of a user, kept for clients syncing their journal from a watermark"""
+
+    model: ClassVar[SyncTombstone] = SyncTombstone
+
+    ACTIVITY_TASK: ClassVar[str] = "activity_task"
+    WORKLOG: ClassVar[str] = "worklog"
+    RETENTION_DAYS: ClassVar[int] = 30
+
+    entity: str
+    entity_id: UUID
+    date: Optional[Date] = None
+
+    @classmethod
+    async def get_watermark(cls, session: AsyncSession) -> datetime:
+        """Current database time, timestamps of the rows are set by the database so watermarks must be too"""
+        return await session.scalar(select(func.now()))
+
+    @classmethod
+    async def get_since(
+        cls, session: AsyncSession, user_id: UUID, since: datetime, start_date: Date, end_date: Date
+    ) -> List[Self]:
+        """Get the deletions of a user after the given time, worklog deletions are limited to the date range"""
+        model = cls.model
+        stmt = select(model).where(
+            model.user_id == user_id,
+            model.created_at > since,
+            or_(model.date.is_(None), model.date.between(start_date, end_date)),
+        )
+        result = await session.scalars(stmt)
+        return [cls.model_validate(item, from_attributes=True) for item in result.all()]
@@ -1,13 +1,15 @@
-from typing import ClassVar, List, Optional
+from typing import ClassVar, List, Optional, Sequence
 from uuid import UUID
 
 from pydantic import Field
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.constants.roles import UserRole
 from app.core.database.mixin import BaseModelDatabaseMixin
 from app.domain.activity import ActivityWithType
-from app.models import Activity, User
+from app.models import Activity, ActivityUser, User
 
 
 class UserBase(BaseModelDatabaseMixin[User]):
@@ -21,6 +23,24 @@ class UserBase(BaseModelDatabaseMixin[User]):
     is_admin: bool = False
     role: UserRole = UserRole.USER
 
+    @classmethod
+    async def get_team(
+        cls, session: AsyncSession, /, *, activity_id: Optional[UUID] = None, user_ids: Optional[List[UUID]] = None
+    ) -> Sequence[Row]:
+        """
+        Members of a team as (id, full_name) rows ordered by name: the given users, or if none are given the
+        users assigned to the activity.
+        """
+        model = cls.model
+        stmt = select(model.id, model.full_name).order_by(model.full_name, model.id)
+        if user_ids:
+            stmt = stmt.where(model.id.in_(user_ids))
+        else:
+            assigned = select(ActivityUser.user_id).where(ActivityUser.activity_id == activity_id)
+            stmt = stmt.where(model.id.in_(assigned))
+
+        return (await session.execute(stmt)).all()
+
 
 class UserWithActivities(BaseModelDatabaseMixin[User]):
     model: ClassVar[User] = User
@@ -1,18 +1,325 @@
 from datetime import date as Date
-from typing import ClassVar, Optional
+from typing import ClassVar, List, Optional, Self, Tuple
 from uuid import UUID
 
+from asyncpg.exceptions import CheckViolationError, ForeignKeyViolationError, UniqueViolationError
 from pydantic import Field
+from sqlalchemy import Date as DateType
+from sqlalchemy import Row, Select, cast, delete, func, literal, select, tuple_, type_coerce
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database.locks import advisory_xact_lock
 from app.core.database.mixin import BaseModelDatabaseMixin
-from app.models import Worklog
+from app.core.exceptions import BadRequestException
+from app.core.metrics import metrics
+from app.core.schema import BaseModel
+from app.domain.worklog_archive import WorklogArchiveBase
+from app.models import Activity, ActivityTask, ActivityType, User, Worklog, WorklogDailyTotal
 
 
 class WorklogBase(BaseModelDatabaseMixin[Worklog]):
     model: ClassVar[Worklog] = Worklog
 
+    # natural key of a worklog, a journal cell: one worklog per task and day for a user
+    CELL_CONSTRAINT: ClassVar[str] = "uq_user_activity_task_date"
+    LOCK_NAMESPACE: ClassVar[str] = "worklogs"
+    PARTITION_MONTHS_AHEAD: ClassVar[int] = 12
+
     id: Optional[UUID] = Field(default=None)
     date: Date
     duration: Optional[float] = None
     activity_task_id: UUID
     user_id: UUID
+
+    @classmethod
+    async def create_partitions(cls, session: AsyncSession, /, *, months_ahead: Optional[int] = None) -> int:
+        """
+        Create the monthly partitions missing from the previous month up to `months_ahead` months, returns the
+        number of partitions created. Idempotent, meant to be run on startup.
+        """
+        months_ahead = cls.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        since = cast(func.current_date() - func.make_interval(0, 1), DateType)
+        until = cast(func.current_date() + func.make_interval(0, months_ahead), DateType)
+        created = await session.scalar(select(func.create_worklog_partitions(since, until)))
+        await session.commit()
+        return created
+
+    @classmethod
+    async def lock_user(cls, session: AsyncSession, user_id: UUID, /) -> None:
+        """
+        Serialize the worklog writes of a user (e.g. two tabs saving the same week) for the rest of the transaction,
+        concurrent saves then run one after the other instead of deadlocking on overlapping rows, and each one reads
+        the totals left by the previous one. Every writer of worklogs takes it before writing.
+        """
+        await advisory_xact_lock(session, cls.LOCK_NAMESPACE, user_id)
+
+    @classmethod
+    async def save_batch(
+        cls,
+        session: AsyncSession,
+        user_id: UUID,
+        /,
+        *,
+        upserts: List["WorklogBase"],
+        deletions: List[Tuple[UUID, Date]],
+        task_deletions: List[UUID],
+    ) -> List[Self]:
+        """
+        Apply a worklog batch of the given user in a single statement: task deletions (along with their worklogs),
+        worklog deletions and the multi-row worklog upsert are chained as data-modifying CTEs.
+        Worklogs are matched on their cell (task, date), deletions are given as (activity_task_id, date).
+        Returns the upserted worklogs.
+        """
+        ctes = []
+        if task_deletions:
+            ctes.append(
+                delete(ActivityTask)
+                .where(ActivityTask.id.in_(task_deletions), ActivityTask.user_id == user_id)
+                .returning(ActivityTask.id)
+                .cte("deleted_tasks")
+            )
+            deletions_clause = tuple_(Worklog.activity_task_id, Worklog.date).in_(
+                deletions
+            ) | Worklog.activity_task_id.in_(task_deletions)
+        else:
+            deletions_clause = tuple_(Worklog.activity_task_id, Worklog.date).in_(deletions)
+
+        if deletions or task_deletions:
+            ctes.append(
+                delete(Worklog)
+                .where(deletions_clause, Worklog.user_id == user_id)
+                .returning(Worklog.id)
+                .cte("deleted_worklogs")
+            )
+
+        if not upserts:
+            if ctes:
+                await session.execute(select(func.count()).select_from(ctes[-1]).add_cte(*ctes))
+            return []
+
+        # ids are only used by inserted rows, given explicitly as column defaults are not applied alongside ctes
+        data_values = [
+            {**item.model_dump(exclude_none=True, by_alias=False, exclude={"id"}), "id": cls.model.id_factory()}
+            for item in upserts
+        ]
+        stmt = cls.model.upsert_statement(data_values, constraint=cls.CELL_CONSTRAINT, skip_unchanged=True)
+
+        # cells resubmitted with the same duration are not rewritten, but still returned
+        cells = [(item.activity_task_id, item.date) for item in upserts]
+        model = cls.model
+        stmt = model.with_unchanged_statement(
+            stmt, [model.user_id == user_id, tuple_(model.activity_task_id, model.date).in_(cells)]
+        )
+
+        if ctes:
+            stmt = stmt.add_cte(*ctes)
+
+        try:
+            rows = (await session.execute(stmt)).all()
+        except IntegrityError as e:
+            if e.orig.sqlstate == UniqueViolationError.sqlstate:
+                raise ValueError("Unique Constraint is Violated")
+            elif e.orig.sqlstate == ForeignKeyViolationError.sqlstate:
+                raise ValueError("Foreig Key Constraint is violated")
+
+            WorklogDailyTotalBase.raise_for_daily_limit(e)
+            WorklogArchiveBase.raise_for_archived_month(e)
+            raise e
+
+        touched = sum(1 for row in rows if row.touched)
+        metrics.record_upsert(model.__tablename__, touched, len(rows) - touched)
+
+        return [cls.model_validate(row._mapping) for row in rows]
+
+    @classmethod
+    async def get_columns(
+        cls,
+        session: AsyncSession,
+        user_ids: List[UUID],
+        start_date: Date,
+        end_date: Date,
+        /,
+        *,
+        task_ids: Optional[List[UUID]] = None,
+    ) -> "WorklogColumns":
+        """
+        Worklogs of the users for a period as flat columns, the day offsets are computed by the database.
+        Rows are not hydrated nor validated, the columns are meant to be scattered into a pivot grid.
+        Limited to the worklogs of the given tasks if any, archived worklogs are included for old periods.
+        """
+        worklogs = WorklogArchiveBase.worklogs_source(start_date, end_date)
+        stmt = select(
+            worklogs.c.activity_task_id,
+            worklogs.c.date - literal(start_date, worklogs.c.date.type),
+            worklogs.c.duration,
+            worklogs.c.id,
+        ).where(worklogs.c.user_id.in_(user_ids), worklogs.c.date.between(start_date, end_date))
+        if task_ids is not None:
+            stmt = stmt.where(worklogs.c.activity_task_id.in_(task_ids))
+        async with WorklogArchiveBase.read_budget(session, start_date):
+            rows = (await session.execute(stmt)).all()
+        if not rows:
+            return WorklogColumns()
+
+        task_ids, offsets, durations, ids = zip(*rows)
+        return WorklogColumns.model_construct(
+            task_ids=list(task_ids), offsets=list(offsets), durations=list(durations), ids=list(ids)
+        )
+
+    @classmethod
+    def export_statement(cls, start_date: Date, end_date: Date, /) -> Select:
+        """
+        Worklogs of all users for a period along with the names of their user, activity and task, ordered by
+        day and user. Meant to be streamed, worklogs whose task was deleted are kept with empty names.
+        Archived worklogs are included for old periods.
+        """
+        worklogs = WorklogArchiveBase.worklogs_source(start_date, end_date)
+        return (
+            select(
+                worklogs.c.date,
+                User.full_name.label("user_full_name"),
+                User.email.label("user_email"),
+                ActivityType.title.label("activity_type"),
+                Activity.code.label("activity_code"),
+                Activity.title.label("activity_title"),
+                ActivityTask.title.label("task_title"),
+                worklogs.c.duration,
+            )
+            .join(User, User.id == worklogs.c.user_id)
+            .outerjoin(ActivityTask, ActivityTask.id == worklogs.c.activity_task_id)
+            .outerjoin(Activity, Activity.id == ActivityTask.activity_id)
+            .outerjoin(ActivityType, ActivityType.id == Activity.activity_type_id)
+            .where(worklogs.c.date.between(start_date, end_date))
+            .order_by(worklogs.c.date, User.full_name, User.id, Activity.code, ActivityTask.title)
+        )
+
+    @classmethod
+    async def set_cell(
+        cls, session: AsyncSession, user_id: UUID, task_id: UUID, date: Date, duration: Optional[float], /
+    ) -> Optional[Row]:
+        """
+        Set the duration of one journal cell in a single statement, a null duration deletes the worklog.
+        The worklog is upserted on `uq_user_activity_task_date`, only if the task belongs to the user,
+        the daily cap is enforced by the worklogs trigger within the same statement.
+
+        Returns a row (id, duration, day_total) or None if the task is not found. As the trigger updates the
+        daily total after the statement snapshot is taken, the day total is computed from the previous one, which
+        is only current if the caller holds the lock of the user (`lock_user`).
+        """
+        model = cls.model
+        task = select(ActivityTask.id).where(ActivityTask.id == task_id, ActivityTask.user_id == user_id).cte("task")
+        cell_clause = [model.activity_task_id == task_id, model.user_id == user_id, model.date == date]
+        previous_total = select(WorklogDailyTotal.hours).where(
+            WorklogDailyTotal.user_id == user_id, WorklogDailyTotal.date == date
+        )
+        previous_duration = select(model.duration).where(*cell_clause)
+
+        if duration:
+            values = select(
+                literal(model.id_factory(), model.id.type),
+                literal(date, model.date.type),
+                literal(duration, model.duration.type),
+                task.c.id,
+                literal(user_id, model.user_id.type),
+            )
+            insert_stmt = pg_insert(model).from_select(
+                ["id", "date", "duration", "activity_task_id", "user_id"], values
+            )
+            written = (
+                insert_stmt.on_conflict_do_update(
+                    constraint=cls.CELL_CONSTRAINT,
+                    set_={"duration": insert_stmt.excluded.duration, "updated_at": func.now()},
+                )
+                .returning(model.id, model.duration)
+                .cte("written")
+            )
+            written_id = select(written.c.id).scalar_subquery()
+            written_duration = select(written.c.duration).scalar_subquery()
+            day_total = (
+                func.coalesce(previous_total.scalar_subquery(), 0)
+                - func.coalesce(previous_duration.scalar_subquery(), 0)
+                + func.coalesce(written_duration, 0)
+            )
+        else:
+            written = (
+                delete(model)
+                .where(*cell_clause, model.activity_task_id.in_(select(task.c.id)))
+                .returning(model.id, model.duration)
+                .cte("written")
+            )
+            written_id = literal(None, model.id.type)
+            written_duration = literal(None, model.duration.type)
+            day_total = func.coalesce(previous_total.scalar_subquery(), 0) - func.coalesce(
+                select(written.c.duration).scalar_subquery(), 0
+            )
+
+        stmt = select(
+            select(func.count()).select_from(task).scalar_subquery().label("task_found"),
+            written_id.label("id"),
+            written_duration.label("duration"),
+            # arithmetic of tenths is typed as a plain integer, loaded as hours like the total it derives from
+            type_coerce(day_total, WorklogDailyTotal.hours.type).label("day_total"),
+        ).add_cte(task, written)
+
+        try:
+            result = (await session.execute(stmt)).one()
+        except IntegrityError as e:
+            if e.orig.sqlstate == ForeignKeyViolationError.sqlstate:
+                raise ValueError("Foreig Key Constraint is violated")
+
+            WorklogDailyTotalBase.raise_for_daily_limit(e)
+            WorklogArchiveBase.raise_for_archived_month(e)
+            raise e
+
+        if not result.task_found:
+            return None
+
+        return result
+
+
+class WorklogColumns(BaseModel):
+    """Worklogs as parallel columns, days are given as offsets from the start of the period"""
+
+    task_ids: List[UUID] = Field(default=[])
+    offsets: List[int] = Field(default=[])
+    durations: List[float] = Field(default=[])
+    ids: List[UUID] = Field(default=[])
+
+
+class WorklogDailyTotalBase(BaseModelDatabaseMixin[WorklogDailyTotal]):
+    """Hours logged by a user for a day, maintained by the database on every worklog write"""
+
+    model: ClassVar[WorklogDailyTotal] = WorklogDailyTotal
+
+    CAP_CONSTRAINT: ClassVar[str] = "ck_worklog_daily_totals_cap"
+    DAILY_CAP_HOURS: ClassVar[float] = 8
+
+    date: Date
+    hours: float
+
+    @classmethod
+    def raise_for_daily_limit(cls, error: IntegrityError) -> None:
+        """Raise a bad request if the integrity error is the daily cap being exceeded by a worklog write"""
+        if error.orig.sqlstate != CheckViolationError.sqlstate:
+            return
+
+        cause = error.orig.__cause__
+        if getattr(cause, "constraint_name", None) != cls.CAP_CONSTRAINT:
+            return
+
+        message = getattr(cause, "message", None) or "Daily limit exceeded"
+        raise BadRequestException(message) from error
+
+    @classmethod
+    async def get_range(cls, session: AsyncSession, user_id: UUID, start_date: Date, end_date: Date) -> List[Self]:
+        """Get the daily totals of a user for a date range, days without any worklog are omitted"""
+        model = cls.model
+        stmt = (
+            select(model)
+            .where(model.user_id == user_id, model.date.between(start_date, end_date), model.hours > 0)
+            .order_by(model.date)
+        )
+        result = await session.scalars(stmt)
+        return [cls.model_validate(item, from_attributes=True) for item in result.all()]
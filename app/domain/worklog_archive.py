@@ -0,0 +1,107 @@
+from contextlib import asynccontextmanager
+from datetime import date as Date
+from typing import AsyncIterator, ClassVar, List, Optional
+
+from asyncpg.exceptions import CheckViolationError
+from sqlalchemy import FromClause, func, select, union_all
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.mixin import BaseModelDatabaseMixin
+from app.core.database.timeouts import is_statement_timeout, statement_timeout
+from app.core.exceptions import AppException, BadRequestException
+from app.models import Worklog, WorklogArchive, WorklogArchivedMonth
+
+
+class WorklogArchiveBase(BaseModelDatabaseMixin[WorklogArchivedMonth]):
+    """
+    A month of worklogs moved to the archive. Months are archived once they are `ARCHIVE_AFTER_MONTHS` months
+    old, so periods starting before the horizon are read from both the hot worklogs and the archive.
+    """
+
+    model: ClassVar[WorklogArchivedMonth] = WorklogArchivedMonth
+
+    ARCHIVE_AFTER_MONTHS: ClassVar[int] = 24
+    # statement timeout of the reads reaching the archive, its indexes are colder and its months larger
+    READ_TIMEOUT_MS: ClassVar[int] = 5000
+    GUARD_CONSTRAINT: ClassVar[str] = "ck_worklogs_not_archived"
+
+    month: Date
+    worklogs: int
+    hours: float
+
+    @classmethod
+    def horizon(cls, today: Optional[Date] = None) -> Date:
+        """First day of the oldest month that is never archived, the horizon only moves forward"""
+        today = today or Date.today()
+        months = today.year * 12 + today.month - 1 - cls.ARCHIVE_AFTER_MONTHS
+        return Date(months // 12, months % 12 + 1, 1)
+
+    @classmethod
+    def reaches_archive(cls, start_date: Date) -> bool:
+        return start_date < cls.horizon()
+
+    @classmethod
+    def worklogs_source(cls, start_date: Date, end_date: Date, /) -> FromClause:
+        """
+        Worklogs of a period to select from: the hot table, along with the archive if the period starts before the
+        horizon. Both expose the same columns, the period is applied to each side so archive partitions are pruned.
+        """
+        if not cls.reaches_archive(start_date):
+            return Worklog.__table__
+
+        sides = [
+            select(model.id, model.date, model.duration, model.activity_task_id, model.user_id).where(
+                model.date.between(start_date, end_date)
+            )
+            for model in (Worklog, WorklogArchive)
+        ]
+        return union_all(*sides).subquery("worklogs")
+
+    @classmethod
+    @asynccontextmanager
+    async def read_budget(cls, session: AsyncSession, start_date: Date, /) -> AsyncIterator[None]:
+        """
+        Statement timeout of the reads of a period reaching the archive, a read over budget is answered with a 503
+        instead of holding a connection. Reads of the hot worklogs only are not limited.
+        """
+        if not cls.reaches_archive(start_date):
+            yield
+            return
+
+        try:
+            async with statement_timeout(session, cls.READ_TIMEOUT_MS):
+                yield
+        except DBAPIError as e:
+            if not is_statement_timeout(e):
+                raise e
+            raise AppException(
+                status_code=503, message="Archived worklogs could not be read in time, request a shorter period"
+            ) from e
+
+    @classmethod
+    def raise_for_archived_month(cls, error: IntegrityError) -> None:
+        """Raise a bad request if the integrity error is a worklog write on an archived month"""
+        if error.orig.sqlstate != CheckViolationError.sqlstate:
+            return
+
+        cause = error.orig.__cause__
+        if getattr(cause, "constraint_name", None) != cls.GUARD_CONSTRAINT:
+            return
+
+        message = getattr(cause, "message", None) or "Worklogs of the month are archived"
+        raise BadRequestException(message) from error
+
+    @classmethod
+    async def get_archivable_months(cls, session: AsyncSession) -> List[Date]:
+        """Months before the horizon still having a partition in the hot worklogs, oldest first"""
+        return list(await session.scalars(select(func.archivable_worklog_months(cls.horizon()))))
+
+    @classmethod
+    async def archive_month(cls, session: AsyncSession, month: Date, /) -> Optional[int]:
+        """
+        Move the partition of a month to the archive and summarize its hours per user and task, see
+        `archive_worklog_month()`. Returns the number of worklogs archived, None if the month already is.
+        Worklogs are locked until the transaction ends, it is left to the caller to commit.
+        """
+        return await session.scalar(select(func.archive_worklog_month(month)))
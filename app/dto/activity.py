@@ -34,22 +34,58 @@ class UpsertActivityTask(BaseModel):
 
 
 class WorklogDto(BaseModel):
-    # A null id indicates a creation
-    id: Optional[UUID] = Field(default=None, description="Unique identifier of the worklog.")
+    # A worklog is identified by its task and date, a null or zero duration deletes it
+    id: Optional[UUID] = Field(
+        default=None, description="Unique identifier of the worklog, not required, the cell is matched on its date."
+    )
     date: Date = Field(description="Date of the worklog represents a cell for a day")
     duration: Optional[float] = Field(default=None, description="Duration registered for the day for the task")
     task_id: Optional[UUID] = Field(default=None, description="The task which the worklog belongs to.")
 
+
+class TaskBatchDto(BaseModel):
+    tasks: List[UpsertActivityTask] = Field(default=[])
+    deletions: Optional[List[UUID]] = Field(default=[])
+
+
+class AutosaveCellDto(BaseModel):
+    # A null or zero duration clears the cell
+    task_id: UUID = Field(description="The task which the cell belongs to.")
+    date: Date = Field(description="Date of the cell")
+    duration: Optional[float] = Field(default=None, description="Duration registered for the day for the task")
+
+
+class AutosaveDto(BaseModel):
+    cells: List[AutosaveCellDto] = Field(min_length=1)
+
+
+class AutosaveError(BaseModel):
+    task_id: UUID
+    date: Date
+    message: str
+
+
+class AutosaveStatus(BaseModel):
+    pending: int = Field(description="Number of cell edits of the user waiting to be written to the database")
+    errors: List[AutosaveError] = Field(
+        default=[], description="Edits rejected by the database since the last autosave, they are discarded"
+    )
+
+
+class SetWorklogCellDto(BaseModel):
+    # A null or zero duration clears the cell
+    duration: Optional[float] = Field(default=None, description="Duration registered for the day for the task")
+
     @model_validator(mode="after")
     def validate_data(self):
-        if self.duration is None and self.id is None:
-            raise UnprocessableInputException(
-                message=f"Unprocessable entity, both 'duration' and 'id' fields are not provided, \
-                    in object: {str(self)}"
-            )
+        if self.duration and not 1 <= self.duration <= 8:
+            raise UnprocessableInputException(message="Unprocessable entity, 'duration' must be between 1 and 8 hours")
         return self
 
 
-class TaskBatchDto(BaseModel):
-    tasks: List[UpsertActivityTask] = Field(default=[])
-    deletions: Optional[List[UUID]] = Field(default=[])
+class WorklogCell(BaseModel):
+    id: Optional[UUID] = Field(default=None, description="Worklog of the cell, null once the cell is cleared")
+    task_id: UUID
+    date: Date
+    duration: Optional[float] = None
+    day_total: float = Field(description="Hours logged by the employee for the day, all tasks included")
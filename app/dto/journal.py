@@ -1,16 +1,47 @@
 from datetime import date as Date
-from typing import List, Optional
+from datetime import datetime
+from enum import StrEnum
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from pydantic import Field
+from pydantic import AwareDatetime, Field, model_validator
 
+from app.core.exceptions import UnprocessableInputException
 from app.core.schema import BaseModel
-from app.models import Activity
+from app.domain.activity_task import ActivityTaskBase
+from app.domain.worklog import WorklogBase
+
+
+class JournalFormat(StrEnum):
+    NESTED = "nested"
+    MATRIX = "matrix"
 
 
 class GetJournalDto(BaseModel):
     start_date: Date
     end_date: Date
+    format: JournalFormat = Field(
+        default=JournalFormat.NESTED, description="`matrix` sends the worklogs of each task as arrays parallel to dates"
+    )
+    since: Optional[AwareDatetime] = Field(
+        default=None,
+        description="Watermark of a previous response (with its UTC offset), only changes made after it are returned",
+    )
+
+
+class GetTeamJournalDto(BaseModel):
+    start_date: Date
+    end_date: Date
+    activity_id: Optional[UUID] = Field(
+        default=None, description="Employees assigned to the activity, only their tasks of the activity are included"
+    )
+    user_ids: List[UUID] = Field(default=[], description="Employees to include, all of their tasks are included")
+
+    @model_validator(mode="after")
+    def validate_team(self):
+        if not self.activity_id and not self.user_ids:
+            raise UnprocessableInputException(message="Unprocessable entity, 'activityId' or 'userIds' is required")
+        return self
 
 
 class JournalActivityType(BaseModel):
@@ -25,16 +56,6 @@ class JournalActivity(BaseModel):
     activity_type: str
     tasks: Optional[List["JournalActivityTask"]] = Field(default=[])
 
-    @classmethod
-    def from_activity_model(cls, activity: Activity):
-        return cls(
-            id=activity.id,
-            title=activity.title,
-            code=activity.code,
-            activity_type=activity.activity_type.title,
-            tasks=[JournalActivityTask.model_validate(item, from_attributes=True) for item in activity.tasks],
-        )
-
 
 class JournalActivityWorklogs(BaseModel):
     id: Optional[UUID] = Field(default=None)
@@ -50,6 +71,18 @@ class JournalActivityTask(BaseModel):
     worklogs: Optional[List[JournalActivityWorklogs]] = Field(default=[])
 
 
+# the journal as sent to clients: `JournalActivity` documents (camelCase keys) assembled by the database
+JournalDocument = List[Dict[str, Any]]
+
+
 class UserJournalDto(BaseModel):
     project_assignments: List[JournalActivity]
     tasks: List[JournalActivityTask]
+
+
+class JournalDelta(BaseModel):
+    watermark: datetime = Field(description="Send it as `since` on the next request to get the following changes")
+    tasks: List[ActivityTaskBase] = Field(default=[], description="Tasks created or updated")
+    worklogs: List[WorklogBase] = Field(default=[], description="Worklogs of the period created or updated")
+    deleted_tasks: List[UUID] = Field(default=[])
+    deleted_worklogs: List[UUID] = Field(default=[])
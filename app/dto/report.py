@@ -0,0 +1,50 @@
+from datetime import date as Date
+from enum import StrEnum
+from typing import Optional
+from uuid import UUID
+
+from pydantic import Field
+
+from app.core.schema import BaseModel
+
+
+class ActivityHoursLevel(StrEnum):
+    """Grouping of a row of the activity hours report, rows of every level are sent for each month"""
+
+    ACTIVITY_USER = "activity_user"
+    ACTIVITY = "activity"
+    ACTIVITY_TYPE = "activity_type"
+    USER = "user"
+    TOTAL = "total"
+
+
+class GetActivityHoursDto(BaseModel):
+    start_month: Date = Field(description="Any day of the first month of the report")
+    end_month: Date = Field(description="Any day of the last month of the report")
+
+
+class ActivityHoursRow(BaseModel):
+    """Hours of a month, the fields not grouped at the row level are null"""
+
+    level: ActivityHoursLevel
+    month: Date
+    activity_type_id: Optional[UUID] = None
+    activity_type: Optional[str] = None
+    activity_id: Optional[UUID] = None
+    activity_code: Optional[str] = None
+    activity_title: Optional[str] = None
+    user_id: Optional[UUID] = None
+    user_full_name: Optional[str] = None
+    hours: float
+
+
+class ExportFormat(StrEnum):
+    CSV = "csv"
+    XLSX = "xlsx"
+
+
+class ExportWorklogsDto(BaseModel):
+    start_date: Date
+    end_date: Date
+    format: ExportFormat = Field(default=ExportFormat.CSV)
+    gzip: bool = Field(default=False, description="Compress a CSV export with gzip, XLSX files are already compressed")
@@ -0,0 +1,35 @@
+import asyncio
+import logging
+
+from app.core.database import session_manager
+from app.domain.worklog_archive import WorklogArchiveBase
+
+logger = logging.getLogger("uvicorn")
+logger.setLevel(logging.INFO)
+
+
+async def archive_worklogs() -> int:
+    """
+    Move the worklogs of the months older than the archive horizon to `worklogs_archive`, one month per
+    transaction (worklogs are locked while a month is summed and moved, for a few hundred milliseconds at most).
+    Returns the number of worklogs archived. Safe to run again, meant to be run monthly.
+    """
+    async with session_manager.session() as session:
+        months = await WorklogArchiveBase.get_archivable_months(session)
+
+    archived = 0
+    for month in months:
+        async with session_manager.session() as session:
+            count = await WorklogArchiveBase.archive_month(session, month)
+            await session.commit()
+
+        if count is not None:
+            archived += count
+            logger.info(f"[archive_worklogs]: archived {count} worklogs of {month:%Y-%m}")
+
+    return archived
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"Successfully archived {asyncio.run(archive_worklogs())} worklogs")
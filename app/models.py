@@ -1,6 +1,5 @@
 from datetime import datetime
 from typing import List, Optional
-from uuid import uuid4
 
 from sqlalchemy import (
     VARCHAR,
@@ -8,9 +7,10 @@ from sqlalchemy import (
     CheckConstraint,
     Date,
     DateTime,
-    Float,
     ForeignKey,
-    Numeric,
+    Index,
+    Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
@@ -19,13 +19,12 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, WriteOnlyMapped, mapped_column, relationship
 
 from app.constants.roles import UserRole
-from app.core.database import Base
+from app.core.database import Base, Tenths, TenthsTotal, UUIDPrimaryKey
 
 
-class User(Base):
+class User(UUIDPrimaryKey, Base):
     __tablename__ = "users"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     full_name: Mapped[str] = mapped_column(String(256), nullable=False)
     email: Mapped[str] = mapped_column(String(512), unique=True, nullable=False)
     hashed_password: Mapped[str] = mapped_column(String(1024), nullable=False)
@@ -63,12 +62,16 @@ class User(Base):
         return UserRole(self.role)
 
 
-class Session(Base):
+class Session(UUIDPrimaryKey, Base):
+    """
+    Tokens are stored as their SHA-256 digests (`hash_token`), 32 bytes looked up by equality only: the token hash
+    indexes are hash indexes, about half the size of a B-tree over the same digests.
+    """
+
     __tablename__ = "sessions"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    refresh_token_hash: Mapped[str] = mapped_column(String, index=True, nullable=False)
-    access_token_hash: Mapped[str] = mapped_column(String, index=True, nullable=False)
+    refresh_token_hash: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    access_token_hash: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     last_used_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=datetime.now)
@@ -79,29 +82,36 @@ class Session(Base):
 
     # Relations
     user_id: Mapped[UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
     )
     user: Mapped["User"] = relationship(back_populates="sessions")
 
+    __table_args__ = (
+        CheckConstraint("octet_length(refresh_token_hash) = 32", name="ck_sessions_refresh_token_hash_length"),
+        CheckConstraint("octet_length(access_token_hash) = 32", name="ck_sessions_access_token_hash_length"),
+        Index("ix_sessions_refresh_token_hash", "refresh_token_hash", postgresql_using="hash"),
+        Index("ix_sessions_access_token_hash", "access_token_hash", postgresql_using="hash"),
+    )
+
 
-class ActivityType(Base):
+class ActivityType(UUIDPrimaryKey, Base):
     __tablename__ = "activity_types"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     title: Mapped[str] = mapped_column(VARCHAR(255), nullable=False, unique=True)
 
     activities: Mapped[List["Activity"]] = relationship(back_populates="activity_type")
 
 
-class Activity(Base):
+class Activity(UUIDPrimaryKey, Base):
     __tablename__ = "activities"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     title: Mapped[str] = mapped_column(nullable=False)
     code: Mapped[str] = mapped_column(unique=True)
 
     # Relations
-    activity_type_id: Mapped[UUID] = mapped_column(ForeignKey("activity_types.id", ondelete="SET NULL"), nullable=False)
+    activity_type_id: Mapped[UUID] = mapped_column(
+        ForeignKey("activity_types.id", ondelete="SET NULL"), nullable=False, index=True
+    )
     activity_type: Mapped[ActivityType] = relationship(back_populates="activities")
 
     user_activities: WriteOnlyMapped["ActivityUser"] = relationship(back_populates="activity")
@@ -115,14 +125,15 @@ class Activity(Base):
     tasks: Mapped[List["ActivityTask"]] = relationship(back_populates="activity", cascade="all, delete-orphan")
 
 
-class ActivityTask(Base):
+class ActivityTask(UUIDPrimaryKey, Base):
     __tablename__ = "activity_tasks"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     title: Mapped[str] = mapped_column(nullable=False)
 
     # Relations
-    activity_id: Mapped[UUID] = mapped_column(ForeignKey("activities.id", ondelete="SET NULL"), nullable=True)
+    activity_id: Mapped[UUID] = mapped_column(
+        ForeignKey("activities.id", ondelete="SET NULL"), nullable=True, index=True
+    )
     activity: Mapped[Activity] = relationship(back_populates="tasks")
 
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
@@ -130,15 +141,23 @@ class ActivityTask(Base):
 
     worklogs: Mapped[List["Worklog"]] = relationship(back_populates="activity_task", cascade="all, delete-orphan")
 
-    __table_args__ = (UniqueConstraint("title", "activity_id", name="uq_title_activity_id"),)
+    __table_args__ = (
+        UniqueConstraint("title", "activity_id", name="uq_title_activity_id"),
+        Index("ix_activity_tasks_user_id_updated_at", "user_id", "updated_at"),
+    )
+
 
+class Worklog(UUIDPrimaryKey, Base):
+    """
+    Range-partitioned by month on `date` (worklogs_pYYYY_MM, dates without a partition go to worklogs_default),
+    the primary key and unique constraints include `date` as required on partitioned tables.
+    Partitions ahead are created by `WorklogBase.create_partitions`.
+    """
 
-class Worklog(Base):
     __tablename__ = "worklogs"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    date: Mapped[Date] = mapped_column(Date(), nullable=False)
-    duration: Mapped[Float] = mapped_column(Numeric(precision=3, scale=1), nullable=False)
+    date: Mapped[Date] = mapped_column(Date(), primary_key=True, nullable=False)
+    duration: Mapped[float] = mapped_column(Tenths, nullable=False)
 
     # Relations
     activity_task_id: Mapped[Optional[UUID]] = mapped_column(
@@ -150,24 +169,140 @@ class Worklog(Base):
     user: Mapped[User] = relationship(back_populates="worklogs")
 
     __table_args__ = (
-        CheckConstraint("duration >= 1 AND duration <= 8"),
+        # tenths of an hour, from 1 to 8 hours
+        CheckConstraint("duration >= 10 AND duration <= 80", name="worklogs_duration_check"),
         UniqueConstraint("activity_task_id", "user_id", "date", name="uq_user_activity_task_date"),
+        # covers the sums of durations of a user by day and task (the daily total and cap check, the monthly hours)
+        # with index-only scans, the journal also reads the ids so it only uses it to find the rows
+        Index(
+            "ix_worklogs_user_id_date_covering",
+            "user_id",
+            "date",
+            postgresql_include=["duration", "activity_task_id"],
+        ),
+        Index("ix_worklogs_user_id_updated_at", "user_id", "updated_at"),
+        {"postgresql_partition_by": "RANGE (date)"},
     )
 
 
-class ActivityUser(Base):
-    __tablename__ = "activity_users"
+class WorklogArchive(UUIDPrimaryKey, Base):
+    """
+    Worklogs of closed months moved out of `worklogs` by `archive_worklog_month()`: the monthly partition is
+    detached and attached here as worklogs_archive_pYYYY_MM, without copying rows. Archived worklogs are read only,
+    they keep the indexes serving the journal and the foreign keys, the hot table only indexes are dropped.
+    """
+
+    __tablename__ = "worklogs_archive"
+
+    date: Mapped[Date] = mapped_column(Date(), primary_key=True, nullable=False)
+    duration: Mapped[float] = mapped_column(Tenths, nullable=False)
+
+    # Relations
+    activity_task_id: Mapped[Optional[UUID]] = mapped_column(
+        ForeignKey("activity_tasks.id", ondelete="SET NULL"), nullable=True
+    )
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
+
+    __table_args__ = (
+        UniqueConstraint("activity_task_id", "user_id", "date", name="uq_worklogs_archive_user_activity_task_date"),
+        Index(
+            "ix_worklogs_archive_user_id_date_covering",
+            "user_id",
+            "date",
+            postgresql_include=["duration", "activity_task_id"],
+        ),
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
+
+
+class WorklogArchivedMonth(Base):
+    """
+    A month of worklogs moved to `worklogs_archive`, worklogs dated within it can no longer be written
+    (rejected by the `trg_worklogs_archived_months` trigger).
+    """
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    __tablename__ = "worklog_archived_months"
+
+    month: Mapped[Date] = mapped_column(Date(), primary_key=True)
+    worklogs: Mapped[int] = mapped_column(Integer, nullable=False)
+    hours: Mapped[float] = mapped_column(TenthsTotal, nullable=False)
+
+
+class WorklogMonthlySummary(Base):
+    """
+    Hours logged by a user on a task for an archived month, written when the month is archived so the monthly
+    activity hours are summed again from the hot schema (see `refresh_activity_hours_monthly()`).
+    """
+
+    __tablename__ = "worklog_monthly_summaries"
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    activity_task_id: Mapped[UUID] = mapped_column(
+        ForeignKey("activity_tasks.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    month: Mapped[Date] = mapped_column(Date(), primary_key=True)
+    hours: Mapped[float] = mapped_column(TenthsTotal, nullable=False)
+    worklogs: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class WorklogDailyTotal(Base):
+    """
+    Hours logged by a user per day, kept up to date by the `trg_worklogs_daily_totals` trigger on worklogs
+    so the daily cap is enforced by a check constraint instead of aggregating worklogs on every save.
+    """
+
+    __tablename__ = "worklog_daily_totals"
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    date: Mapped[Date] = mapped_column(Date(), primary_key=True)
+    hours: Mapped[float] = mapped_column(Tenths, nullable=False, default=0)
+
+    __table_args__ = (CheckConstraint("hours >= 0 AND hours <= 80", name="ck_worklog_daily_totals_cap"),)
+
+
+class ActivityHoursMonthly(Base):
+    """
+    Hours logged per activity, user and month (the first day of the month), kept up to date by the
+    `trg_worklogs_hours_monthly_*` and `trg_activity_tasks_hours_monthly` triggers: the months of the users
+    touched by a statement are summed again within it. Serves the hours reports without scanning worklogs.
+    """
+
+    __tablename__ = "activity_hours_monthly"
+
+    activity_id: Mapped[UUID] = mapped_column(ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True)
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)
+    month: Mapped[Date] = mapped_column(Date(), primary_key=True)
+    hours: Mapped[float] = mapped_column(TenthsTotal, nullable=False)
+
+
+class SyncTombstone(UUIDPrimaryKey, Base):
+    """
+    Record of a deleted task or worklog, written by the `trg_*_sync_tombstones` triggers so clients syncing
+    the journal from a watermark learn about deletions. Tombstones older than 30 days are pruned by the triggers.
+    """
+
+    __tablename__ = "sync_tombstones"
+
+    entity: Mapped[str] = mapped_column(String(32), nullable=False)
+    entity_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # date of the deleted worklog, tasks are not bound to a date
+    date: Mapped[Optional[Date]] = mapped_column(Date(), nullable=True)
+
+    __table_args__ = (Index("ix_sync_tombstones_user_id_created_at", "user_id", "created_at"),)
+
+
+class ActivityUser(UUIDPrimaryKey, Base):
+    __tablename__ = "activity_users"
 
     # Relations
     user_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
     user: Mapped[User] = relationship(back_populates="user_activities", foreign_keys=[user_id])
 
-    activity_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("activities.id", ondelete="SET NULL"))
+    activity_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("activities.id", ondelete="SET NULL"), index=True)
     activity: Mapped[Activity] = relationship(back_populates="user_activities")
 
-    assigned_by_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    assigned_by_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     # Define the relationship
     assigned_by: Mapped["User"] = relationship(
         foreign_keys=[assigned_by_id]  # Specify this FK to avoid ambiguity
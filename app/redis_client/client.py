@@ -22,6 +22,13 @@ class RedisClientConfig(BaseModel):
 
 
 class RedisClient:
+    _DELETE_IF_EQUALS_SCRIPT = """
+    if redis.call("GET", KEYS[1]) == ARGV[1] then
+        return redis.call("DEL", KEYS[1])
+    end
+    return 0
+    """
+
     def __init__(self, redis_config: RedisClientConfig):
         """Initial Async Redis client
         Args:
@@ -134,6 +141,21 @@ class RedisClient:
         """
         return await self.client.delete(*keys)
 
+    async def delete_if_equals(self, key: str, value: str, /) -> bool:
+        """
+        Delete a key only if it still holds the given value, atomically.
+        Useful to release a lock only by the owner that acquired it.
+
+        Args:
+            key: The key to delete
+            value: The value the key must hold to be deleted
+
+        Returns:
+            True if the key was deleted, False otherwise
+        """
+        result = await self.eval(self._DELETE_IF_EQUALS_SCRIPT, [key], [value])
+        return bool(result)
+
     async def exists(self, *keys: str) -> int:
         """
         Check if keys exist.
@@ -146,6 +168,142 @@ class RedisClient:
         """
         return await self.client.exists(*keys)
 
+    # Hash Operations
+    async def hset(self, key: str, mapping: dict[str, Any], /, *, ex: Optional[int] = None) -> int:
+        """
+        Set several fields of a hash, existing fields are overwritten.
+
+        Args:
+            key: The hash key
+            mapping: Fields to set (values will be JSON-serialized if not a string)
+            ex: Expiration time of the whole hash in seconds
+
+        Returns:
+            Number of fields that were added
+        """
+        mapping = {
+            field: value if isinstance(value, (str, bytes)) else json.dumps(value) for field, value in mapping.items()
+        }
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            if ex:
+                pipe.expire(key, ex)
+            added, *_ = await pipe.execute()
+
+        return added
+
+    async def hgetall(self, key: str, /, *, as_json: bool = False) -> dict[str, Union[str, Any]]:
+        """
+        Get all fields of a hash.
+
+        Args:
+            key: The hash key
+            as_json: Whether to parse the values as JSON
+
+        Returns:
+            The fields of the hash, empty if the key doesn't exist
+        """
+        values = await self.client.hgetall(key)
+        if not as_json:
+            return values
+
+        result = {}
+        for field, value in values.items():
+            try:
+                result[field] = json.loads(value)
+            except json.JSONDecodeError:
+                result[field] = value
+        return result
+
+    async def hmget(self, key: str, *fields: str) -> list[Optional[str]]:
+        """
+        Get several fields of a hash.
+
+        Args:
+            key: The hash key
+            fields: Fields to retrieve
+
+        Returns:
+            The values in the order of the fields, None for missing fields
+        """
+        return await self.client.hmget(key, list(fields))
+
+    async def hincrby(self, key: str, field: str, amount: int = 1, /) -> int:
+        """
+        Increment the integer value of a hash field, a missing field starts from 0.
+
+        Args:
+            key: The hash key
+            field: The field to increment
+            amount: Increment
+
+        Returns:
+            The value after the increment
+        """
+        return await self.client.hincrby(key, field, amount)
+
+    async def hlen(self, key: str, /) -> int:
+        """
+        Get the number of fields of a hash.
+
+        Args:
+            key: The hash key
+
+        Returns:
+            Number of fields, 0 if the key doesn't exist
+        """
+        return await self.client.hlen(key)
+
+    # Sorted Set Operations
+    async def zadd(self, key: str, mapping: dict[str, float], /, *, nx: bool = False) -> int:
+        """
+        Add members to a sorted set, or update their score.
+
+        Args:
+            key: The sorted set key
+            mapping: Members and their scores
+            nx: Only add new members, never update the score of existing ones
+
+        Returns:
+            Number of members added
+        """
+        return await self.client.zadd(key, mapping, nx=nx)
+
+    async def zrangebyscore(
+        self, key: str, min_score: float | str, max_score: float | str, /, *, limit: Optional[int] = None
+    ) -> list[str]:
+        """
+        Get the members of a sorted set with a score within a range, lowest scores first.
+
+        Args:
+            key: The sorted set key
+            min_score: Minimum score (inclusive), "-inf" for no minimum
+            max_score: Maximum score (inclusive), "+inf" for no maximum
+            limit: Maximum number of members returned
+
+        Returns:
+            The members found
+        """
+        if limit is None:
+            return await self.client.zrangebyscore(key, min_score, max_score)
+        return await self.client.zrangebyscore(key, min_score, max_score, start=0, num=limit)
+
+    # Scripting
+    async def eval(self, script: str, keys: list[str], args: list[Any], /) -> Any:
+        """
+        Run a Lua script atomically on the server.
+
+        Args:
+            script: The Lua script
+            keys: Keys accessed by the script (KEYS table)
+            args: Arguments of the script (ARGV table)
+
+        Returns:
+            The value returned by the script
+        """
+        return await self.client.eval(script, len(keys), *keys, *args)
+
 
 redis_client: RedisClient | None = None
 redis_config: RedisClientConfig = RedisClientConfig(host=settings.REDIS_SERVER)
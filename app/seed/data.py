@@ -3,7 +3,7 @@ import uuid
 from typing import List, Optional
 
 from app.constants.roles import UserRole
-from app.core.database import session_manager
+from app.core.database import session_manager, uuid7
 from app.core.security.jwt import hash_password
 from app.domain.activity import ActivityBase, ActivityUserBase
 from app.domain.activity_task import ActivityTaskBase
@@ -129,7 +129,7 @@ async def seed_emplyee_activities(
         for employee in employees:
             data.append(
                 ActivityUserBase(
-                    id=uuid.uuid4(),
+                    id=uuid7(),
                     user_id=employee.id,
                     activity_id=activity.id,
                     assigned_by_id=admin_id,
@@ -147,7 +147,7 @@ async def seed_employee_tasks(activities: List[ActivityBase], employees: List[Us
         for employee in employees:
             data.append(
                 ActivityTaskBase(
-                    id=uuid.uuid4(),
+                    id=uuid7(),
                     title=f"Task for {activity.code} for employee {employee.full_name}",
                     user_id=employee.id,
                     activity_id=activity.id,
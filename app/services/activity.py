@@ -1,10 +1,11 @@
-from typing import List
+from datetime import date as Date
+from typing import Dict, List, Optional, Set, Tuple
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.exceptions import BadRequestException
+from app.core.exceptions import BadRequestException, NotFoundException
 from app.domain.activity import (
     ActivityBase,
     ActivityTypeBase,
@@ -18,10 +19,13 @@ from app.dto.activity import (
     CreateActivityDto,
     CreateActivityTaskDto,
     CreateUserActivityDto,
+    SetWorklogCellDto,
     TaskBatchDto,
+    UpsertActivityTask,
+    WorklogCell,
 )
-from app.models import Worklog
 from app.services.base import BaseService
+from app.services.journal_snapshot import JournalSnapshots
 
 
 class ActivityService(BaseService):
@@ -35,6 +39,7 @@ class ActivityService(BaseService):
         self._user = UserWithActivities
         self._activity_task = ActivityTaskBase
         self._worklog = WorklogBase
+        self._snapshots = JournalSnapshots()
 
     def _get_model(self):
         return self._activity
@@ -43,16 +48,21 @@ class ActivityService(BaseService):
         """Get all activity types"""
         return await self._activity_type.get_all(self.session)
 
+    async def get_activity_types_version(self) -> str:
+        return await self._activity_type.get_version(self.session)
+
     async def get_all_activities(self) -> List[ActivityBase]:
         return await self._activity.get_all(self.session)
 
     async def create_activity(self, data: CreateActivityDto) -> ActivityBase:
         """Create an activity item, ADMIN ONLY"""
-        return await self._activity.create(self.session, data)
+        return await self.unit_of_work().run(lambda: self._activity.create(self.session, data))
 
     async def assign_user_to_activity_item(self, data: CreateUserActivityDto) -> ActivityUserBase:
         """Assign the employee to a specific activity so they can track their hours on it, ADMIN ONLY"""
-        return await self._activity_user.create(self.session, data)
+        result = await self.unit_of_work().run(lambda: self._activity_user.create(self.session, data))
+        await self._snapshots.invalidate(data.user_id)
+        return result
 
     async def get_activities_by_user(self, user_id: UUID) -> List[ActivityWithType]:
         """Get all activity items performed by an employee"""
@@ -61,6 +71,9 @@ class ActivityService(BaseService):
         activity_items = [item for item in user_found.activity_items]
         return activity_items
 
+    async def get_activities_by_user_version(self, user_id: UUID) -> str:
+        return await self._activity.get_user_activities_version(self.session, user_id)
+
     async def get_all_tasks(self, user_id: UUID) -> List[ActivityTaskBase]:
         """Get all tasks for a given user_id"""
         model = self._activity_task.model
@@ -68,61 +81,92 @@ class ActivityService(BaseService):
 
     async def add_activity_task(self, data: CreateActivityTaskDto, user_id: UUID) -> ActivityTaskBase:
         """An employee will add their own task for tracking for a specific activity"""
-        return await self._activity_task.create(
-            self.session, ActivityTaskBase(title=data.title, activity_id=data.activity_id, user_id=user_id)
-        )
+        task_data = ActivityTaskBase(title=data.title, activity_id=data.activity_id, user_id=user_id)
+        result = await self.unit_of_work().run(lambda: self._activity_task.create(self.session, task_data))
+        await self._snapshots.invalidate(user_id)
+        return result
 
     async def batch_worklog(self, data: TaskBatchDto, user_id: UUID) -> List[WorklogBase]:
         """An employee will record their time (hours) spent on given tasks"""
-        to_delete: List[WorklogBase] = []
-        upserted_logs: List[WorklogBase] = []
-        to_upsert: List[WorklogBase] = []
-        task_deletions: List[UUID] = data.deletions
-        await self._activity_task.delete_many(
-            self.session, [ActivityTaskBase.model.id.in_(task_deletions)], commit=False
-        )
-        for task in data.tasks:
-            affected_dates = {item.date for item in task.worklogs}
+        worklogs, changed_dates = await self.unit_of_work().run(lambda: self._batch_worklog(data, user_id))
+        await self._snapshots.invalidate(user_id, changed_dates)
+        return worklogs
 
-            task_data = ActivityTaskBase(title=task.title, activity_id=task.activity_id, id=task.id, user_id=user_id)
-            current_task = await self._activity_task.upsert_one(self.session, task_data, commit=False)
+    async def _batch_worklog(self, data: TaskBatchDto, user_id: UUID) -> Tuple[List[WorklogBase], Optional[Set[Date]]]:
+        """Returns the saved worklogs and the dates of the journal changed by the batch, None if tasks changed"""
+        await self._worklog.lock_user(self.session, user_id)
 
+        task_deletions: List[UUID] = sorted(data.deletions or [])
+        task_ids, tasks_changed = await self._upsert_batch_tasks(data.tasks, user_id)
+
+        # cells are identified by (task, date), the last value sent for a cell wins
+        cells: Dict[Tuple[UUID, Date], Optional[float]] = {}
+        for task in data.tasks:
+            task_id = task_ids[(task.title, task.activity_id)]
             for item in task.worklogs:
-                worklog = WorklogBase(
-                    id=item.id,
-                    date=item.date,
-                    duration=item.duration,
-                    activity_task_id=current_task.id,
-                    user_id=user_id,
-                )
-                if worklog.id and (worklog.duration is None or worklog.duration == 0):
-                    to_delete.append(worklog)
-                else:
-                    to_upsert.append(worklog)
-
-        upsert_result = await self._worklog.upsert_many(
-            self.session,
-            to_upsert,
-            commit=False,
-        )
-        upserted_logs.extend(upsert_result)
-        await self._worklog.delete_many(self.session, [Worklog.id.in_([item.id for item in to_delete])], commit=False)
+                cells[(task_id, item.date)] = item.duration or None
+
+        to_delete: List[Tuple[UUID, Date]] = []
+        to_upsert: List[WorklogBase] = []
+        # cells are written in key order, so concurrent writers lock rows in the same order
+        for (task_id, date), duration in sorted(cells.items(), key=lambda item: (str(item[0][0]), item[0][1])):
+            if duration is None:
+                to_delete.append((task_id, date))
+                continue
 
-        await self.session.flush()
+            to_upsert.append(WorklogBase(date=date, duration=duration, activity_task_id=task_id, user_id=user_id))
 
-        stmt = (
-            select(Worklog.date, func.sum(Worklog.duration))
-            .where(Worklog.user_id == user_id)
-            .where(Worklog.date.in_(affected_dates))
-            .group_by(Worklog.date)
-            .having(func.sum(Worklog.duration) > 8)
+        worklogs = await self._worklog.save_batch(
+            self.session, user_id, upserts=to_upsert, deletions=to_delete, task_deletions=task_deletions
         )
-        result = await self.session.execute(stmt)
-        errors = result.all()
 
-        if errors:
-            details = ", ".join([f"{r[0]} ({r[1]}h)" for r in errors])
-            raise BadRequestException(f"Daily limit exceeded: {details}")
+        # tasks show on every month of the journal, worklogs only on their own
+        changed_dates = None if task_deletions or tasks_changed else {date for _, date in cells}
+        return worklogs, changed_dates
+
+    async def set_worklog_cell(self, task_id: UUID, date: Date, data: SetWorklogCellDto, user_id: UUID) -> WorklogCell:
+        """An employee will set (or clear) the hours of a single task for a single day"""
+        result = await self.unit_of_work().run(lambda: self._set_worklog_cell(task_id, date, data.duration, user_id))
+        if not result:
+            raise NotFoundException("Task is not found")
+
+        await self._snapshots.invalidate(user_id, [date])
+
+        return WorklogCell(
+            id=result.id, task_id=task_id, date=date, duration=result.duration, day_total=result.day_total
+        )
 
-        await self.session.commit()
-        return upsert_result
+    async def _set_worklog_cell(
+        self, task_id: UUID, date: Date, duration: Optional[float], user_id: UUID
+    ) -> Optional[Row]:
+        """The cell is written once the other worklog writes of the user are committed, so its day total is current"""
+        await self._worklog.lock_user(self.session, user_id)
+        return await self._worklog.set_cell(self.session, user_id, task_id, date, duration)
+
+    async def _upsert_batch_tasks(
+        self, tasks: List[UpsertActivityTask], user_id: UUID
+    ) -> Tuple[Dict[Tuple[str, UUID], UUID], bool]:
+        """
+        Upsert all tasks of a batch, returns the task ids keyed by (title, activity_id) so worklogs of tasks
+        created by the batch can reference their new id, and whether any task was created or renamed.
+        Clients don't need to know task ids, tasks without one are matched on their natural key (title, activity_id).
+        """
+        if not tasks:
+            return {}, False
+
+        keys = [(task.title, task.activity_id) for task in tasks]
+        if len(set(keys)) != len(keys):
+            raise BadRequestException("A task is sent more than once for the same activity")
+
+        tasks_data = [
+            ActivityTaskBase(title=task.title, activity_id=task.activity_id, id=task.id, user_id=user_id)
+            for task in tasks
+        ]
+        upserted_tasks, touched = await self._activity_task.save_for_user(self.session, user_id, tasks_data)
+
+        task_ids = {(task.title, task.activity_id): task.id for task in upserted_tasks}
+        for title, activity_id in keys:
+            if (title, activity_id) not in task_ids:
+                raise BadRequestException(f"Task '{title}' already exists for this activity")
+
+        return task_ids, touched > 0
@@ -31,6 +31,9 @@ class AuthService(BaseService):
         return self._user
 
     async def register(self, data: RegisterUserDto) -> UserWithoutPassword:
+        return await self.unit_of_work().run(lambda: self._register(data))
+
+    async def _register(self, data: RegisterUserDto) -> UserWithoutPassword:
         try:
             # verify if exists, will throw if not by default
             found_user = await self._user.get_one(
@@ -55,6 +58,9 @@ class AuthService(BaseService):
             raise e
 
     async def login(self, data: LoginUserDto) -> UserSession:
+        return await self.unit_of_work().run(lambda: self._login(data))
+
+    async def _login(self, data: LoginUserDto) -> UserSession:
         try:
             found_user: UserBase = await self._user.get_one(self.session, data.email, field=self._user.model.email)
 
@@ -80,6 +86,9 @@ class AuthService(BaseService):
             raise e
 
     async def refresh_session(self, rt_encoding: str) -> UserSession:
+        return await self.unit_of_work().run(lambda: self._refresh_session(rt_encoding))
+
+    async def _refresh_session(self, rt_encoding: str) -> UserSession:
         try:
             credentials_exception = HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,318 @@
+import asyncio
+import json
+import logging
+import secrets
+import time
+from datetime import date as Date
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import session_manager
+from app.core.exceptions import AppException
+from app.domain.activity_task import ActivityTaskBase
+from app.domain.worklog import WorklogBase
+from app.dto.activity import AutosaveDto, AutosaveError, AutosaveStatus
+from app.dto.journal import JournalDocument
+from app.redis_client import RedisClient, get_redis_client
+from app.services.base import BaseService
+from app.services.journal_snapshot import JournalSnapshots
+
+logger = logging.getLogger("uvicorn")
+logger.setLevel(logging.INFO)
+
+Cell = Tuple[UUID, Date]
+
+# errors caused by the edited values themselves, retrying them can't succeed
+REJECTED_EDIT_ERRORS = (AppException, ValueError, IntegrityError)
+
+
+class AutosaveService(BaseService):
+    """
+    Write-behind buffer for the journal cell edits.
+
+    Edits are written to a per-user Redis hash (one field per task and date, the last write wins) and the
+    user is marked dirty. The `AutosaveFlusher` later moves the buffer aside and writes all of its edits
+    with one bulk upsert, so an editing session costs a few transactions instead of one per keystroke.
+    """
+
+    KEY_PREFIX: str = "autosave"
+    DIRTY_KEY: str = "autosave:dirty"
+    PENDING_SINCE_KEY: str = "autosave:pending_since"
+
+    # a user is flushed once they stopped editing for DEBOUNCE_SECONDS, or at least every MAX_DELAY_SECONDS
+    DEBOUNCE_SECONDS: float = 2.0
+    MAX_DELAY_SECONDS: float = 30.0
+    # safety net, buffers are flushed well before expiring
+    BUFFER_TTL_SECONDS: int = 60 * 60 * 24
+    ERRORS_TTL_SECONDS: int = 60 * 60 * 24
+    LOCK_SECONDS: int = 60
+
+    # Moves the buffer into the flushing hash (merged, a previous failed flush may still be there) and clears
+    # the dirty marks in one step, edits arriving afterwards go to a new buffer and mark the user dirty again.
+    _TAKE_BUFFER_SCRIPT = """
+    local fields = redis.call("HGETALL", KEYS[1])
+    if #fields > 0 then
+        redis.call("HSET", KEYS[2], unpack(fields))
+        redis.call("DEL", KEYS[1])
+    end
+    redis.call("ZREM", KEYS[3], ARGV[1])
+    redis.call("ZREM", KEYS[4], ARGV[1])
+    return redis.call("HGETALL", KEYS[2])
+    """
+
+    def __init__(self, session: AsyncSession, redis: Optional[RedisClient] = None):
+        super().__init__(session)
+        self.redis = redis or get_redis_client()
+
+    @classmethod
+    def _buffer_key(cls, user_id: UUID | str) -> str:
+        return f"{cls.KEY_PREFIX}:{user_id}"
+
+    @classmethod
+    def _flushing_key(cls, user_id: UUID | str) -> str:
+        return f"{cls.KEY_PREFIX}:{user_id}:flushing"
+
+    @classmethod
+    def _errors_key(cls, user_id: UUID | str) -> str:
+        return f"{cls.KEY_PREFIX}:{user_id}:errors"
+
+    @classmethod
+    def _lock_key(cls, user_id: UUID | str) -> str:
+        return f"{cls.KEY_PREFIX}:{user_id}:lock"
+
+    @staticmethod
+    def _field(task_id: UUID, date: Date) -> str:
+        return f"{task_id}:{date.isoformat()}"
+
+    @staticmethod
+    def _parse_field(field: str) -> Cell:
+        task_id, date = field.split(":", 1)
+        return UUID(task_id), Date.fromisoformat(date)
+
+    @classmethod
+    def _parse_buffer(cls, buffer: Dict[str, Optional[float]]) -> Dict[Cell, Optional[float]]:
+        return {cls._parse_field(field): duration for field, duration in buffer.items()}
+
+    async def save_cells(self, data: AutosaveDto, user_id: UUID) -> AutosaveStatus:
+        """Buffer the cell edits of a user, returns the pending edits count and the edits rejected since last save"""
+        edits = {self._field(cell.task_id, cell.date): cell.duration or None for cell in data.cells}
+
+        now = time.time()
+        user = str(user_id)
+        await self.redis.hset(self._buffer_key(user_id), edits, ex=self.BUFFER_TTL_SECONDS)
+        await self.redis.zadd(self.DIRTY_KEY, {user: now})
+        await self.redis.zadd(self.PENDING_SINCE_KEY, {user: now}, nx=True)
+        pending = await self.redis.hlen(self._buffer_key(user_id))
+
+        return AutosaveStatus(pending=pending, errors=await self._pop_errors(user_id))
+
+    async def _pop_errors(self, user_id: UUID) -> List[AutosaveError]:
+        errors_key = self._errors_key(user_id)
+        errors = await self.redis.hgetall(errors_key)
+        if not errors:
+            return []
+
+        await self.redis.delete(errors_key)
+        result = []
+        for field, message in errors.items():
+            task_id, date = self._parse_field(field)
+            result.append(AutosaveError(task_id=task_id, date=date, message=message))
+        return result
+
+    async def get_pending(self, user_id: UUID) -> Dict[Cell, Optional[float]]:
+        """Edits of the user not yet written to the database, the buffer takes precedence over an ongoing flush"""
+        flushing = await self.redis.hgetall(self._flushing_key(user_id), as_json=True)
+        buffer = await self.redis.hgetall(self._buffer_key(user_id), as_json=True)
+        return self._parse_buffer({**flushing, **buffer})
+
+    async def merge_pending(
+        self, journal: JournalDocument, user_id: UUID, start_date: Date, end_date: Date
+    ) -> JournalDocument:
+        """Apply the pending edits of the user to their journal, so they always read their own writes"""
+        pending = await self.get_pending(user_id)
+
+        edits_by_task: Dict[str, Dict[str, Optional[float]]] = {}
+        for (task_id, date), duration in pending.items():
+            if start_date <= date <= end_date:
+                edits_by_task.setdefault(str(task_id), {})[date.isoformat()] = duration
+
+        if not edits_by_task:
+            return journal
+
+        for activity in journal:
+            for task in activity["tasks"]:
+                edits = edits_by_task.get(task["id"])
+                if not edits:
+                    continue
+
+                worklogs = {worklog["date"]: worklog for worklog in task["worklogs"]}
+                for date, duration in edits.items():
+                    if duration is None:
+                        worklogs.pop(date, None)
+                    elif date in worklogs:
+                        worklogs[date]["duration"] = duration
+                    else:
+                        worklogs[date] = {"id": None, "date": date, "duration": duration}
+
+                task["worklogs"] = sorted(worklogs.values(), key=lambda worklog: worklog["date"])
+
+        return journal
+
+    async def flush(self, user_id: UUID) -> int:
+        """
+        Write the buffered edits of a user to the database, returns the number of edits written.
+        Edits rejected by the database are recorded for the user and discarded, the buffer is kept
+        for a later flush on any other failure.
+        """
+        lock_key = self._lock_key(user_id)
+        token = secrets.token_hex(16)
+        if not await self.redis.set(lock_key, token, ex=self.LOCK_SECONDS, nx=True):
+            return 0
+
+        try:
+            keys = [self._buffer_key(user_id), self._flushing_key(user_id), self.DIRTY_KEY, self.PENDING_SINCE_KEY]
+            flat = await self.redis.eval(self._TAKE_BUFFER_SCRIPT, keys, [str(user_id)])
+            edits = self._parse_buffer({field: json.loads(value) for field, value in zip(flat[::2], flat[1::2])})
+            if not edits:
+                return 0
+
+            try:
+                written = await self.unit_of_work().run(lambda: self._write(user_id, edits))
+            except REJECTED_EDIT_ERRORS:
+                # a single cell fails the whole batch (e.g. the daily cap), find it by writing cells one by one
+                written = await self._write_each(user_id, edits)
+
+            await self.redis.delete(self._flushing_key(user_id))
+            await JournalSnapshots(self.redis).invalidate(user_id, {date for _, date in edits})
+            return written
+        except Exception as e:
+            # the flushing hash is kept and merged with newer edits on the next attempt
+            now = time.time()
+            await self.redis.zadd(self.DIRTY_KEY, {str(user_id): now})
+            await self.redis.zadd(self.PENDING_SINCE_KEY, {str(user_id): now}, nx=True)
+            raise e
+        finally:
+            await self.redis.delete_if_equals(lock_key, token)
+
+    async def _write(self, user_id: UUID, edits: Dict[Cell, Optional[float]]) -> int:
+        """Bulk write the edits: one delete for the cleared cells and one upsert for the others"""
+        await WorklogBase.lock_user(self.session, user_id)
+
+        task_ids = {task_id for task_id, _ in edits}
+        model = ActivityTaskBase.model
+        owned_tasks = await ActivityTaskBase.get_all(
+            self.session, where_clause=[model.id.in_(task_ids), model.user_id == user_id], limit=None
+        )
+        owned_task_ids = {task.id for task in owned_tasks}
+
+        cleared: List[Cell] = []
+        upserts: List[WorklogBase] = []
+        for (task_id, date), duration in sorted(edits.items(), key=lambda item: (str(item[0][0]), item[0][1])):
+            if task_id not in owned_task_ids:
+                continue
+
+            if duration is None:
+                cleared.append((task_id, date))
+            else:
+                upserts.append(WorklogBase(date=date, duration=duration, activity_task_id=task_id, user_id=user_id))
+
+        worklog = WorklogBase.model
+        if cleared:
+            await WorklogBase.delete_many(
+                self.session,
+                [worklog.user_id == user_id, tuple_(worklog.activity_task_id, worklog.date).in_(cleared)],
+            )
+
+        if upserts:
+            await WorklogBase.upsert_many(
+                self.session, upserts, constraint=WorklogBase.CELL_CONSTRAINT, skip_unchanged=True
+            )
+
+        return len(cleared) + len(upserts)
+
+    async def _write_each(self, user_id: UUID, edits: Dict[Cell, Optional[float]]) -> int:
+        errors: Dict[str, str] = {}
+        written = 0
+        for cell, duration in edits.items():
+            try:
+                written += await self.unit_of_work().run(lambda edit={cell: duration}: self._write(user_id, edit))
+            except REJECTED_EDIT_ERRORS as e:
+                errors[self._field(*cell)] = getattr(e, "message", None) or str(getattr(e, "orig", e))
+
+        if errors:
+            logger.info(f"[AutosaveService]: {len(errors)} edits of user {user_id} were rejected")
+            await self.redis.hset(self._errors_key(user_id), errors, ex=self.ERRORS_TTL_SECONDS)
+
+        return written
+
+
+class AutosaveFlusher:
+    """
+    Background task flushing the autosave buffers of the users that are due, started with the application.
+    On shutdown every pending buffer is flushed regardless of the debounce.
+    """
+
+    def __init__(self, *, interval_seconds: float = 1.0, batch_size: int = 100):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        try:
+            await self.flush_due(force=True)
+        except Exception as e:
+            logger.error(f"[AutosaveFlusher]: final flush failed: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.flush_due()
+            except Exception as e:
+                logger.error(f"[AutosaveFlusher]: flush failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def _due_users(self, redis: RedisClient, force: bool) -> List[str]:
+        if force:
+            return await redis.zrangebyscore(AutosaveService.DIRTY_KEY, "-inf", "+inf")
+
+        now = time.time()
+        idle = await redis.zrangebyscore(
+            AutosaveService.DIRTY_KEY, "-inf", now - AutosaveService.DEBOUNCE_SECONDS, limit=self.batch_size
+        )
+        overdue = await redis.zrangebyscore(
+            AutosaveService.PENDING_SINCE_KEY, "-inf", now - AutosaveService.MAX_DELAY_SECONDS, limit=self.batch_size
+        )
+        return list(dict.fromkeys(idle + overdue))
+
+    async def flush_due(self, *, force: bool = False) -> int:
+        """Flush the users that stopped editing or waited too long, returns the number of edits written"""
+        redis = get_redis_client()
+        written = 0
+        for user_id in await self._due_users(redis, force):
+            try:
+                async with session_manager.session() as session:
+                    written += await AutosaveService(session, redis).flush(UUID(user_id))
+            except Exception as e:
+                logger.error(f"[AutosaveFlusher]: failed to flush user {user_id}: {e}")
+        return written
+
+
+autosave_flusher = AutosaveFlusher()
@@ -2,6 +2,8 @@ from abc import ABC
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database.unit_of_work import UnitOfWork
+
 
 class BaseService(ABC):
     """
@@ -10,3 +12,7 @@ class BaseService(ABC):
 
     def __init__(self, session: AsyncSession):
         self.session = session
+
+    def unit_of_work(self, **kwargs) -> UnitOfWork:
+        """Create a unit of work over the service session, so an operation commits exactly once"""
+        return UnitOfWork(self.session, **kwargs)
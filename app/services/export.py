@@ -0,0 +1,142 @@
+import asyncio
+import csv
+import io
+import tempfile
+import zlib
+from typing import IO, AsyncIterator, Sequence
+
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.exceptions import BadRequestException
+from app.domain.worklog import WorklogBase
+from app.dto.report import ExportFormat, ExportWorklogsDto
+from app.services.base import BaseService
+
+try:
+    import xlsxwriter
+except ImportError:  # optional, installed with the `xlsx` extra
+    xlsxwriter = None
+
+HEADER = ["Date", "Employee", "Email", "Activity type", "Activity code", "Activity", "Task", "Hours"]
+
+
+class ExportService(BaseService):
+    MAX_EXPORT_DAYS: int = 366
+    # rows fetched per round trip from the server-side cursor, an export never holds more than one batch
+    BATCH_SIZE: int = 5000
+    # size of the chunks an XLSX file is sent in
+    CHUNK_SIZE: int = 64 * 1024
+    # rows of an XLSX worksheet (header included), the following rows go on to a new worksheet
+    MAX_SHEET_ROWS: int = 1_048_576
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def export_filename(data: ExportWorklogsDto) -> str:
+        extension = "csv.gz" if data.format == ExportFormat.CSV and data.gzip else data.format.value
+        return f"worklogs-{data.start_date}-{data.end_date}.{extension}"
+
+    @staticmethod
+    def export_media_type(data: ExportWorklogsDto) -> str:
+        if data.format == ExportFormat.XLSX:
+            return "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        return "application/gzip" if data.gzip else "text/csv; charset=utf-8"
+
+    async def export_worklogs(self, data: ExportWorklogsDto) -> AsyncIterator[bytes]:
+        """
+        The worklogs of all users for a period as chunks of a CSV (optionally gzipped) or XLSX file, the request is
+        validated right away and the rows are read while the export is streamed.
+
+        The export reads from a server-side cursor on a connection of its own, checked out once streaming starts
+        and released as soon as the last row is read (or the client is gone). The request session is closed
+        beforehand, so its connection goes back to the pool instead of waiting for the end of the download.
+        """
+        days = (data.end_date - data.start_date).days + 1
+        if not 0 < days <= self.MAX_EXPORT_DAYS:
+            raise BadRequestException(f"The period must span 1 to {self.MAX_EXPORT_DAYS} days")
+
+        if data.format == ExportFormat.XLSX and xlsxwriter is None:
+            raise BadRequestException("XLSX exports are not available, install the `xlsx` extra")
+
+        engine = self.session.bind
+        await self.session.close()
+
+        batches = self._batches(engine, WorklogBase.export_statement(data.start_date, data.end_date))
+        if data.format == ExportFormat.XLSX:
+            return self._xlsx(batches)
+        return self._csv(batches, compress=data.gzip)
+
+    async def _batches(self, engine: AsyncEngine, stmt: Select) -> AsyncIterator[Sequence[Row]]:
+        async with engine.connect() as connection:
+            result = await connection.stream(stmt.execution_options(yield_per=self.BATCH_SIZE))
+            async for rows in result.partitions():
+                yield rows
+
+    async def _csv(self, batches: AsyncIterator[Sequence[Row]], compress: bool) -> AsyncIterator[bytes]:
+        """One chunk per batch of rows, compressed as a single gzip member"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+
+        def take() -> bytes:
+            chunk = buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            return compressor.compress(chunk) if compressor else chunk
+
+        writer.writerow(HEADER)
+        async for rows in batches:
+            writer.writerows(rows)
+            if chunk := take():
+                yield chunk
+
+        chunk = take() + (compressor.flush() if compressor else b"")
+        if chunk:
+            yield chunk
+
+    async def _xlsx(self, batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+        """
+        The workbook is written in constant memory mode (rows are flushed to disk as they are written) into a
+        temporary file, sent once complete as the archive can only be finalized at the end. Writing is offloaded
+        to a thread, so the event loop is not blocked by large batches.
+        """
+        with tempfile.TemporaryFile() as file:
+            sheets = _XlsxSheets(file, self.MAX_SHEET_ROWS)
+            async for rows in batches:
+                await asyncio.to_thread(sheets.write, rows)
+            await asyncio.to_thread(sheets.close)
+
+            file.seek(0)
+            while chunk := await asyncio.to_thread(file.read, self.CHUNK_SIZE):
+                yield chunk
+
+
+class _XlsxSheets:
+    """Worksheets of the XLSX export, rows go on to a new worksheet once one is full"""
+
+    def __init__(self, file: IO[bytes], max_rows: int):
+        self.workbook = xlsxwriter.Workbook(file, {"constant_memory": True})
+        self.date_format = self.workbook.add_format({"num_format": "yyyy-mm-dd"})
+        self.max_rows = max_rows
+        self.sheet = None
+        self.row = max_rows
+
+    def write(self, rows: Sequence[Row]) -> None:
+        for date, *names, duration in rows:
+            if self.row >= self.max_rows:
+                self.sheet = self.workbook.add_worksheet(f"Worklogs {len(self.workbook.worksheets()) + 1}")
+                self.sheet.write_row(0, 0, HEADER)
+                self.row = 1
+
+            self.sheet.write_datetime(self.row, 0, date, self.date_format)
+            self.sheet.write_row(self.row, 1, names)
+            self.sheet.write_number(self.row, len(HEADER) - 1, float(duration))
+            self.row += 1
+
+    def close(self) -> None:
+        if self.sheet is None:
+            self.sheet = self.workbook.add_worksheet("Worklogs 1")
+            self.sheet.write_row(0, 0, HEADER)
+        self.workbook.close()
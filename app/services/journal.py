@@ -1,16 +1,158 @@
-from typing import List
+import hashlib
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.exceptions import AppException, BadRequestException
 from app.domain.activity import ActivityBase
-from app.dto.journal import GetJournalDto, JournalActivity
+from app.domain.activity_task import ActivityTaskBase
+from app.domain.tombstone import SyncTombstoneBase
+from app.domain.user import UserBase
+from app.domain.worklog import WorklogBase, WorklogDailyTotalBase
+from app.dto.journal import GetJournalDto, GetTeamJournalDto, JournalDelta, JournalDocument
+from app.services.autosave import AutosaveService
 from app.services.base import BaseService
+from app.services.journal_matrix import build_journal_matrix, build_team_matrix
+from app.services.journal_pivot import JournalPivot
+from app.services.journal_snapshot import JournalSnapshots
+
+logger = logging.getLogger("uvicorn")
+logger.setLevel(logging.INFO)
 
 
 class JournalService(BaseService):
+    # rows are stamped with the start time of their transaction, a transaction still running when a watermark
+    # is taken commits rows older than it, changes made shortly before the watermark are sent again to catch them
+    SYNC_OVERLAP: timedelta = timedelta(seconds=30)
+    MAX_MATRIX_DAYS: int = 366
+    MAX_TEAM_USERS: int = 200
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_journal(self, data: GetJournalDto, user_id: UUID) -> List[JournalActivity]:
-        return await ActivityBase.get_journal(self.session, user_id, data.start_date, data.end_date)
+    async def get_journal(self, data: GetJournalDto, user_id: UUID) -> JournalDocument:
+        """
+        The journal of the user, including their autosaved edits not yet written to the database.
+        Whole months are served from their snapshot when it is still current.
+        """
+        journal = await self._get_saved_journal(data, user_id)
+        try:
+            autosave_service = AutosaveService(self.session)
+            return await autosave_service.merge_pending(journal, user_id, data.start_date, data.end_date)
+        except Exception as e:
+            logger.error(f"[JournalService]: could not merge autosaved edits of user {user_id}: {e}")
+            return journal
+
+    async def get_journal_matrix(self, data: GetJournalDto, user_id: UUID) -> Dict[str, Any]:
+        """The journal of the user in columnar form, see `build_journal_matrix`"""
+        days = (data.end_date - data.start_date).days + 1
+        if not 0 < days <= self.MAX_MATRIX_DAYS:
+            raise BadRequestException(f"The period must span 1 to {self.MAX_MATRIX_DAYS} days")
+
+        journal = await self.get_journal(data, user_id)
+        return build_journal_matrix(journal, data.start_date, data.end_date)
+
+    async def get_team_journal(self, data: GetTeamJournalDto) -> Dict[str, Any]:
+        """
+        The journals of a team in a single matrix, see `build_team_matrix`. Read in three queries whatever the
+        size of the team: the members, their tasks and the worklogs of those tasks, scattered into one pivot grid.
+        Only worklogs written to the database are included, edits still buffered by autosave are not.
+        """
+        days = (data.end_date - data.start_date).days + 1
+        if not 0 < days <= self.MAX_MATRIX_DAYS:
+            raise BadRequestException(f"The period must span 1 to {self.MAX_MATRIX_DAYS} days")
+
+        users = await UserBase.get_team(self.session, activity_id=data.activity_id, user_ids=data.user_ids)
+        if len(users) > self.MAX_TEAM_USERS:
+            raise BadRequestException(f"A team is limited to {self.MAX_TEAM_USERS} employees")
+
+        user_ids = [user.id for user in users]
+        tasks = await ActivityTaskBase.get_team_tasks(self.session, user_ids, activity_id=data.activity_id)
+        pivot = JournalPivot(
+            data.start_date, data.end_date, [task.id for task in tasks], task_users=[task.user_id for task in tasks]
+        )
+        await pivot.load(self.session, user_ids)
+        return build_team_matrix(pivot, users, tasks)
+
+    async def get_journal_version(self, data: GetJournalDto, user_id: UUID) -> Optional[str]:
+        """Validator of the journal, None if it can't be determined (delta requests, autosave buffer unavailable)"""
+        if data.since:
+            return None
+
+        version = await ActivityBase.get_journal_version(self.session, user_id, data.start_date, data.end_date)
+        try:
+            pending = await AutosaveService(self.session).get_pending(user_id)
+        except Exception as e:
+            logger.error(f"[JournalService]: could not read autosaved edits of user {user_id}: {e}")
+            return None
+
+        if pending:
+            edits = sorted((str(task_id), date.isoformat(), duration) for (task_id, date), duration in pending.items())
+            version += "|" + hashlib.sha256(repr(edits).encode()).hexdigest()
+
+        return version
+
+    async def _get_saved_journal(self, data: GetJournalDto, user_id: UUID) -> JournalDocument:
+        month = JournalSnapshots.month_of(data.start_date, data.end_date)
+        if not month:
+            return await ActivityBase.get_journal(self.session, user_id, data.start_date, data.end_date)
+
+        snapshots = JournalSnapshots()
+        # versions are read before the journal, a write committed in between makes the new snapshot stale
+        versions = await snapshots.versions(user_id, month)
+        if versions is None:
+            return await ActivityBase.get_journal(self.session, user_id, data.start_date, data.end_date)
+
+        source = await ActivityBase.get_journal_version(self.session, user_id, data.start_date, data.end_date)
+        journal = await snapshots.get(user_id, month, versions, source)
+        if journal is not None:
+            return journal
+
+        journal = await ActivityBase.get_journal(self.session, user_id, data.start_date, data.end_date)
+        await snapshots.save(user_id, month, versions, source, journal)
+        return journal
+
+    async def get_journal_delta(self, data: GetJournalDto, user_id: UUID) -> JournalDelta:
+        """
+        Tasks and worklogs of the user changed or deleted since the given watermark, along with the next watermark.
+        Clients apply changes by id, so receiving a change twice is harmless.
+        """
+        watermark = await SyncTombstoneBase.get_watermark(self.session)
+        if data.since < watermark - timedelta(days=SyncTombstoneBase.RETENTION_DAYS):
+            raise AppException(status_code=410, message="Watermark is too old, fetch the full journal")
+
+        changed_after = data.since - self.SYNC_OVERLAP
+
+        task = ActivityTaskBase.model
+        tasks = await ActivityTaskBase.get_all(
+            self.session, where_clause=[task.user_id == user_id, task.updated_at > changed_after], limit=None
+        )
+
+        worklog = WorklogBase.model
+        worklogs = await WorklogBase.get_all(
+            self.session,
+            where_clause=[
+                worklog.user_id == user_id,
+                worklog.updated_at > changed_after,
+                worklog.date.between(data.start_date, data.end_date),
+            ],
+            limit=None,
+        )
+
+        tombstones = await SyncTombstoneBase.get_since(
+            self.session, user_id, changed_after, data.start_date, data.end_date
+        )
+
+        return JournalDelta(
+            watermark=watermark,
+            tasks=tasks,
+            worklogs=worklogs,
+            deleted_tasks=[item.entity_id for item in tombstones if item.entity == SyncTombstoneBase.ACTIVITY_TASK],
+            deleted_worklogs=[item.entity_id for item in tombstones if item.entity == SyncTombstoneBase.WORKLOG],
+        )
+
+    async def get_daily_totals(self, data: GetJournalDto, user_id: UUID) -> List[WorklogDailyTotalBase]:
+        return await WorklogDailyTotalBase.get_range(self.session, user_id, data.start_date, data.end_date)
@@ -0,0 +1,118 @@
+from collections import defaultdict
+from datetime import date as Date
+from typing import Any, Dict, Sequence
+
+import numpy as np
+from sqlalchemy import Row
+
+from app.dto.journal import JournalDocument
+from app.services.journal_pivot import JournalPivot
+
+
+def build_journal_matrix(journal: JournalDocument, start_date: Date, end_date: Date) -> Dict[str, Any]:
+    """
+    Columnar form of the journal document: the dates of the period are sent once, each task carries parallel
+    `durations` and `ids` arrays (null for empty days) instead of a worklog object per cell, along with its total.
+    Totals per day (`dayTotals`, parallel to `dates`), the days over the daily cap (`overCap`) and the total of
+    the whole period are included.
+    """
+    tasks = [task for activity in journal for task in activity["tasks"]]
+    pivot = JournalPivot(start_date, end_date, [task["id"] for task in tasks])
+
+    cells = [(task["id"], worklog) for task in tasks for worklog in task["worklogs"]]
+    if cells:
+        pivot.scatter(
+            [task_id for task_id, _ in cells],
+            pivot.offsets([worklog["date"] for _, worklog in cells]),
+            [worklog["duration"] for _, worklog in cells],
+            ids=[worklog["id"] for _, worklog in cells],
+        )
+
+    durations = pivot.duration_rows()
+    ids = pivot.id_rows()
+    task_totals = pivot.hours(pivot.task_totals)
+    day_totals = pivot.day_totals
+
+    activities = []
+    row = 0
+    for activity in journal:
+        matrix_tasks = []
+        for task in activity["tasks"]:
+            matrix_tasks.append(
+                {
+                    "id": task["id"],
+                    "title": task["title"],
+                    "activityId": task["activityId"],
+                    "durations": durations[row],
+                    "ids": ids[row],
+                    "total": task_totals[row],
+                }
+            )
+            row += 1
+
+        activities.append(
+            {
+                "id": activity["id"],
+                "title": activity["title"],
+                "code": activity["code"],
+                "activityType": activity["activityType"],
+                "tasks": matrix_tasks,
+            }
+        )
+
+    return {
+        "dates": [date.isoformat() for date in pivot.dates],
+        "dayTotals": pivot.hours(day_totals),
+        "overCap": pivot.over_cap[0].tolist(),
+        "total": round(float(day_totals.sum(dtype="float64")), 1),
+        "activities": activities,
+    }
+
+
+def build_team_matrix(pivot: JournalPivot, users: Sequence[Row], tasks: Sequence[Row]) -> Dict[str, Any]:
+    """
+    Users × tasks × days form of a team journal: the dates of the period are sent once, each user carries their
+    tasks with `durations` arrays parallel to them (null for empty days), their totals per day (`dayTotals`) and
+    their total. Totals per day of the whole team and the team total are included.
+
+    Rows of the pivot are the given tasks, in the same order, users without any task are sent without tasks.
+    """
+    durations = pivot.duration_rows()
+    task_totals = pivot.hours(pivot.task_totals)
+
+    user_tasks = defaultdict(list)
+    for row, task in enumerate(tasks):
+        user_tasks[task.user_id].append(
+            {
+                "id": task.id,
+                "title": task.title,
+                "activityId": task.activity_id,
+                "activityCode": task.activity_code,
+                "durations": durations[row],
+                "total": task_totals[row],
+            }
+        )
+
+    user_rows = {user: index for index, user in enumerate(pivot.users)}
+    user_day_totals = pivot.user_day_totals
+    members = []
+    for user in users:
+        row = user_rows.get(user.id)
+        day_totals = user_day_totals[row] if row is not None else np.zeros(pivot.days, dtype=np.float32)
+        members.append(
+            {
+                "id": user.id,
+                "fullName": user.full_name,
+                "dayTotals": pivot.hours(day_totals),
+                "total": round(float(day_totals.sum(dtype="float64")), 1),
+                "tasks": user_tasks[user.id],
+            }
+        )
+
+    day_totals = pivot.day_totals
+    return {
+        "dates": [date.isoformat() for date in pivot.dates],
+        "dayTotals": pivot.hours(day_totals),
+        "total": round(float(day_totals.sum(dtype="float64")), 1),
+        "users": members,
+    }
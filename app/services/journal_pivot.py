@@ -0,0 +1,136 @@
+from datetime import date as Date
+from datetime import timedelta
+from typing import Hashable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.worklog import WorklogBase, WorklogDailyTotalBase
+
+
+class JournalPivot:
+    """
+    Dense tasks × days grid of the worklogs of a period, rows are tasks (of one or several users) and columns
+    the days of the period. Cells are scattered from flat columns (task, day, duration) with vectorized
+    indexing, task and day totals, the daily totals of each user and the days over the daily cap are all
+    derived from the same `float32` array.
+    """
+
+    # hours are stored with one decimal, sums of float32 tenths are compared with this tolerance
+    TOLERANCE: float = 1e-3
+
+    def __init__(
+        self,
+        start_date: Date,
+        end_date: Date,
+        tasks: Sequence[Hashable],
+        task_users: Optional[Sequence[Hashable]] = None,
+    ):
+        """
+        Args:
+            start_date: First day of the period
+            end_date: Last day of the period (inclusive)
+            tasks: Task ids, in the order of the rows
+            task_users: User of each task (parallel to tasks), a single user if omitted
+        """
+        self.start_date = start_date
+        self.days = (end_date - start_date).days + 1
+        self.tasks = list(tasks)
+        self._rows = {task: index for index, task in enumerate(self.tasks)}
+
+        self.users: List[Hashable] = list(dict.fromkeys(task_users)) if task_users is not None else [None]
+        user_index = {user: index for index, user in enumerate(self.users)}
+        self._task_users = (
+            np.fromiter((user_index[user] for user in task_users), dtype=np.intp, count=len(self.tasks))
+            if task_users is not None
+            else np.zeros(len(self.tasks), dtype=np.intp)
+        )
+
+        shape = (len(self.tasks), self.days)
+        self.grid = np.zeros(shape, dtype=np.float32)
+        self.filled = np.zeros(shape, dtype=bool)
+        self.ids = np.full(shape, None, dtype=object)
+
+    @property
+    def dates(self) -> List[Date]:
+        return [self.start_date + timedelta(days=offset) for offset in range(self.days)]
+
+    def offsets(self, dates: Sequence[Date | str]) -> np.ndarray:
+        """Day offsets within the period of dates (or ISO strings)"""
+        return (np.array(dates, dtype="datetime64[D]") - np.datetime64(self.start_date, "D")).astype(np.intp)
+
+    def scatter(
+        self,
+        tasks: Sequence[Hashable],
+        offsets: Sequence[int] | np.ndarray,
+        durations: Sequence[Optional[float]],
+        ids: Optional[Sequence[Optional[Hashable]]] = None,
+    ) -> None:
+        """
+        Write cells given as parallel columns, later cells overwrite earlier ones and a null duration clears
+        the cell. Cells of unknown tasks or outside of the period are ignored.
+        """
+        count = len(tasks)
+        if not count:
+            return
+
+        rows = np.fromiter((self._rows.get(task, -1) for task in tasks), dtype=np.intp, count=count)
+        columns = np.asarray(offsets, dtype=np.intp)
+        values = np.array([np.nan if duration is None else duration for duration in durations], dtype=np.float32)
+        keep = (rows >= 0) & (columns >= 0) & (columns < self.days)
+        rows, columns, values = rows[keep], columns[keep], values[keep]
+
+        cleared = np.isnan(values)
+        self.grid[rows, columns] = np.where(cleared, 0, values)
+        self.filled[rows, columns] = ~cleared
+        if ids is not None:
+            cell_ids = np.empty(count, dtype=object)
+            cell_ids[:] = ids
+            self.ids[rows, columns] = np.where(cleared, None, cell_ids[keep])
+        else:
+            self.ids[rows[cleared], columns[cleared]] = None
+
+    @property
+    def task_totals(self) -> np.ndarray:
+        return self.grid.sum(axis=1)
+
+    @property
+    def day_totals(self) -> np.ndarray:
+        """Hours per day across all rows, per user see `user_day_totals`"""
+        return self.grid.sum(axis=0)
+
+    @property
+    def user_day_totals(self) -> np.ndarray:
+        """Hours per user (in the order of `users`) and day"""
+        totals = np.zeros((len(self.users), self.days), dtype=np.float32)
+        np.add.at(totals, self._task_users, self.grid)
+        return totals
+
+    @property
+    def over_cap(self) -> np.ndarray:
+        """Days over the daily cap per user (in the order of `users`)"""
+        return self.user_day_totals > WorklogDailyTotalBase.DAILY_CAP_HOURS + self.TOLERANCE
+
+    @staticmethod
+    def hours(values: np.ndarray) -> list:
+        """Hours as JSON-ready floats, float32 values are rounded back to their single decimal"""
+        return np.round(values.astype(np.float64), 1).tolist()
+
+    def duration_rows(self) -> List[List[Optional[float]]]:
+        """Durations per task, null for empty cells"""
+        return np.where(self.filled, np.round(self.grid.astype(np.float64), 1), None).tolist()
+
+    def id_rows(self) -> List[List[Optional[Hashable]]]:
+        return self.ids.tolist()
+
+    async def load(self, session: AsyncSession, user_ids: Sequence[Hashable]) -> None:
+        """
+        Scatter the worklogs of the users within the period, read from the database as flat columns. Only the
+        worklogs of the tasks of the pivot are read.
+        """
+        if not self.tasks:
+            return
+
+        end_date = self.start_date + timedelta(days=self.days - 1)
+        columns = await WorklogBase.get_columns(session, list(user_ids), self.start_date, end_date, task_ids=self.tasks)
+        self.scatter(columns.task_ids, columns.offsets, columns.durations, ids=columns.ids)
@@ -0,0 +1,88 @@
+import calendar
+import logging
+from datetime import date as Date
+from typing import Iterable, List, Optional
+from uuid import UUID
+
+from app.dto.journal import JournalDocument
+from app.redis_client import RedisClient, get_redis_client
+
+logger = logging.getLogger("uvicorn")
+logger.setLevel(logging.INFO)
+
+
+class JournalSnapshots:
+    """
+    Precomputed journals of a user for a whole month, stored in Redis.
+
+    Every snapshot is saved along with the versions of the user journal it was built from: a version for
+    the whole journal (bumped by task and assignment changes, which show on every month) and a version per
+    month (bumped by worklog writes). A snapshot is only served if both versions are still current, so a
+    snapshot built from data read before a write is never served after it. The version of the journal in the
+    database (its ETag validator) is recorded too and must also be current, so a lost invalidation (e.g. Redis
+    failing on the write) or a change made elsewhere never serves a stale journal.
+    Redis being unavailable only disables the snapshots.
+    """
+
+    KEY_PREFIX: str = "journal:snapshot"
+    VERSIONS_PREFIX: str = "journal:versions"
+    ALL_MONTHS: str = "*"
+    # snapshots of the months no longer read are dropped
+    TTL_SECONDS: int = 60 * 60
+
+    def __init__(self, redis: Optional[RedisClient] = None):
+        self.redis = redis or get_redis_client()
+
+    @staticmethod
+    def month_of(start_date: Date, end_date: Date) -> Optional[str]:
+        """The month (YYYY-MM) covered by the range, None if the range is not exactly one month"""
+        last_day = calendar.monthrange(start_date.year, start_date.month)[1]
+        if start_date.day != 1 or end_date != start_date.replace(day=last_day):
+            return None
+        return f"{start_date:%Y-%m}"
+
+    @classmethod
+    def _key(cls, user_id: UUID, month: str) -> str:
+        return f"{cls.KEY_PREFIX}:{user_id}:{month}"
+
+    @classmethod
+    def _versions_key(cls, user_id: UUID) -> str:
+        return f"{cls.VERSIONS_PREFIX}:{user_id}"
+
+    async def versions(self, user_id: UUID, month: str) -> Optional[List[int]]:
+        """Current versions of the user journal and of the month, to be read before the journal is built"""
+        try:
+            values = await self.redis.hmget(self._versions_key(user_id), self.ALL_MONTHS, month)
+            return [int(value or 0) for value in values]
+        except Exception as e:
+            logger.error(f"[JournalSnapshots]: failed to read versions of user {user_id}: {e}")
+            return None
+
+    async def get(self, user_id: UUID, month: str, versions: List[int], source: str) -> Optional[JournalDocument]:
+        """The snapshot of the month, if it was built from the given versions and database version (`source`)"""
+        try:
+            snapshot = await self.redis.get(self._key(user_id, month), as_json=True)
+        except Exception as e:
+            logger.error(f"[JournalSnapshots]: failed to read snapshot {month} of user {user_id}: {e}")
+            return None
+
+        if not snapshot or snapshot.get("versions") != versions or snapshot.get("source") != source:
+            return None
+
+        return snapshot["journal"]
+
+    async def save(self, user_id: UUID, month: str, versions: List[int], source: str, journal: JournalDocument) -> None:
+        snapshot = {"versions": versions, "source": source, "journal": journal}
+        try:
+            await self.redis.set(self._key(user_id, month), snapshot, ex=self.TTL_SECONDS)
+        except Exception as e:
+            logger.error(f"[JournalSnapshots]: failed to save snapshot {month} of user {user_id}: {e}")
+
+    async def invalidate(self, user_id: UUID, dates: Optional[Iterable[Date]] = None) -> None:
+        """Invalidate the months of the given dates of the user journal, or every month if no dates are given"""
+        months = {self.ALL_MONTHS} if dates is None else {f"{date:%Y-%m}" for date in dates}
+        try:
+            for month in months:
+                await self.redis.hincrby(self._versions_key(user_id), month)
+        except Exception as e:
+            logger.error(f"[JournalSnapshots]: failed to invalidate snapshots of user {user_id}: {e}")
@@ -0,0 +1,24 @@
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import BadRequestException
+from app.domain.activity_hours import ActivityHoursMonthlyBase
+from app.dto.report import ActivityHoursRow, GetActivityHoursDto
+from app.services.base import BaseService
+
+
+class ReportService(BaseService):
+    MAX_MONTHS: int = 36
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_activity_hours(self, data: GetActivityHoursDto) -> List[ActivityHoursRow]:
+        """Hours per activity, activity type and user of each month of the period, read from the monthly summary"""
+        start_month, end_month = data.start_month.replace(day=1), data.end_month.replace(day=1)
+        months = (end_month.year - start_month.year) * 12 + end_month.month - start_month.month + 1
+        if not 0 < months <= self.MAX_MONTHS:
+            raise BadRequestException(f"The period must span 1 to {self.MAX_MONTHS} months")
+
+        return await ActivityHoursMonthlyBase.get_rollup(self.session, start_month, end_month)
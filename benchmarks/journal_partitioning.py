@@ -0,0 +1,157 @@
+"""
+Journal read latency on a plain vs a monthly range-partitioned worklogs table.
+
+Both tables are created in a scratch schema of the configured database, seeded with the same multi-year
+dataset, then queried with the journal reads: the worklogs of one user for one month, and the daily total
+of one user for one day (as the daily cap trigger does). The scratch schema is dropped afterwards.
+
+    python -m benchmarks.journal_partitioning --users 200 --years 4 --runs 300
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.database.url import DATABASE_URL
+
+SCHEMA = "bench_partitioning"
+
+COLUMNS = """
+    id uuid NOT NULL DEFAULT gen_random_uuid(),
+    date date NOT NULL,
+    duration numeric(3, 1) NOT NULL,
+    activity_task_id uuid NOT NULL,
+    user_id uuid NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    updated_at timestamptz NOT NULL DEFAULT now()
+"""
+
+JOURNAL_QUERY = """
+SELECT activity_task_id, date, duration FROM {table}
+WHERE user_id = :user_id AND date BETWEEN :start_date AND :end_date
+"""
+
+DAILY_TOTAL_QUERY = "SELECT coalesce(sum(duration), 0) FROM {table} WHERE user_id = :user_id AND date = :day"
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month `months` after the month of the given day"""
+    year, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + year, month + 1, 1)
+
+
+async def create_tables(conn: AsyncConnection, start: date, months: int) -> None:
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    await conn.execute(text(f"CREATE TABLE {SCHEMA}.plain ({COLUMNS}, PRIMARY KEY (id))"))
+    await conn.execute(
+        text(f"CREATE TABLE {SCHEMA}.monthly ({COLUMNS}, PRIMARY KEY (id, date)) PARTITION BY RANGE (date)")
+    )
+    for offset in range(months):
+        month = add_months(start, offset)
+        following = add_months(start, offset + 1)
+        await conn.execute(
+            text(
+                f"CREATE TABLE {SCHEMA}.monthly_{month:%Y_%m} PARTITION OF {SCHEMA}.monthly "
+                f"FOR VALUES FROM ('{month}') TO ('{following}')"
+            )
+        )
+
+    for table in ["plain", "monthly"]:
+        await conn.execute(text(f"CREATE UNIQUE INDEX ON {SCHEMA}.{table} (activity_task_id, user_id, date)"))
+        await conn.execute(text(f"CREATE INDEX ON {SCHEMA}.{table} (user_id, date)"))
+
+
+async def seed(conn: AsyncConnection, users: int, tasks: int, start: date, end: date) -> int:
+    """Every user logs hours on each working day, on a couple of their tasks"""
+    await conn.execute(
+        text(
+            f"""
+            INSERT INTO {SCHEMA}.plain (date, duration, activity_task_id, user_id)
+            SELECT day::date, 1 + (random() * 3)::int, task_id, user_id
+            FROM (SELECT gen_random_uuid() AS user_id FROM generate_series(1, :users)) AS u
+            CROSS JOIN LATERAL (
+                SELECT gen_random_uuid() AS task_id FROM generate_series(1, :tasks) WHERE u.user_id IS NOT NULL
+            ) AS t
+            CROSS JOIN generate_series(CAST(:start AS date), CAST(:end AS date), interval '1 day') AS day
+            WHERE extract(isodow FROM day) < 6 AND random() < 2.0 / :tasks
+            """
+        ),
+        {"users": users, "tasks": tasks, "start": start, "end": end},
+    )
+    await conn.execute(text(f"INSERT INTO {SCHEMA}.monthly SELECT * FROM {SCHEMA}.plain"))
+    await conn.execute(text(f"ANALYZE {SCHEMA}.plain"))
+    await conn.execute(text(f"ANALYZE {SCHEMA}.monthly"))
+    return await conn.scalar(text(f"SELECT count(*) FROM {SCHEMA}.plain"))
+
+
+async def measure(conn: AsyncConnection, query: str, params: list[dict]) -> list[float]:
+    timings = []
+    for item in params:
+        started = time.perf_counter()
+        (await conn.execute(text(query), item)).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<28} median {statistics.median(timings):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+async def main(args: argparse.Namespace) -> None:
+    end = date.today()
+    start = end.replace(year=end.year - args.years, day=1)
+    months = (end.year - start.year) * 12 + end.month - start.month + 1
+
+    engine = create_async_engine(DATABASE_URL)
+    try:
+        async with engine.begin() as conn:
+            await create_tables(conn, start, months)
+            rows = await seed(conn, args.users, args.tasks, start, end)
+            print(f"{rows} worklogs, {args.users} users, {months} months")
+
+        async with engine.connect() as conn:
+            user_ids = (await conn.scalars(text(f"SELECT DISTINCT user_id FROM {SCHEMA}.plain"))).all()
+            journal_params, total_params = [], []
+            for _ in range(args.runs):
+                month = (start + timedelta(days=random.randrange((end - start).days))).replace(day=1)
+                following = add_months(month, 1)
+                user_id = random.choice(user_ids)
+                journal_params.append(
+                    {"user_id": user_id, "start_date": month, "end_date": following - timedelta(days=1)}
+                )
+                total_params.append({"user_id": user_id, "day": month + timedelta(days=random.randrange(28))})
+
+            for table in ["plain", "monthly"]:
+                # warm up the caches and the prepared statements
+                await measure(conn, JOURNAL_QUERY.format(table=f"{SCHEMA}.{table}"), journal_params[:20])
+                report(
+                    f"{table} journal month",
+                    await measure(conn, JOURNAL_QUERY.format(table=f"{SCHEMA}.{table}"), journal_params),
+                )
+                report(
+                    f"{table} daily total",
+                    await measure(conn, DAILY_TOTAL_QUERY.format(table=f"{SCHEMA}.{table}"), total_params),
+                )
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=6, help="tasks per user")
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,136 @@
+"""
+Size of the token hash indexes of sessions and latency of the token lookups, with the SHA-256 of the tokens
+stored as hex text vs binary digests (bytea), indexed with a B-tree or a hash index.
+
+Three tables shaped like sessions are created in a scratch schema of the configured database and seeded with the
+same tokens, then queried with the lookup run on every authenticated request (a session by its access token hash).
+The scratch schema is dropped afterwards.
+
+    python -m benchmarks.session_token_hashes --sessions 1000000 --runs 2000
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.database.url import DATABASE_URL
+
+SCHEMA = "bench_token_hashes"
+
+# name: (column type, index method, digest of a token as stored)
+VARIANTS = {
+    "hex_btree": ("varchar", "btree", lambda token: hashlib.sha256(token).hexdigest()),
+    "bytea_btree": ("bytea", "btree", lambda token: hashlib.sha256(token).digest()),
+    "bytea_hash": ("bytea", "hash", lambda token: hashlib.sha256(token).digest()),
+}
+
+# digests computed by the database for the seed, the same as the application ones
+SEED_DIGESTS = {
+    "varchar": "encode(sha256(token), 'hex')",
+    "bytea": "sha256(token)",
+}
+
+LOOKUP_QUERY = "SELECT id, is_active FROM {table} WHERE access_token_hash = :digest"
+
+
+async def create_tables(conn: AsyncConnection, sessions: int) -> None:
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    # tokens are the seeded row numbers, the lookups hash the same ones
+    await conn.execute(
+        text(
+            f"""
+            CREATE TABLE {SCHEMA}.tokens AS
+            SELECT n, convert_to('refresh-' || n, 'UTF8') AS refresh, convert_to('access-' || n, 'UTF8') AS access
+            FROM generate_series(1, :sessions) AS n
+            """
+        ),
+        {"sessions": sessions},
+    )
+
+    for name, (column_type, method, _) in VARIANTS.items():
+        table = f"{SCHEMA}.{name}"
+        digest = SEED_DIGESTS[column_type]
+        await conn.execute(
+            text(
+                f"""
+                CREATE TABLE {table} (
+                    id uuid NOT NULL PRIMARY KEY DEFAULT gen_random_uuid(),
+                    refresh_token_hash {column_type} NOT NULL,
+                    access_token_hash {column_type} NOT NULL,
+                    is_active boolean NOT NULL DEFAULT true,
+                    expires_at timestamptz NOT NULL DEFAULT now() + interval '7 days'
+                )
+                """
+            )
+        )
+        await conn.execute(
+            text(
+                f"""
+                INSERT INTO {table} (refresh_token_hash, access_token_hash)
+                SELECT {digest.replace("token", "refresh")}, {digest.replace("token", "access")}
+                FROM {SCHEMA}.tokens
+                """
+            )
+        )
+        for column in ["refresh_token_hash", "access_token_hash"]:
+            await conn.execute(text(f"CREATE INDEX {name}_{column} ON {table} USING {method} ({column})"))
+        await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def measure(conn: AsyncConnection, query: str, params: list[dict]) -> list[float]:
+    timings = []
+    for item in params:
+        started = time.perf_counter()
+        (await conn.execute(text(query), item)).one()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(DATABASE_URL)
+    try:
+        async with engine.begin() as conn:
+            await create_tables(conn, args.sessions)
+        print(f"{args.sessions} sessions, {args.runs} lookups")
+
+        tokens = [f"access-{random.randint(1, args.sessions)}".encode() for _ in range(args.runs)]
+        async with engine.connect() as conn:
+            for name, (_, _, digest) in VARIANTS.items():
+                table = f"{SCHEMA}.{name}"
+                query = LOOKUP_QUERY.format(table=table)
+                params = [{"digest": digest(token)} for token in tokens]
+                # warm up the caches and the prepared statement
+                await measure(conn, query, params[:100])
+                timings = sorted(await measure(conn, query, params))
+
+                index_size = await conn.scalar(
+                    text(f"SELECT pg_relation_size('{SCHEMA}.{name}_access_token_hash')"),
+                )
+                table_size = await conn.scalar(text(f"SELECT pg_relation_size('{table}')"))
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                print(
+                    f"{name:<12} index {index_size / 2**20:7.1f} MiB (x2)   table {table_size / 2**20:7.1f} MiB   "
+                    f"lookup median {statistics.median(timings):6.3f} ms   p95 {p95:6.3f} ms"
+                )
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=None, help="random seed of the looked up tokens")
+    args = parser.parse_args()
+    random.seed(args.seed if args.seed is not None else os.getpid())
+    asyncio.run(main(args))
@@ -0,0 +1,144 @@
+"""
+Insert throughput and primary key index size with random (uuid4) vs time-ordered (uuid7) ids.
+
+Two tables shaped like worklogs are created in a scratch schema of the configured database and seeded with the
+same number of rows, ids of their kind (uuid7 ids of the seed are stamped over the past year). Rows are then
+inserted in batches with ids generated by the application (`uuid.uuid4` vs `app.core.database.uuid7`), as the
+ORM does, and the throughput, WAL written and final size of the primary key index of each table are reported.
+Each run starts with a checkpoint (superuser or pg_checkpoint role). The scratch schema is dropped afterwards.
+
+    python -m benchmarks.uuid_primary_keys --seed 2000000 --rows 200000 --batch 1000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.database.ids import uuid7
+from app.core.database.url import DATABASE_URL
+
+SCHEMA = "bench_uuid"
+
+COLUMNS = """
+    id uuid NOT NULL PRIMARY KEY,
+    date date NOT NULL,
+    duration numeric(3, 1) NOT NULL,
+    activity_task_id uuid NOT NULL,
+    user_id uuid NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    updated_at timestamptz NOT NULL DEFAULT now()
+"""
+
+# uuid7 built by the database (Postgres 16 has no uuidv7()), for the seed: a millisecond timestamp followed by
+# the random bits of a uuid4, the version bits changed from 4 to 7
+SQL_UUID7 = """
+encode(
+    set_bit(
+        set_bit(
+            overlay(uuid_send(gen_random_uuid()) PLACING substring(int8send({millis}) FROM 3) FROM 1 FOR 6),
+            52, 1
+        ),
+        53, 1
+    ),
+    'hex'
+)::uuid
+"""
+
+SEED = """
+INSERT INTO {table} (id, date, duration, activity_task_id, user_id)
+SELECT {id}, current_date - n % 365, 1 + n % 8, gen_random_uuid(), gen_random_uuid()
+FROM generate_series(1, :rows) AS n
+"""
+
+INSERT = (
+    "INSERT INTO {table} (id, date, duration, activity_task_id, user_id) "
+    "VALUES (:id, :date, :duration, :activity_task_id, :user_id)"
+)
+
+FACTORIES: dict[str, Callable[[], uuid.UUID]] = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+async def create_tables(conn: AsyncConnection, seed_rows: int) -> None:
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    # seeded ids of a year of history, in the order they would have been inserted
+    ids = {
+        "uuid4": "gen_random_uuid()",
+        "uuid7": SQL_UUID7.format(
+            millis="(extract(epoch FROM now() - interval '1 year') * 1000)::bigint + n * (31536000000 / :rows)"
+        ),
+    }
+    for name, id_expression in ids.items():
+        table = f"{SCHEMA}.{name}"
+        await conn.execute(text(f"CREATE TABLE {table} ({COLUMNS})"))
+        await conn.execute(text(SEED.format(table=table, id=id_expression)), {"rows": seed_rows})
+        await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def insert(conn: AsyncConnection, name: str, rows: int, batch: int) -> tuple[float, int]:
+    """Insert rows in committed batches, returns the elapsed seconds and the bytes of WAL written"""
+    factory = FACTORIES[name]
+    statement = text(INSERT.format(table=f"{SCHEMA}.{name}"))
+    today = date.today()
+    # both runs start right after a checkpoint, so they write the same full page images for pages touched first
+    await conn.execute(text("CHECKPOINT"))
+    wal_start = await conn.scalar(text("SELECT pg_current_wal_lsn()"))
+
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        values = [
+            {
+                "id": factory(),
+                "date": today - timedelta(days=random.randrange(7)),
+                "duration": random.randint(1, 8),
+                "activity_task_id": uuid.uuid4(),
+                "user_id": uuid.uuid4(),
+            }
+            for _ in range(min(batch, rows - offset))
+        ]
+        await conn.execute(statement, values)
+        await conn.commit()
+    elapsed = time.perf_counter() - started
+
+    wal = await conn.scalar(text("SELECT pg_current_wal_lsn() - CAST(:start AS pg_lsn)"), {"start": wal_start})
+    await conn.commit()
+    return elapsed, int(wal)
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(DATABASE_URL)
+    try:
+        async with engine.begin() as conn:
+            await create_tables(conn, args.seed)
+        print(f"{args.seed} seeded rows, {args.rows} inserted rows in batches of {args.batch}")
+
+        async with engine.connect() as conn:
+            for name in FACTORIES:
+                elapsed, wal = await insert(conn, name, args.rows, args.batch)
+                index_size = await conn.scalar(text(f"SELECT pg_relation_size('{SCHEMA}.{name}_pkey')"))
+                table_size = await conn.scalar(text(f"SELECT pg_relation_size('{SCHEMA}.{name}')"))
+                await conn.commit()
+                print(
+                    f"{name}  {args.rows / elapsed:9.0f} rows/s   WAL {wal / 2**20:8.1f} MiB   "
+                    f"pkey {index_size / 2**20:7.1f} MiB   table {table_size / 2**20:7.1f} MiB"
+                )
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=2_000_000, help="rows of each table before the inserts")
+    parser.add_argument("--rows", type=int, default=200_000, help="rows inserted and timed")
+    parser.add_argument("--batch", type=int, default=1000, help="rows per insert statement and transaction")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,167 @@
+"""
+Aggregates of worklog durations stored as `numeric(3, 1)` hours vs `smallint` tenths of an hour.
+
+Two tables shaped like worklogs are created in a scratch schema of the configured database and seeded with the
+same worklogs (durations of tenths in the integer table), then queried with the aggregates run on writes and
+reports: the daily total of one user for one day (the daily cap trigger), the monthly hours of one user per task
+(the monthly activity hours triggers) and the hours of every user per month over the whole table (the reports).
+Table and covering index sizes are reported too. The scratch schema is dropped afterwards.
+
+    python -m benchmarks.worklog_duration_tenths --users 500 --years 4 --runs 300
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.database.url import DATABASE_URL
+
+SCHEMA = "bench_duration"
+
+# table: (duration type, duration of the seeded hours)
+VARIANTS = {
+    "numeric": ("numeric(3, 1)", "hours"),
+    "tenths": ("smallint", "(hours * 10)::smallint"),
+}
+
+COLUMNS = """
+    id uuid NOT NULL PRIMARY KEY DEFAULT gen_random_uuid(),
+    date date NOT NULL,
+    duration {duration_type} NOT NULL,
+    activity_task_id uuid NOT NULL,
+    user_id uuid NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    updated_at timestamptz NOT NULL DEFAULT now()
+"""
+
+DAILY_TOTAL_QUERY = "SELECT coalesce(sum(duration), 0) FROM {table} WHERE user_id = :user_id AND date = :day"
+
+MONTHLY_TASKS_QUERY = """
+SELECT activity_task_id, sum(duration) FROM {table}
+WHERE user_id = :user_id AND date >= :month AND date < :following
+GROUP BY activity_task_id
+"""
+
+REPORT_QUERY = """
+SELECT user_id, date_trunc('month', date) AS month, sum(duration), avg(duration), max(duration) FROM {table}
+GROUP BY user_id, month
+"""
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month `months` after the month of the given day"""
+    year, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + year, month + 1, 1)
+
+
+async def create_tables(conn: AsyncConnection, users: int, tasks: int, start: date, end: date) -> int:
+    """Every user logs hours (by the half hour) on each working day, on a couple of their tasks"""
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    await conn.execute(
+        text(
+            f"""
+            CREATE TABLE {SCHEMA}.seed AS
+            SELECT day::date AS date, (1 + floor(random() * 7) / 2)::numeric(3, 1) AS hours, task_id, user_id
+            FROM (SELECT gen_random_uuid() AS user_id FROM generate_series(1, :users)) AS u
+            CROSS JOIN LATERAL (
+                SELECT gen_random_uuid() AS task_id FROM generate_series(1, :tasks) WHERE u.user_id IS NOT NULL
+            ) AS t
+            CROSS JOIN generate_series(CAST(:start AS date), CAST(:end AS date), interval '1 day') AS day
+            WHERE extract(isodow FROM day) < 6 AND random() < 2.0 / :tasks
+            """
+        ),
+        {"users": users, "tasks": tasks, "start": start, "end": end},
+    )
+
+    for name, (duration_type, duration) in VARIANTS.items():
+        table = f"{SCHEMA}.{name}"
+        await conn.execute(text(f"CREATE TABLE {table} ({COLUMNS.format(duration_type=duration_type)})"))
+        await conn.execute(
+            text(
+                f"""
+                INSERT INTO {table} (date, duration, activity_task_id, user_id)
+                SELECT date, {duration}, task_id, user_id FROM {SCHEMA}.seed
+                """
+            )
+        )
+        # the covering index of worklogs, serving the daily totals with index-only scans
+        await conn.execute(
+            text(f"CREATE INDEX {name}_covering ON {table} (user_id, date) INCLUDE (duration, activity_task_id)")
+        )
+        await conn.execute(text(f"VACUUM ANALYZE {table}"))
+    return await conn.scalar(text(f"SELECT count(*) FROM {SCHEMA}.seed"))
+
+
+async def measure(conn: AsyncConnection, query: str, params: list[dict]) -> list[float]:
+    timings = []
+    for item in params:
+        started = time.perf_counter()
+        (await conn.execute(text(query), item)).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<24} median {statistics.median(timings):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+async def main(args: argparse.Namespace) -> None:
+    end = date.today()
+    start = end.replace(year=end.year - args.years, day=1)
+
+    engine = create_async_engine(DATABASE_URL)
+    try:
+        # VACUUM can't run in a transaction
+        async with engine.connect() as conn:
+            autocommit = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            rows = await create_tables(autocommit, args.users, args.tasks, start, end)
+        print(f"{rows} worklogs, {args.users} users")
+
+        async with engine.connect() as conn:
+            user_ids = (await conn.scalars(text(f"SELECT DISTINCT user_id FROM {SCHEMA}.seed"))).all()
+            total_params, monthly_params = [], []
+            for _ in range(args.runs):
+                month = (start + timedelta(days=random.randrange((end - start).days))).replace(day=1)
+                user_id = random.choice(user_ids)
+                total_params.append({"user_id": user_id, "day": month + timedelta(days=random.randrange(28))})
+                monthly_params.append({"user_id": user_id, "month": month, "following": add_months(month, 1)})
+
+            for name in VARIANTS:
+                table = f"{SCHEMA}.{name}"
+                table_size = await conn.scalar(text(f"SELECT pg_relation_size('{table}')"))
+                index_size = await conn.scalar(text(f"SELECT pg_relation_size('{SCHEMA}.{name}_covering')"))
+                print(f"{name}: table {table_size / 2**20:.1f} MiB, covering index {index_size / 2**20:.1f} MiB")
+
+                # warm up the caches and the prepared statements
+                await measure(conn, DAILY_TOTAL_QUERY.format(table=table), total_params[:20])
+                await measure(conn, REPORT_QUERY.format(table=table), [{}])
+                report(f"{name} daily total", await measure(conn, DAILY_TOTAL_QUERY.format(table=table), total_params))
+                report(
+                    f"{name} monthly tasks",
+                    await measure(conn, MONTHLY_TASKS_QUERY.format(table=table), monthly_params),
+                )
+                report(f"{name} report", await measure(conn, REPORT_QUERY.format(table=table), [{}] * args.report_runs))
+                await conn.commit()
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--tasks", type=int, default=6, help="tasks per user, each day is logged on two of them")
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=300)
+    parser.add_argument("--report-runs", type=int, default=10, help="runs of the whole table report")
+    asyncio.run(main(parser.parse_args()))
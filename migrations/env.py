@@ -1,4 +1,6 @@
 import asyncio
+import logging
+import re
 from logging.config import fileConfig
 
 from alembic import context
@@ -8,6 +10,7 @@ from sqlalchemy.ext.asyncio import create_async_engine
 
 from app.core.database import DATABASE_URL, Base
 from app.models import *  # noqa: F403
+from migrations.helpers import invalid_indexes
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -18,12 +21,25 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+logger = logging.getLogger("alembic.env")
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# monthly partitions of worklogs are created by create_worklog_partitions() and moved to worklogs_archive by
+# archive_worklog_month(), they are not part of the models
+WORKLOG_PARTITION = re.compile(r"^worklogs_(archive_)?(p\d{4}_\d{2}|default)$")
+
+
+def include_name(name, type_, parent_names) -> bool:
+    if type_ == "table":
+        return not WORKLOG_PARTITION.match(name)
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -45,8 +61,10 @@ def run_migrations_offline() -> None:
     context.configure(
         url=DATABASE_URL,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
@@ -54,11 +72,21 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # one transaction per migration, so an autocommit block (concurrent index builds, see migrations/helpers.py)
+    # only commits the migration it belongs to
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        transaction_per_migration=True,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
 
+    for index in invalid_indexes(connection):
+        logger.warning(f"Index {index} is invalid (failed concurrent build), drop it or run the migration again")
+
 
 async def run_async_migrations() -> None:
     """In this scenario we need to create an Engine
@@ -0,0 +1,197 @@
+"""
+Helpers of the migrations building indexes without blocking writes, for tables too large to be locked while an index
+is built (worklogs, sessions).
+
+`CREATE INDEX CONCURRENTLY` can't run inside a transaction, the helpers run in an autocommit block: the migration
+transaction is committed first, each migration runs in a transaction of its own (`transaction_per_migration`) so
+only the statements of the current migration are committed early. A migration using them should only hold
+the concurrent builds, or run them last, and is safe to run again after a failure.
+
+Usage:
+    def upgrade() -> None:
+        create_index_concurrently('ix_worklogs_user_id_created_at', 'worklogs', ['user_id', 'created_at'])
+
+    def downgrade() -> None:
+        drop_index_concurrently('ix_worklogs_user_id_created_at', 'worklogs')
+"""
+
+import hashlib
+import logging
+from typing import List, Optional, Sequence, Set
+
+import sqlalchemy as sa
+from alembic import op
+from asyncpg.exceptions import DeadlockDetectedError, LockNotAvailableError, SerializationError
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# a concurrent build waits for the transactions using the table, it may be cancelled (deadlock, lock_timeout)
+# and leave an invalid index behind, it is dropped and built again
+RETRYABLE_SQLSTATES = {DeadlockDetectedError.sqlstate, LockNotAvailableError.sqlstate, SerializationError.sqlstate}
+
+MAX_IDENTIFIER_LENGTH = 63
+
+
+def create_index_concurrently(
+    index_name: str, table_name: str, columns: Sequence[str], *, attempts: int = 3, **kwargs
+) -> None:
+    """
+    Build an index without blocking the writes of the table. A valid index of the same name is kept as is, an
+    invalid one (left by a failed build) is dropped and built again, builds failing on a transient error are
+    retried up to `attempts` times. Keyword arguments are those of `op.create_index` (unique, postgresql_include,
+    postgresql_where...).
+
+    Partitioned tables can't be indexed concurrently, their index is built in batches, one partition at a time:
+    the index is created on the parent only (invalid until complete), built concurrently on each partition and
+    attached, it becomes valid once all partitions are. Partitions created meanwhile get the index on creation.
+    """
+    context = op.get_context()
+    if context.as_sql:
+        # offline scripts can't look up the partitions, a plain build is emitted
+        op.create_index(index_name, table_name, columns, **kwargs)
+        return
+
+    with context.autocommit_block():
+        partitions = _partitions(table_name)
+        if partitions is None:
+            _build(index_name, table_name, columns, attempts, **kwargs)
+            return
+
+        valid = _is_valid(index_name)
+        if valid:
+            return
+
+        if valid is None:
+            op.execute(_create_parent_index_statement(index_name, table_name, columns, **kwargs))
+
+        indexed = _indexed_partitions(index_name)
+        for partition in partitions:
+            if partition in indexed:
+                continue
+
+            child_name = partition_index_name(index_name, partition)
+            _build(child_name, partition, columns, attempts, **kwargs)
+            op.execute(f"ALTER INDEX {_quote(index_name)} ATTACH PARTITION {_quote(child_name)}")
+            logger.info(f"Built {child_name} on {partition}")
+
+        if not _is_valid(index_name):
+            raise RuntimeError(f"{index_name} is still invalid once built on all partitions of {table_name}")
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    """
+    Drop an index without blocking the reads and writes of the table. Indexes of partitioned tables can't be
+    dropped concurrently, they are dropped along with the indexes of their partitions.
+    """
+    context = op.get_context()
+    if context.as_sql:
+        op.drop_index(index_name, table_name=table_name)
+        return
+
+    with context.autocommit_block():
+        op.drop_index(
+            index_name,
+            table_name=table_name,
+            postgresql_concurrently=_partitions(table_name) is None,
+            if_exists=True,
+        )
+
+
+def invalid_indexes(connection: sa.Connection) -> List[str]:
+    """Names of the invalid indexes of the database, left by failed concurrent builds"""
+    stmt = sa.text(
+        """
+        SELECT c.relname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE NOT i.indisvalid AND n.nspname = current_schema()
+        ORDER BY c.relname
+        """
+    )
+    return list(connection.scalars(stmt))
+
+
+def partition_index_name(index_name: str, partition: str) -> str:
+    """Name of the index of a partition, shortened with a hash when over the identifier limit"""
+    name = f"{partition}_{index_name}"
+    if len(name) <= MAX_IDENTIFIER_LENGTH:
+        return name
+
+    digest = hashlib.sha1(name.encode()).hexdigest()[:8]
+    return f"{name[: MAX_IDENTIFIER_LENGTH - len(digest) - 1]}_{digest}"
+
+
+def _build(index_name: str, table_name: str, columns: Sequence[str], attempts: int, **kwargs) -> None:
+    for attempt in range(1, attempts + 1):
+        valid = _is_valid(index_name)
+        if valid:
+            return
+
+        if valid is not None:
+            logger.warning(f"Dropping invalid index {index_name} of {table_name}")
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+        try:
+            op.create_index(index_name, table_name, columns, postgresql_concurrently=True, **kwargs)
+            return
+        except DBAPIError as e:
+            if attempt == attempts or getattr(e.orig, "sqlstate", None) not in RETRYABLE_SQLSTATES:
+                raise e
+            logger.warning(f"Building {index_name} failed (attempt {attempt}/{attempts}), retrying: {e.orig}")
+
+
+def _partitions(table_name: str) -> Optional[List[str]]:
+    """Partitions of a partitioned table, None if the table is not partitioned"""
+    bind = op.get_bind()
+    partitioned = bind.scalar(
+        sa.text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:name)"), {"name": table_name}
+    )
+    if not partitioned:
+        return None
+
+    stmt = sa.text(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:name)
+        ORDER BY c.relname
+        """
+    )
+    return list(bind.scalars(stmt, {"name": table_name}))
+
+
+def _is_valid(index_name: str) -> Optional[bool]:
+    """Whether an index is valid, None if it does not exist"""
+    stmt = sa.text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)")
+    return op.get_bind().scalar(stmt, {"name": index_name})
+
+
+def _indexed_partitions(index_name: str) -> Set[str]:
+    """Partitions whose index is already attached to the index of the parent"""
+    stmt = sa.text(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_index x ON x.indexrelid = i.inhrelid
+        JOIN pg_class c ON c.oid = x.indrelid
+        WHERE i.inhparent = to_regclass(:name)
+        """
+    )
+    return set(op.get_bind().scalars(stmt, {"name": index_name}))
+
+
+def _quote(name: str) -> str:
+    return op.get_bind().dialect.identifier_preparer.quote(name)
+
+
+def _create_parent_index_statement(index_name: str, table_name: str, columns: Sequence[str], **kwargs) -> str:
+    """`CREATE INDEX ... ON ONLY` statement of the index of a partitioned table, without indexing its partitions"""
+    include = kwargs.get("postgresql_include") or []
+    table = sa.Table(table_name, sa.MetaData(), *(sa.Column(name) for name in dict.fromkeys([*columns, *include])))
+    index = sa.Index(index_name, *(table.c[name] for name in columns), **kwargs)
+    statement = str(sa.schema.CreateIndex(index).compile(dialect=op.get_bind().dialect))
+    target = _quote(table_name)
+    return statement.replace(f" ON {target} ", f" ON ONLY {target} ", 1)
@@ -0,0 +1,128 @@
+"""worklog_daily_totals
+
+Revision ID: 28875069645b
+Revises: 967828c46e3f
+Create Date: 2026-10-19 09:12:41.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '28875069645b'
+down_revision: Union[str, Sequence[str], None] = '967828c46e3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Refreshes the total of every (user_id, date) touched by a worklog row. The total row is locked before
+# summing, so concurrent writers of the same day are serialized and the sum (a handful of rows, as a
+# worklog is at least one hour) is read after the other writer committed. As an AFTER trigger it sees the
+# final state of the statement, so moving hours between tasks of the same day in one batch never trips the cap.
+REFRESH_DAILY_TOTAL_FUNCTION = """
+CREATE OR REPLACE FUNCTION refresh_worklog_daily_total(p_user_id uuid, p_date date, p_create boolean)
+RETURNS void AS $$
+DECLARE
+    v_hours numeric;
+BEGIN
+    IF p_user_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    IF p_create THEN
+        INSERT INTO worklog_daily_totals (user_id, date, hours)
+        VALUES (p_user_id, p_date, 0)
+        ON CONFLICT (user_id, date) DO NOTHING;
+    END IF;
+
+    PERFORM 1 FROM worklog_daily_totals WHERE user_id = p_user_id AND date = p_date FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    SELECT coalesce(sum(duration), 0) INTO v_hours
+    FROM worklogs
+    WHERE user_id = p_user_id AND date = p_date;
+
+    IF v_hours > 8 THEN
+        RAISE EXCEPTION 'Daily limit exceeded: % (%h)', p_date, v_hours
+            USING ERRCODE = 'check_violation', CONSTRAINT = 'ck_worklog_daily_totals_cap',
+                  TABLE = 'worklog_daily_totals';
+    END IF;
+
+    UPDATE worklog_daily_totals
+    SET hours = v_hours, updated_at = now()
+    WHERE user_id = p_user_id AND date = p_date;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+APPLY_DAILY_TOTALS_FUNCTION = """
+CREATE OR REPLACE FUNCTION worklog_daily_totals_apply()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        IF TG_OP = 'DELETE' OR OLD.user_id IS DISTINCT FROM NEW.user_id OR OLD.date <> NEW.date THEN
+            PERFORM refresh_worklog_daily_total(OLD.user_id, OLD.date, false);
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_worklog_daily_total(NEW.user_id, NEW.date, true);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('worklog_daily_totals',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('hours', sa.Numeric(precision=4, scale=1), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'date')
+    )
+    op.create_index('ix_worklogs_user_id_date', 'worklogs', ['user_id', 'date'], unique=False)
+
+    op.execute(
+        """
+        INSERT INTO worklog_daily_totals (user_id, date, hours)
+        SELECT user_id, date, sum(duration)
+        FROM worklogs
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id, date
+        """
+    )
+    # days already over the cap are left as they are, the constraint applies to every new write
+    op.execute(
+        "ALTER TABLE worklog_daily_totals ADD CONSTRAINT ck_worklog_daily_totals_cap "
+        "CHECK (hours >= 0 AND hours <= 8) NOT VALID"
+    )
+
+    op.execute(REFRESH_DAILY_TOTAL_FUNCTION)
+    op.execute(APPLY_DAILY_TOTALS_FUNCTION)
+    op.execute(
+        """
+        CREATE TRIGGER trg_worklogs_daily_totals
+        AFTER INSERT OR UPDATE OF duration, date, user_id OR DELETE ON worklogs
+        FOR EACH ROW EXECUTE FUNCTION worklog_daily_totals_apply()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_worklogs_daily_totals ON worklogs")
+    op.execute("DROP FUNCTION IF EXISTS worklog_daily_totals_apply()")
+    op.execute("DROP FUNCTION IF EXISTS refresh_worklog_daily_total(uuid, date, boolean)")
+    op.drop_index('ix_worklogs_user_id_date', table_name='worklogs')
+    op.drop_table('worklog_daily_totals')
@@ -0,0 +1,92 @@
+"""journal_sync_tombstones
+
+Revision ID: 5b1e0c7d9a34
+Revises: 28875069645b
+Create Date: 2026-10-19 11:02:17.402915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e0c7d9a34'
+down_revision: Union[str, Sequence[str], None] = '28875069645b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Records a tombstone for every deleted row owned by a user, the entity name is given as trigger argument.
+# Worklogs keep their date so deletions can be filtered by the journal range. Old tombstones of the
+# user are pruned on the way, a client behind the retention window has to fetch the full journal.
+RECORD_TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_sync_tombstone()
+RETURNS trigger AS $$
+DECLARE
+    v_date date;
+BEGIN
+    IF OLD.user_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_ARGV[0] = 'worklog' THEN
+        v_date := OLD.date;
+    END IF;
+
+    INSERT INTO sync_tombstones (id, entity, entity_id, user_id, date)
+    VALUES (gen_random_uuid(), TG_ARGV[0], OLD.id, OLD.user_id, v_date);
+
+    DELETE FROM sync_tombstones
+    WHERE user_id = OLD.user_id AND created_at < now() - interval '30 days';
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sync_tombstones',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('entity', sa.String(length=32), nullable=False),
+    sa.Column('entity_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_tombstones_user_id_created_at', 'sync_tombstones', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_activity_tasks_user_id_updated_at', 'activity_tasks', ['user_id', 'updated_at'], unique=False)
+    op.create_index('ix_worklogs_user_id_updated_at', 'worklogs', ['user_id', 'updated_at'], unique=False)
+
+    op.execute(RECORD_TOMBSTONE_FUNCTION)
+    op.execute(
+        """
+        CREATE TRIGGER trg_activity_tasks_sync_tombstones
+        AFTER DELETE ON activity_tasks
+        FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone('activity_task')
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_worklogs_sync_tombstones
+        AFTER DELETE ON worklogs
+        FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone('worklog')
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_worklogs_sync_tombstones ON worklogs")
+    op.execute("DROP TRIGGER IF EXISTS trg_activity_tasks_sync_tombstones ON activity_tasks")
+    op.execute("DROP FUNCTION IF EXISTS record_sync_tombstone()")
+    op.drop_index('ix_worklogs_user_id_updated_at', table_name='worklogs')
+    op.drop_index('ix_activity_tasks_user_id_updated_at', table_name='activity_tasks')
+    op.drop_index('ix_sync_tombstones_user_id_created_at', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
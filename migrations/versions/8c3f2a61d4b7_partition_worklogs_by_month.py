@@ -0,0 +1,143 @@
+"""partition_worklogs_by_month
+
+Revision ID: 8c3f2a61d4b7
+Revises: 5b1e0c7d9a34
+Create Date: 2026-10-19 15:41:08.530217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3f2a61d4b7'
+down_revision: Union[str, Sequence[str], None] = '5b1e0c7d9a34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Creates the monthly partitions (worklogs_pYYYY_MM) missing between two dates, returns how many were created.
+# Rows of months without a partition land in worklogs_default, a month already holding rows there is skipped
+# (creating its partition would fail), those rows have to be moved by hand. Concurrent callers are serialized.
+CREATE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_worklog_partitions(p_from date, p_to date)
+RETURNS integer AS $$
+DECLARE
+    v_month date := date_trunc('month', p_from)::date;
+    v_next date;
+    v_name text;
+    v_created integer := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('create_worklog_partitions'));
+
+    WHILE v_month <= p_to LOOP
+        v_next := (v_month + interval '1 month')::date;
+        v_name := 'worklogs_p' || to_char(v_month, 'YYYY_MM');
+
+        IF to_regclass(v_name) IS NULL THEN
+            IF EXISTS (SELECT 1 FROM worklogs_default WHERE date >= v_month AND date < v_next) THEN
+                RAISE NOTICE 'worklogs_default holds rows of %, partition % is not created', v_month, v_name;
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF worklogs FOR VALUES FROM (%L) TO (%L)', v_name, v_month, v_next
+                );
+                v_created := v_created + 1;
+            END IF;
+        END IF;
+
+        v_month := v_next;
+    END LOOP;
+
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+WORKLOG_TRIGGERS = [
+    """
+    CREATE TRIGGER trg_worklogs_daily_totals
+    AFTER INSERT OR UPDATE OF duration, date, user_id OR DELETE ON worklogs
+    FOR EACH ROW EXECUTE FUNCTION worklog_daily_totals_apply()
+    """,
+    """
+    CREATE TRIGGER trg_worklogs_sync_tombstones
+    AFTER DELETE ON worklogs
+    FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone('worklog')
+    """,
+]
+
+# partitions are created from the first month with worklogs, or a year back, (at most 10 years back) up to a year ahead
+FIRST_PARTITION = (
+    "greatest(least(min(date), (current_date - interval '1 year')::date), (current_date - interval '10 years')::date)"
+)
+MONTHS_AHEAD = 12
+
+COLUMNS = "id, date, duration, activity_task_id, user_id, created_at, updated_at"
+
+
+def _create_worklogs_table(primary_key: sa.PrimaryKeyConstraint, **kwargs) -> None:
+    op.create_table('worklogs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('duration', sa.Numeric(precision=3, scale=1), nullable=False),
+    sa.Column('activity_task_id', sa.UUID(), nullable=True),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint('duration >= 1 AND duration <= 8', name='worklogs_duration_check'),
+    sa.ForeignKeyConstraint(['activity_task_id'], ['activity_tasks.id'], name='worklogs_activity_task_id_fkey', ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='worklogs_user_id_fkey', ondelete='SET NULL'),
+    sa.UniqueConstraint('activity_task_id', 'user_id', 'date', name='uq_user_activity_task_date'),
+    primary_key,
+    **kwargs
+    )
+    op.create_index('ix_worklogs_user_id_date', 'worklogs', ['user_id', 'date'], unique=False)
+    op.create_index('ix_worklogs_user_id_updated_at', 'worklogs', ['user_id', 'updated_at'], unique=False)
+
+
+def _rename_previous_worklogs() -> None:
+    """Move the current worklogs table aside, along with the names of its indexes and constraints"""
+    op.rename_table('worklogs', 'worklogs_previous')
+    for index in ['worklogs_pkey', 'uq_user_activity_task_date', 'ix_worklogs_user_id_date', 'ix_worklogs_user_id_updated_at']:
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_previous")
+    for constraint in ['worklogs_activity_task_id_fkey', 'worklogs_user_id_fkey']:
+        op.execute(f"ALTER TABLE worklogs_previous RENAME CONSTRAINT {constraint} TO {constraint}_previous")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rename_previous_worklogs()
+
+    # the primary key of a partitioned table has to include the partition key
+    _create_worklogs_table(
+        sa.PrimaryKeyConstraint('id', 'date', name='worklogs_pkey'),
+        postgresql_partition_by='RANGE (date)',
+    )
+    op.execute("CREATE TABLE worklogs_default PARTITION OF worklogs DEFAULT")
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+    op.execute(
+        f"""
+        SELECT create_worklog_partitions({FIRST_PARTITION}, (current_date + interval '{MONTHS_AHEAD} months')::date)
+        FROM worklogs_previous
+        """
+    )
+
+    # triggers are created after the copy, the daily totals and tombstones are already up to date
+    op.execute(f"INSERT INTO worklogs ({COLUMNS}) SELECT {COLUMNS} FROM worklogs_previous")
+    op.drop_table('worklogs_previous')
+    for trigger in WORKLOG_TRIGGERS:
+        op.execute(trigger)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rename_previous_worklogs()
+
+    _create_worklogs_table(sa.PrimaryKeyConstraint('id', name='worklogs_pkey'))
+    op.execute(f"INSERT INTO worklogs ({COLUMNS}) SELECT {COLUMNS} FROM worklogs_previous")
+    op.drop_table('worklogs_previous')
+    op.execute("DROP FUNCTION IF EXISTS create_worklog_partitions(date, date)")
+    for trigger in WORKLOG_TRIGGERS:
+        op.execute(trigger)
@@ -0,0 +1,164 @@
+"""activity_hours_monthly
+
+Revision ID: a9d35e17c2b8
+Revises: e4a7b2c91f05
+Create Date: 2026-10-19 18:03:51.227640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d35e17c2b8'
+down_revision: Union[str, Sequence[str], None] = 'e4a7b2c91f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Sums again the hours of a user for a month, per activity. The (user, month) is locked first, so concurrent
+# writers of the same month are serialized and the sum is read after the other writer committed. A month of a
+# user is a few dozen worklogs read from the covering (user_id, date) index, summing it again is cheaper and
+# safer than applying deltas, which would need the activity of tasks already deleted.
+REFRESH_HOURS_MONTHLY_FUNCTION = """
+CREATE OR REPLACE FUNCTION refresh_activity_hours_monthly(p_user_id uuid, p_month date)
+RETURNS void AS $$
+BEGIN
+    IF p_user_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('activity_hours_monthly'), hashtext(p_user_id::text || p_month::text));
+
+    DELETE FROM activity_hours_monthly WHERE user_id = p_user_id AND month = p_month;
+
+    INSERT INTO activity_hours_monthly (activity_id, user_id, month, hours)
+    SELECT t.activity_id, w.user_id, p_month, sum(w.duration)
+    FROM worklogs w
+    JOIN activity_tasks t ON t.id = w.activity_task_id
+    WHERE w.user_id = p_user_id
+      AND w.date >= p_month AND w.date < (p_month + interval '1 month')::date
+      AND t.activity_id IS NOT NULL
+    GROUP BY t.activity_id, w.user_id;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Statement level, the (user, month) pairs touched by the statement are read from its transition tables and
+# refreshed once each, in order to always take the locks in the same order.
+APPLY_WORKLOGS_FUNCTION = """
+CREATE OR REPLACE FUNCTION worklog_hours_monthly_apply()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_activity_hours_monthly(user_id, month)
+        FROM (SELECT DISTINCT user_id, date_trunc('month', date)::date AS month FROM new_worklogs ORDER BY 1, 2) AS touched;
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM refresh_activity_hours_monthly(user_id, month)
+        FROM (
+            SELECT user_id, date_trunc('month', date)::date AS month FROM old_worklogs
+            UNION
+            SELECT user_id, date_trunc('month', date)::date FROM new_worklogs
+            ORDER BY 1, 2
+        ) AS touched;
+    ELSE
+        PERFORM refresh_activity_hours_monthly(user_id, month)
+        FROM (SELECT DISTINCT user_id, date_trunc('month', date)::date AS month FROM old_worklogs ORDER BY 1, 2) AS touched;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# A task moved to another activity moves the hours of all its worklogs
+APPLY_TASKS_FUNCTION = """
+CREATE OR REPLACE FUNCTION activity_task_hours_monthly_apply()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM refresh_activity_hours_monthly(user_id, month)
+    FROM (
+        SELECT DISTINCT w.user_id, date_trunc('month', w.date)::date AS month
+        FROM new_tasks n
+        JOIN old_tasks o ON o.id = n.id
+        JOIN worklogs w ON w.activity_task_id = n.id
+        WHERE o.activity_id IS DISTINCT FROM n.activity_id
+        ORDER BY 1, 2
+    ) AS touched;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# transition tables can't be shared by several events, each event has its own trigger
+TRIGGERS = [
+    """
+    CREATE TRIGGER trg_worklogs_hours_monthly_insert
+    AFTER INSERT ON worklogs REFERENCING NEW TABLE AS new_worklogs
+    FOR EACH STATEMENT EXECUTE FUNCTION worklog_hours_monthly_apply()
+    """,
+    """
+    CREATE TRIGGER trg_worklogs_hours_monthly_update
+    AFTER UPDATE ON worklogs REFERENCING OLD TABLE AS old_worklogs NEW TABLE AS new_worklogs
+    FOR EACH STATEMENT EXECUTE FUNCTION worklog_hours_monthly_apply()
+    """,
+    """
+    CREATE TRIGGER trg_worklogs_hours_monthly_delete
+    AFTER DELETE ON worklogs REFERENCING OLD TABLE AS old_worklogs
+    FOR EACH STATEMENT EXECUTE FUNCTION worklog_hours_monthly_apply()
+    """,
+    """
+    CREATE TRIGGER trg_activity_tasks_hours_monthly
+    AFTER UPDATE ON activity_tasks REFERENCING OLD TABLE AS old_tasks NEW TABLE AS new_tasks
+    FOR EACH STATEMENT EXECUTE FUNCTION activity_task_hours_monthly_apply()
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('activity_hours_monthly',
+    sa.Column('activity_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('hours', sa.Numeric(precision=8, scale=1), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['activity_id'], ['activities.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('activity_id', 'user_id', 'month')
+    )
+    op.create_index(op.f('ix_activity_hours_monthly_user_id'), 'activity_hours_monthly', ['user_id'], unique=False)
+
+    op.execute(
+        """
+        INSERT INTO activity_hours_monthly (activity_id, user_id, month, hours)
+        SELECT t.activity_id, w.user_id, date_trunc('month', w.date)::date, sum(w.duration)
+        FROM worklogs w
+        JOIN activity_tasks t ON t.id = w.activity_task_id
+        WHERE w.user_id IS NOT NULL AND t.activity_id IS NOT NULL
+        GROUP BY 1, 2, 3
+        """
+    )
+
+    op.execute(REFRESH_HOURS_MONTHLY_FUNCTION)
+    op.execute(APPLY_WORKLOGS_FUNCTION)
+    op.execute(APPLY_TASKS_FUNCTION)
+    for trigger in TRIGGERS:
+        op.execute(trigger)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_activity_tasks_hours_monthly ON activity_tasks")
+    op.execute("DROP TRIGGER IF EXISTS trg_worklogs_hours_monthly_delete ON worklogs")
+    op.execute("DROP TRIGGER IF EXISTS trg_worklogs_hours_monthly_update ON worklogs")
+    op.execute("DROP TRIGGER IF EXISTS trg_worklogs_hours_monthly_insert ON worklogs")
+    op.execute("DROP FUNCTION IF EXISTS activity_task_hours_monthly_apply()")
+    op.execute("DROP FUNCTION IF EXISTS worklog_hours_monthly_apply()")
+    op.execute("DROP FUNCTION IF EXISTS refresh_activity_hours_monthly(uuid, date)")
+    op.drop_index(op.f('ix_activity_hours_monthly_user_id'), table_name='activity_hours_monthly')
+    op.drop_table('activity_hours_monthly')
@@ -0,0 +1,54 @@
+"""session_token_digests
+
+Revision ID: b61e4f9a0d37
+Revises: f3b8d0c46a12
+Create Date: 2026-10-19 21:05:12.418730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b61e4f9a0d37'
+down_revision: Union[str, Sequence[str], None] = 'f3b8d0c46a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TOKEN_HASH_COLUMNS = ['refresh_token_hash', 'access_token_hash']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # changing the type rewrites sessions under an exclusive lock whatever the indexes, the B-trees over the hex
+    # text are dropped first rather than rebuilt, and the hash indexes built once over the digests
+    for column in TOKEN_HASH_COLUMNS:
+        op.drop_index(f'ix_sessions_{column}', table_name='sessions')
+
+    # hex SHA-256 text (64 characters) to the 32 bytes it encodes, same digests so live sessions keep working
+    op.execute(
+        'ALTER TABLE sessions '
+        + ', '.join(f"ALTER COLUMN {column} TYPE bytea USING decode({column}, 'hex')" for column in TOKEN_HASH_COLUMNS)
+    )
+
+    for column in TOKEN_HASH_COLUMNS:
+        op.create_check_constraint(f'ck_sessions_{column}_length', 'sessions', f'octet_length({column}) = 32')
+        op.create_index(f'ix_sessions_{column}', 'sessions', [column], unique=False, postgresql_using='hash')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in TOKEN_HASH_COLUMNS:
+        op.drop_index(f'ix_sessions_{column}', table_name='sessions')
+        op.drop_constraint(f'ck_sessions_{column}_length', 'sessions', type_='check')
+
+    op.execute(
+        'ALTER TABLE sessions '
+        + ', '.join(f"ALTER COLUMN {column} TYPE varchar USING encode({column}, 'hex')" for column in TOKEN_HASH_COLUMNS)
+    )
+
+    for column in TOKEN_HASH_COLUMNS:
+        op.create_index(f'ix_sessions_{column}', 'sessions', [column], unique=False)
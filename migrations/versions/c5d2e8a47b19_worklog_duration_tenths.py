@@ -0,0 +1,185 @@
+"""worklog_duration_tenths
+
+Revision ID: c5d2e8a47b19
+Revises: b61e4f9a0d37
+Create Date: 2026-10-19 22:31:07.652194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d2e8a47b19'
+down_revision: Union[str, Sequence[str], None] = 'b61e4f9a0d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, integer type, previous numeric type) of the hours stored as tenths of an hour
+TENTHS_COLUMNS = [
+    ('worklogs', 'duration', 'smallint', 'numeric(3, 1)'),
+    ('worklogs_archive', 'duration', 'smallint', 'numeric(3, 1)'),
+    ('worklog_daily_totals', 'hours', 'smallint', 'numeric(4, 1)'),
+    ('activity_hours_monthly', 'hours', 'integer', 'numeric(8, 1)'),
+    ('worklog_monthly_summaries', 'hours', 'integer', 'numeric(8, 1)'),
+    ('worklog_archived_months', 'hours', 'integer', 'numeric(10, 1)'),
+]
+
+# the column list of the trigger depends on duration, it has to be dropped for the type to change
+DAILY_TOTALS_TRIGGER = """
+CREATE TRIGGER trg_worklogs_daily_totals
+AFTER INSERT OR UPDATE OF duration, date, user_id OR DELETE ON worklogs
+FOR EACH ROW EXECUTE FUNCTION worklog_daily_totals_apply()
+"""
+
+# Archived partitions keep the duration check they had in worklogs as a constraint of their own (the archive has
+# none), it is dropped and added back to each of them like the one of worklogs
+ARCHIVED_PARTITIONS_CHECK = """
+DO $$
+DECLARE
+    v_partition regclass;
+BEGIN
+    FOR v_partition IN SELECT inhrelid::regclass FROM pg_inherits WHERE inhparent = 'worklogs_archive'::regclass LOOP
+        EXECUTE format('ALTER TABLE %s {action}', v_partition);
+    END LOOP;
+END;
+$$
+"""
+
+DROP_DURATION_CHECK = 'DROP CONSTRAINT IF EXISTS worklogs_duration_check'
+ADD_DURATION_CHECK = 'ADD CONSTRAINT worklogs_duration_check CHECK ({check})'
+
+# Same as in 28875069645b, summing tenths into an integer: the cap is 80 tenths, hours are shown in the message
+REFRESH_DAILY_TOTAL_FUNCTION = """
+CREATE OR REPLACE FUNCTION refresh_worklog_daily_total(p_user_id uuid, p_date date, p_create boolean)
+RETURNS void AS $$
+DECLARE
+    v_tenths integer;
+BEGIN
+    IF p_user_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    IF p_create THEN
+        INSERT INTO worklog_daily_totals (user_id, date, hours)
+        VALUES (p_user_id, p_date, 0)
+        ON CONFLICT (user_id, date) DO NOTHING;
+    END IF;
+
+    PERFORM 1 FROM worklog_daily_totals WHERE user_id = p_user_id AND date = p_date FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    SELECT coalesce(sum(duration), 0) INTO v_tenths
+    FROM worklogs
+    WHERE user_id = p_user_id AND date = p_date;
+
+    IF v_tenths > 80 THEN
+        RAISE EXCEPTION 'Daily limit exceeded: % (%h)', p_date, round(v_tenths / 10.0, 1)
+            USING ERRCODE = 'check_violation', CONSTRAINT = 'ck_worklog_daily_totals_cap',
+                  TABLE = 'worklog_daily_totals';
+    END IF;
+
+    UPDATE worklog_daily_totals
+    SET hours = v_tenths, updated_at = now()
+    WHERE user_id = p_user_id AND date = p_date;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_REFRESH_DAILY_TOTAL_FUNCTION = """
+CREATE OR REPLACE FUNCTION refresh_worklog_daily_total(p_user_id uuid, p_date date, p_create boolean)
+RETURNS void AS $$
+DECLARE
+    v_hours numeric;
+BEGIN
+    IF p_user_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    IF p_create THEN
+        INSERT INTO worklog_daily_totals (user_id, date, hours)
+        VALUES (p_user_id, p_date, 0)
+        ON CONFLICT (user_id, date) DO NOTHING;
+    END IF;
+
+    PERFORM 1 FROM worklog_daily_totals WHERE user_id = p_user_id AND date = p_date FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    SELECT coalesce(sum(duration), 0) INTO v_hours
+    FROM worklogs
+    WHERE user_id = p_user_id AND date = p_date;
+
+    IF v_hours > 8 THEN
+        RAISE EXCEPTION 'Daily limit exceeded: % (%h)', p_date, v_hours
+            USING ERRCODE = 'check_violation', CONSTRAINT = 'ck_worklog_daily_totals_cap',
+                  TABLE = 'worklog_daily_totals';
+    END IF;
+
+    UPDATE worklog_daily_totals
+    SET hours = v_hours, updated_at = now()
+    WHERE user_id = p_user_id AND date = p_date;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def _drop_checks() -> None:
+    # checks are dropped from the partitioned tables along with their partitions, and added back the same way
+    op.drop_constraint('worklogs_duration_check', 'worklogs', type_='check')
+    op.drop_constraint('ck_worklog_daily_totals_cap', 'worklog_daily_totals', type_='check')
+    op.execute(ARCHIVED_PARTITIONS_CHECK.format(action=DROP_DURATION_CHECK))
+
+
+def _add_duration_checks(check: str) -> None:
+    op.create_check_constraint('worklogs_duration_check', 'worklogs', check)
+    op.execute(ARCHIVED_PARTITIONS_CHECK.format(action=ADD_DURATION_CHECK.format(check=check)))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TRIGGER trg_worklogs_daily_totals ON worklogs")
+    _drop_checks()
+
+    # The backfill: the type change rewrites every table (each partition of the partitioned ones) once, converting
+    # the rows on the way and rebuilding their indexes, under an exclusive lock. Row triggers are not fired.
+    # A column filled in batches is not an option for worklogs, the column must have the same type in every
+    # partition (attached and archived ones) and each batch would fire the daily and monthly totals triggers.
+    for table, column, integer_type, _ in TENTHS_COLUMNS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {integer_type} USING round({column} * 10)::{integer_type}"
+        )
+
+    _add_duration_checks('duration >= 10 AND duration <= 80')
+    # days already over the cap are left as they are, the constraint applies to every new write
+    op.execute(
+        "ALTER TABLE worklog_daily_totals ADD CONSTRAINT ck_worklog_daily_totals_cap "
+        "CHECK (hours >= 0 AND hours <= 80) NOT VALID"
+    )
+
+    op.execute(REFRESH_DAILY_TOTAL_FUNCTION)
+    op.execute(DAILY_TOTALS_TRIGGER)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER trg_worklogs_daily_totals ON worklogs")
+    _drop_checks()
+
+    for table, column, _, numeric_type in TENTHS_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {numeric_type} USING {column} / 10.0")
+
+    _add_duration_checks('duration >= 1 AND duration <= 8')
+    op.execute(
+        "ALTER TABLE worklog_daily_totals ADD CONSTRAINT ck_worklog_daily_totals_cap "
+        "CHECK (hours >= 0 AND hours <= 8) NOT VALID"
+    )
+
+    op.execute(PREVIOUS_REFRESH_DAILY_TOTAL_FUNCTION)
+    op.execute(DAILY_TOTALS_TRIGGER)
@@ -0,0 +1,54 @@
+"""covering_and_foreign_key_indexes
+
+Revision ID: e4a7b2c91f05
+Revises: 8c3f2a61d4b7
+Create Date: 2026-10-19 17:12:44.905318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7b2c91f05'
+down_revision: Union[str, Sequence[str], None] = '8c3f2a61d4b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# indexes of foreign keys not led by any other index, used by the joins and the ON DELETE actions
+FOREIGN_KEY_INDEXES = [
+    ('sessions', 'user_id'),
+    ('activities', 'activity_type_id'),
+    ('activity_tasks', 'activity_id'),
+    ('activity_users', 'activity_id'),
+    ('activity_users', 'assigned_by_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the daily totals (and the cap check) and the monthly hours sum duration by (user_id, date) ranges and task,
+    # served from the index alone; the journal reads the worklog ids too, so it uses it only to find the rows
+    op.create_index(
+        'ix_worklogs_user_id_date_covering',
+        'worklogs',
+        ['user_id', 'date'],
+        unique=False,
+        postgresql_include=['duration', 'activity_task_id'],
+    )
+    op.drop_index('ix_worklogs_user_id_date', table_name='worklogs')
+
+    for table, column in FOREIGN_KEY_INDEXES:
+        op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(FOREIGN_KEY_INDEXES):
+        op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table)
+
+    op.create_index('ix_worklogs_user_id_date', 'worklogs', ['user_id', 'date'], unique=False)
+    op.drop_index('ix_worklogs_user_id_date_covering', table_name='worklogs')
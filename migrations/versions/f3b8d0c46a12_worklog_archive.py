@@ -0,0 +1,338 @@
+"""worklog_archive
+
+Revision ID: f3b8d0c46a12
+Revises: a9d35e17c2b8
+Create Date: 2026-10-19 21:12:37.904115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d0c46a12'
+down_revision: Union[str, Sequence[str], None] = 'a9d35e17c2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Moves the partition of a month from worklogs to worklogs_archive, returns the number of worklogs archived or
+# null if the month is already archived. The month is summed per (user, task) into worklog_monthly_summaries while
+# worklogs is locked, then the partition is detached and attached to the archive: rows are not copied, the
+# indexes matching the archive ones are kept and the others dropped. Worklogs of the month still in
+# worklogs_default (no partition) can't be archived, the month has to be partitioned first.
+ARCHIVE_MONTH_FUNCTION = """
+CREATE OR REPLACE FUNCTION archive_worklog_month(p_month date)
+RETURNS integer AS $$
+DECLARE
+    v_month date := date_trunc('month', p_month)::date;
+    v_next date := (date_trunc('month', p_month) + interval '1 month')::date;
+    v_name text := 'worklogs_p' || to_char(p_month, 'YYYY_MM');
+    v_archive text := 'worklogs_archive_p' || to_char(p_month, 'YYYY_MM');
+    v_count integer;
+    v_hours numeric;
+    v_index record;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('archive_worklog_month'));
+
+    IF EXISTS (SELECT 1 FROM worklog_archived_months WHERE month = v_month) THEN
+        RETURN NULL;
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(v_name) AND inhparent = 'worklogs'::regclass
+    ) THEN
+        RAISE EXCEPTION 'worklogs has no partition for %', v_month;
+    END IF;
+
+    -- taken by the detach anyway, taken first so no worklog of the month is written once summed
+    LOCK TABLE worklogs IN ACCESS EXCLUSIVE MODE;
+
+    INSERT INTO worklog_monthly_summaries (user_id, activity_task_id, month, hours, worklogs)
+    SELECT user_id, activity_task_id, v_month, sum(duration), count(*)
+    FROM worklogs
+    WHERE date >= v_month AND date < v_next AND user_id IS NOT NULL AND activity_task_id IS NOT NULL
+    GROUP BY user_id, activity_task_id;
+
+    SELECT count(*), coalesce(sum(duration), 0) INTO v_count, v_hours
+    FROM worklogs
+    WHERE date >= v_month AND date < v_next;
+
+    EXECUTE format('ALTER TABLE worklogs DETACH PARTITION %I', v_name);
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', v_name, v_archive);
+    EXECUTE format(
+        'ALTER TABLE worklogs_archive ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', v_archive, v_month, v_next
+    );
+
+    FOR v_index IN
+        SELECT i.indexrelid::regclass AS name, c.conname
+        FROM pg_index i
+        LEFT JOIN pg_constraint c ON c.conindid = i.indexrelid AND c.conrelid = i.indrelid
+        WHERE i.indrelid = v_archive::regclass
+          AND NOT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = i.indexrelid)
+    LOOP
+        IF v_index.conname IS NOT NULL THEN
+            EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', v_archive, v_index.conname);
+        ELSE
+            EXECUTE format('DROP INDEX %s', v_index.name);
+        END IF;
+    END LOOP;
+
+    INSERT INTO worklog_archived_months (month, worklogs, hours) VALUES (v_month, v_count, v_hours);
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Months before a date having a partition of worklogs, oldest first
+ARCHIVABLE_MONTHS_FUNCTION = """
+CREATE OR REPLACE FUNCTION archivable_worklog_months(p_before date)
+RETURNS SETOF date AS $$
+    SELECT month
+    FROM (
+        SELECT to_date(substr(c.relname, length('worklogs_p') + 1), 'YYYY_MM') AS month
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'worklogs'::regclass AND c.relname ~ '^worklogs_p\\d{4}_\\d{2}$'
+    ) AS partitions
+    WHERE month < date_trunc('month', p_before)::date
+    ORDER BY month;
+$$ LANGUAGE sql STABLE;
+"""
+
+# Worklogs of an archived month would land in worklogs_default alongside the archived ones, they are rejected
+GUARD_FUNCTION = """
+CREATE OR REPLACE FUNCTION worklog_archived_month_guard()
+RETURNS trigger AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM worklog_archived_months WHERE month = date_trunc('month', NEW.date)::date) THEN
+        RAISE EXCEPTION 'Worklogs of % are archived and can no longer be changed', to_char(NEW.date, 'YYYY-MM')
+            USING ERRCODE = 'check_violation', CONSTRAINT = 'ck_worklogs_not_archived', TABLE = 'worklogs';
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+GUARD_TRIGGER = """
+CREATE TRIGGER trg_worklogs_archived_months
+BEFORE INSERT OR UPDATE OF date ON worklogs
+FOR EACH ROW EXECUTE FUNCTION worklog_archived_month_guard()
+"""
+
+# Archived months are summed from their per (user, task) summary, hot worklogs of the month are summed along
+# (there are none once archived)
+REFRESH_HOURS_MONTHLY_FUNCTION = """
+CREATE OR REPLACE FUNCTION refresh_activity_hours_monthly(p_user_id uuid, p_month date)
+RETURNS void AS $$
+BEGIN
+    IF p_user_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('activity_hours_monthly'), hashtext(p_user_id::text || p_month::text));
+
+    DELETE FROM activity_hours_monthly WHERE user_id = p_user_id AND month = p_month;
+
+    INSERT INTO activity_hours_monthly (activity_id, user_id, month, hours)
+    SELECT t.activity_id, p_user_id, p_month, sum(logged.hours)
+    FROM (
+        SELECT w.activity_task_id, w.duration AS hours
+        FROM worklogs w
+        WHERE w.user_id = p_user_id
+          AND w.date >= p_month AND w.date < (p_month + interval '1 month')::date
+        UNION ALL
+        SELECT s.activity_task_id, s.hours
+        FROM worklog_monthly_summaries s
+        WHERE s.user_id = p_user_id AND s.month = p_month
+    ) AS logged
+    JOIN activity_tasks t ON t.id = logged.activity_task_id
+    WHERE t.activity_id IS NOT NULL
+    GROUP BY t.activity_id;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+APPLY_TASKS_FUNCTION = """
+CREATE OR REPLACE FUNCTION activity_task_hours_monthly_apply()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM refresh_activity_hours_monthly(user_id, month)
+    FROM (
+        SELECT w.user_id, date_trunc('month', w.date)::date AS month
+        FROM new_tasks n
+        JOIN old_tasks o ON o.id = n.id
+        JOIN worklogs w ON w.activity_task_id = n.id
+        WHERE o.activity_id IS DISTINCT FROM n.activity_id
+        UNION
+        SELECT s.user_id, s.month
+        FROM new_tasks n
+        JOIN old_tasks o ON o.id = n.id
+        JOIN worklog_monthly_summaries s ON s.activity_task_id = n.id
+        WHERE o.activity_id IS DISTINCT FROM n.activity_id
+        ORDER BY 1, 2
+    ) AS touched;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# summaries are deleted along with their task, the hours of the task are removed from the archived months
+APPLY_SUMMARIES_FUNCTION = """
+CREATE OR REPLACE FUNCTION worklog_summary_hours_monthly_apply()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM refresh_activity_hours_monthly(user_id, month)
+    FROM (SELECT DISTINCT user_id, month FROM old_summaries ORDER BY 1, 2) AS touched;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+SUMMARIES_TRIGGER = """
+CREATE TRIGGER trg_worklog_monthly_summaries_hours_monthly
+AFTER DELETE ON worklog_monthly_summaries REFERENCING OLD TABLE AS old_summaries
+FOR EACH STATEMENT EXECUTE FUNCTION worklog_summary_hours_monthly_apply()
+"""
+
+# definitions of a9d35e17c2b8, restored on downgrade
+PREVIOUS_REFRESH_HOURS_MONTHLY_FUNCTION = """
+CREATE OR REPLACE FUNCTION refresh_activity_hours_monthly(p_user_id uuid, p_month date)
+RETURNS void AS $$
+BEGIN
+    IF p_user_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('activity_hours_monthly'), hashtext(p_user_id::text || p_month::text));
+
+    DELETE FROM activity_hours_monthly WHERE user_id = p_user_id AND month = p_month;
+
+    INSERT INTO activity_hours_monthly (activity_id, user_id, month, hours)
+    SELECT t.activity_id, w.user_id, p_month, sum(w.duration)
+    FROM worklogs w
+    JOIN activity_tasks t ON t.id = w.activity_task_id
+    WHERE w.user_id = p_user_id
+      AND w.date >= p_month AND w.date < (p_month + interval '1 month')::date
+      AND t.activity_id IS NOT NULL
+    GROUP BY t.activity_id, w.user_id;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_APPLY_TASKS_FUNCTION = """
+CREATE OR REPLACE FUNCTION activity_task_hours_monthly_apply()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM refresh_activity_hours_monthly(user_id, month)
+    FROM (
+        SELECT DISTINCT w.user_id, date_trunc('month', w.date)::date AS month
+        FROM new_tasks n
+        JOIN old_tasks o ON o.id = n.id
+        JOIN worklogs w ON w.activity_task_id = n.id
+        WHERE o.activity_id IS DISTINCT FROM n.activity_id
+        ORDER BY 1, 2
+    ) AS touched;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# archived partitions go back to worklogs, missing indexes and the row triggers are recreated by the attach
+RESTORE_ARCHIVED_PARTITIONS = """
+DO $$
+DECLARE
+    v_partition record;
+BEGIN
+    FOR v_partition IN
+        SELECT c.relname AS name, 'worklogs_p' || substr(c.relname, length('worklogs_archive_p') + 1) AS hot_name,
+               to_date(substr(c.relname, length('worklogs_archive_p') + 1), 'YYYY_MM') AS month
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'worklogs_archive'::regclass
+    LOOP
+        EXECUTE format('ALTER TABLE worklogs_archive DETACH PARTITION %I', v_partition.name);
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', v_partition.name, v_partition.hot_name);
+        EXECUTE format(
+            'ALTER TABLE worklogs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+            v_partition.hot_name, v_partition.month, (v_partition.month + interval '1 month')::date
+        );
+    END LOOP;
+END;
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('worklogs_archive',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('duration', sa.Numeric(precision=3, scale=1), nullable=False),
+    sa.Column('activity_task_id', sa.UUID(), nullable=True),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['activity_task_id'], ['activity_tasks.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id', 'date'),
+    sa.UniqueConstraint('activity_task_id', 'user_id', 'date', name='uq_worklogs_archive_user_activity_task_date'),
+    postgresql_partition_by='RANGE (date)'
+    )
+    op.create_index('ix_worklogs_archive_user_id_date_covering', 'worklogs_archive', ['user_id', 'date'], unique=False, postgresql_include=['duration', 'activity_task_id'])
+    op.create_table('worklog_archived_months',
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('worklogs', sa.Integer(), nullable=False),
+    sa.Column('hours', sa.Numeric(precision=10, scale=1), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('month')
+    )
+    op.create_table('worklog_monthly_summaries',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('activity_task_id', sa.UUID(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('hours', sa.Numeric(precision=8, scale=1), nullable=False),
+    sa.Column('worklogs', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['activity_task_id'], ['activity_tasks.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'activity_task_id', 'month')
+    )
+    op.create_index(op.f('ix_worklog_monthly_summaries_activity_task_id'), 'worklog_monthly_summaries', ['activity_task_id'], unique=False)
+
+    op.execute(ARCHIVE_MONTH_FUNCTION)
+    op.execute(ARCHIVABLE_MONTHS_FUNCTION)
+    op.execute(GUARD_FUNCTION)
+    op.execute(GUARD_TRIGGER)
+    op.execute(REFRESH_HOURS_MONTHLY_FUNCTION)
+    op.execute(APPLY_TASKS_FUNCTION)
+    op.execute(APPLY_SUMMARIES_FUNCTION)
+    op.execute(SUMMARIES_TRIGGER)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_worklogs_archived_months ON worklogs")
+    op.execute(RESTORE_ARCHIVED_PARTITIONS)
+
+    op.execute("DROP TRIGGER IF EXISTS trg_worklog_monthly_summaries_hours_monthly ON worklog_monthly_summaries")
+    op.execute("DROP FUNCTION IF EXISTS worklog_summary_hours_monthly_apply()")
+    op.execute(PREVIOUS_APPLY_TASKS_FUNCTION)
+    op.execute(PREVIOUS_REFRESH_HOURS_MONTHLY_FUNCTION)
+    op.execute("DROP FUNCTION IF EXISTS worklog_archived_month_guard()")
+    op.execute("DROP FUNCTION IF EXISTS archivable_worklog_months(date)")
+    op.execute("DROP FUNCTION IF EXISTS archive_worklog_month(date)")
+
+    op.drop_index(op.f('ix_worklog_monthly_summaries_activity_task_id'), table_name='worklog_monthly_summaries')
+    op.drop_table('worklog_monthly_summaries')
+    op.drop_table('worklog_archived_months')
+    op.drop_index('ix_worklogs_archive_user_id_date_covering', table_name='worklogs_archive')
+    op.drop_table('worklogs_archive')
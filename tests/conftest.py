@@ -1,6 +1,7 @@
 from typing import AsyncGenerator, Generator
 from uuid import uuid4
 
+import fakeredis
 import pytest
 import pytest_asyncio
 from fastapi import FastAPI
@@ -9,7 +10,10 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from app.core.config import settings
 from app.core.database.url import DATABASE_URL
+from app.core.security.jwt import hash_password
 from app.dto.auth import LoginUserDto, RegisterUserDto
+from app.models import Activity, ActivityTask, ActivityType, ActivityUser, User
+from app.redis_client import RedisClient, get_redis_client
 
 AsyncSessionMaker = async_sessionmaker[AsyncSession]
 
@@ -75,3 +79,43 @@ def app_session() -> dict[str, Cookies | None]:
 @pytest.fixture
 def user_id() -> str:
     return str(uuid4())
+
+
+@pytest_asyncio.fixture
+async def redis() -> AsyncGenerator[RedisClient]:
+    """The redis client of the app, backed by an in-memory server for the duration of the test"""
+    redis_client = get_redis_client()
+    previous = redis_client._client
+    redis_client._client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    try:
+        yield redis_client
+    finally:
+        await redis_client._client.aclose()
+        redis_client._client = previous
+
+
+@pytest_asyncio.fixture
+async def employee(async_session: AsyncSession) -> User:
+    """
+    An employee assigned to an activity, with two tasks of it. Committed, as the app writes through its
+    own transactions (and sessions, for the autosave flusher).
+    """
+    suffix = uuid4().hex[:8]
+    user = User(
+        full_name="Employee Tester", email=f"employee-{suffix}@example.com", hashed_password=hash_password("123456")
+    )
+    activity_type = ActivityType(title=f"Employee {suffix}")
+    activity = Activity(title="Development", code=f"DEV-{suffix}", activity_type=activity_type)
+    tasks = [ActivityTask(title=title, activity=activity, user=user) for title in ("Design", "Review")]
+    async_session.add_all([user, ActivityUser(user=user, activity=activity), *tasks])
+    await async_session.commit()
+    return user
+
+
+@pytest_asyncio.fixture
+async def employee_client(client: AsyncClient, employee: User, redis: RedisClient) -> AsyncClient:
+    """Client logged in as the employee"""
+    response = await client.post("/auth/login", data={"username": employee.email, "password": "123456"})
+    assert response.status_code == 200
+    client.cookies.update(response.cookies)
+    return client
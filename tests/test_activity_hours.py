@@ -0,0 +1,70 @@
+from datetime import date
+from typing import Set
+from uuid import UUID, uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.activity_hours import ActivityHoursMonthlyBase
+from app.dto.report import ActivityHoursLevel
+from app.models import Activity, ActivityTask, ActivityType, User, Worklog
+
+
+class TestActivityHoursMonthly:
+    """Test the monthly summary kept by the worklog triggers and its rollup"""
+
+    @pytest_asyncio.fixture
+    async def tasks(self, async_session: AsyncSession):
+        suffix = uuid4().hex[:8]
+        user = User(full_name="Rollup Tester", email=f"rollup-{suffix}@example.com", hashed_password="-")
+        activity_type = ActivityType(title=f"Rollup {suffix}")
+        activities = [
+            Activity(title="Billing", code=f"BIL-{suffix}", activity_type=activity_type),
+            Activity(title="Support", code=f"SUP-{suffix}", activity_type=activity_type),
+        ]
+        tasks = [ActivityTask(title=f"{activity.title} task", activity=activity, user=user) for activity in activities]
+        async_session.add_all([user, *tasks])
+        await async_session.flush()
+        return tasks
+
+    async def _rollup(self, session: AsyncSession, user_id: UUID, activity_ids: Set[UUID]):
+        """Rows of the test user and activities, keyed by (level, month, activity)"""
+        rows = await ActivityHoursMonthlyBase.get_rollup(session, date(2026, 3, 1), date(2026, 4, 1))
+        return {
+            (row.level, row.month.month, row.activity_id): row.hours
+            for row in rows
+            if row.user_id == user_id or row.activity_id in activity_ids
+        }
+
+    @pytest.mark.asyncio
+    async def test_worklog_writes_are_summed(self, async_session: AsyncSession, tasks):
+        billing, support = tasks
+        user_id, billing_id, support_id = billing.user_id, billing.activity_id, support.activity_id
+        async_session.add_all(
+            [
+                Worklog(date=date(2026, 3, 2), duration=3, activity_task=billing, user_id=user_id),
+                Worklog(date=date(2026, 3, 3), duration=2.5, activity_task=billing, user_id=user_id),
+                Worklog(date=date(2026, 3, 3), duration=4, activity_task=support, user_id=user_id),
+                Worklog(date=date(2026, 4, 1), duration=1, activity_task=support, user_id=user_id),
+            ]
+        )
+        await async_session.flush()
+
+        rollup = await self._rollup(async_session, user_id, {billing_id, support_id})
+        assert rollup[(ActivityHoursLevel.ACTIVITY_USER, 3, billing_id)] == 5.5
+        assert rollup[(ActivityHoursLevel.ACTIVITY, 3, support_id)] == 4
+        assert rollup[(ActivityHoursLevel.USER, 3, None)] == 9.5
+        assert rollup[(ActivityHoursLevel.USER, 4, None)] == 1
+
+        await async_session.execute(delete(Worklog).where(Worklog.user_id == user_id, Worklog.date == date(2026, 3, 2)))
+        await async_session.execute(
+            update(ActivityTask).where(ActivityTask.id == support.id).values(activity_id=billing_id)
+        )
+
+        rollup = await self._rollup(async_session, user_id, {billing_id, support_id})
+        assert rollup[(ActivityHoursLevel.ACTIVITY_USER, 3, billing_id)] == 6.5
+        assert rollup[(ActivityHoursLevel.ACTIVITY_USER, 4, billing_id)] == 1
+        assert (ActivityHoursLevel.ACTIVITY_USER, 3, support_id) not in rollup
+        assert rollup[(ActivityHoursLevel.USER, 3, None)] == 6.5
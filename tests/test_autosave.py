@@ -0,0 +1,116 @@
+from datetime import date
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import session_manager
+from app.dto.activity import AutosaveCellDto, AutosaveDto
+from app.dto.journal import GetJournalDto
+from app.models import User, Worklog
+from app.redis_client import RedisClient
+from app.services.autosave import AutosaveFlusher, AutosaveService, autosave_flusher
+from app.services.journal import JournalService
+
+
+class TestAutosave:
+    """Test the autosave buffer of the journal cells and its flush to the database"""
+
+    @pytest_asyncio.fixture
+    async def flusher(self) -> AutosaveFlusher:
+        """The flusher of the app, the connections it opens are bound to the event loop of the test"""
+        yield autosave_flusher
+        await session_manager.engine.dispose()
+
+    async def _save(self, session: AsyncSession, user: User, cells: Dict[Tuple[int, date], Optional[float]]):
+        """Buffer cell edits keyed by (index of the task of the user, date)"""
+        data = AutosaveDto(
+            cells=[
+                AutosaveCellDto(task_id=user.tasks[task].id, date=day, duration=duration)
+                for (task, day), duration in cells.items()
+            ]
+        )
+        return await AutosaveService(session).save_cells(data, user.id)
+
+    async def _worklogs(self, session: AsyncSession, user: User) -> Dict[Tuple[UUID, date], float]:
+        result = await session.execute(
+            select(Worklog.activity_task_id, Worklog.date, Worklog.duration).where(Worklog.user_id == user.id)
+        )
+        return {(task_id, day): duration for task_id, day, duration in result.all()}
+
+    @pytest.mark.asyncio
+    async def test_buffered_edits_are_flushed(
+        self, async_session: AsyncSession, employee: User, redis: RedisClient, flusher: AutosaveFlusher
+    ):
+        design, review = (task.id for task in employee.tasks)
+        async_session.add(Worklog(date=date(2026, 3, 2), duration=3, activity_task_id=design, user_id=employee.id))
+        await async_session.commit()
+
+        status = await self._save(
+            async_session, employee, {(0, date(2026, 3, 2)): None, (0, date(2026, 3, 3)): 2.5, (1, date(2026, 3, 3)): 4}
+        )
+        assert status.pending == 3
+        assert status.errors == []
+        # nothing is written before the flush
+        assert await self._worklogs(async_session, employee) == {(design, date(2026, 3, 2)): 3}
+
+        assert await flusher.flush_due(force=True) == 3
+        assert await self._worklogs(async_session, employee) == {
+            (design, date(2026, 3, 3)): 2.5,
+            (review, date(2026, 3, 3)): 4,
+        }
+        assert await AutosaveService(async_session).get_pending(employee.id) == {}
+
+    @pytest.mark.asyncio
+    async def test_rejected_edit_does_not_block_others(
+        self, async_session: AsyncSession, employee: User, redis: RedisClient, flusher: AutosaveFlusher
+    ):
+        design, review = (task.id for task in employee.tasks)
+        async_session.add(Worklog(date=date(2026, 3, 2), duration=6, activity_task_id=design, user_id=employee.id))
+        await async_session.commit()
+
+        # 6h already logged on the 2nd, another 4h exceeds the daily limit
+        await self._save(
+            async_session, employee, {(0, date(2026, 3, 3)): 2, (1, date(2026, 3, 2)): 4, (1, date(2026, 3, 4)): 1}
+        )
+        assert await flusher.flush_due(force=True) == 2
+        assert await self._worklogs(async_session, employee) == {
+            (design, date(2026, 3, 2)): 6,
+            (design, date(2026, 3, 3)): 2,
+            (review, date(2026, 3, 4)): 1,
+        }
+
+        # the rejected edit is discarded and reported by the next autosave
+        status = await self._save(async_session, employee, {(0, date(2026, 3, 5)): 1})
+        assert status.pending == 1
+        assert [(error.task_id, error.date) for error in status.errors] == [(review, date(2026, 3, 2))]
+        assert "Daily limit exceeded" in status.errors[0].message
+
+    @pytest.mark.asyncio
+    async def test_journal_reads_buffered_edits(self, async_session: AsyncSession, employee: User, redis: RedisClient):
+        design, review = (task.id for task in employee.tasks)
+        async_session.add_all(
+            [
+                Worklog(date=date(2026, 3, 2), duration=3, activity_task_id=design, user_id=employee.id),
+                Worklog(date=date(2026, 3, 3), duration=1, activity_task_id=design, user_id=employee.id),
+            ]
+        )
+        await async_session.commit()
+
+        await self._save(
+            async_session, employee, {(0, date(2026, 3, 2)): None, (0, date(2026, 3, 3)): 2, (1, date(2026, 3, 4)): 1.5}
+        )
+
+        journal = await JournalService(async_session).get_journal(
+            GetJournalDto(start_date=date(2026, 3, 1), end_date=date(2026, 3, 31)), employee.id
+        )
+        [activity] = journal
+        cells = {
+            (task["id"], worklog["date"]): worklog["duration"]
+            for task in activity["tasks"]
+            for worklog in task["worklogs"]
+        }
+        assert cells == {(str(design), "2026-03-03"): 2, (str(review), "2026-03-04"): 1.5}
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User
+
+
+class TestConditionalGet:
+    """Test the ETag of the conditional GET routes and the 304 answers to If-None-Match"""
+
+    PERIOD = {"startDate": "2026-03-01", "endDate": "2026-03-31"}
+
+    async def _get_journal(self, client: AsyncClient, etag: str | None = None):
+        headers = {"If-None-Match": etag} if etag else {}
+        return await client.get("/journal/", params=self.PERIOD, headers=headers)
+
+    def _cells(self, response) -> dict:
+        [activity] = response.json()["data"]
+        return {
+            (task["id"], worklog["date"]): worklog["duration"]
+            for task in activity["tasks"]
+            for worklog in task["worklogs"]
+        }
+
+    @pytest.mark.asyncio
+    async def test_journal_not_modified_until_written(self, employee_client: AsyncClient, employee: User):
+        task_id = employee.tasks[0].id
+
+        response = await self._get_journal(employee_client)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["ETag"]
+        assert etag.startswith('W/"')
+        assert response.headers["Cache-Control"] == "private, no-cache"
+
+        response = await self._get_journal(employee_client, etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+        # another period of the same journal has its own etag
+        response = await employee_client.get(
+            "/journal/", params={**self.PERIOD, "endDate": "2026-03-15"}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        await employee_client.patch(f"/activity/task/{task_id}/worklog/2026-03-02", json={"duration": 2})
+
+        response = await self._get_journal(employee_client, etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+        assert self._cells(response) == {(str(task_id), "2026-03-02"): 2}
+
+        response = await self._get_journal(employee_client, response.headers["ETag"])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.asyncio
+    async def test_journal_with_pending_autosave(self, employee_client: AsyncClient, employee: User):
+        task_id = employee.tasks[0].id
+        etag = (await self._get_journal(employee_client)).headers["ETag"]
+
+        cell = {"taskId": str(task_id), "date": "2026-03-03", "duration": 1.5}
+        response = await employee_client.post("/activity/autosave", json={"cells": [cell]})
+        assert response.json()["data"]["pending"] == 1
+
+        # the buffered edit is not in the database yet, the journal still changed for the employee
+        response = await self._get_journal(employee_client, etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+        assert self._cells(response) == {(str(task_id), "2026-03-03"): 1.5}
+        etag = response.headers["ETag"]
+
+        await employee_client.post("/activity/autosave", json={"cells": [{**cell, "duration": 2}]})
+        response = await self._get_journal(employee_client, etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert self._cells(response) == {(str(task_id), "2026-03-03"): 2}
+
+        response = await self._get_journal(employee_client, response.headers["ETag"])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.asyncio
+    async def test_journal_delta_is_not_conditional(self, employee_client: AsyncClient):
+        since = datetime.now(timezone.utc).isoformat()
+        response = await employee_client.get("/journal/", params={**self.PERIOD, "since": since})
+        assert response.status_code == status.HTTP_200_OK
+        assert "ETag" not in response.headers
+
+        response = await employee_client.get(
+            "/journal/", params={**self.PERIOD, "since": since}, headers={"If-None-Match": "*"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.asyncio
+    async def test_current_user(self, employee_client: AsyncClient, employee: User, async_session: AsyncSession):
+        response = await employee_client.get("/auth/me")
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["ETag"]
+
+        response = await employee_client.get("/auth/me", headers={"If-None-Match": f'"other", {etag}'})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        await async_session.execute(update(User).where(User.id == employee.id).values(full_name="Renamed Tester"))
+
+        response = await employee_client.get("/auth/me", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+        assert response.json()["data"]["fullName"] == "Renamed Tester"
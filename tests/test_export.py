@@ -0,0 +1,34 @@
+import csv
+import gzip
+import io
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.services.export import HEADER, ExportService
+
+
+async def _batches():
+    yield [(date(2026, 5, 4), "Jason", "jason@example.com", "Projects", "SCAI", "SCAI, Riyadh", "Task", Decimal("3.0"))]
+    yield []
+    yield [(date(2026, 5, 5), "Jason", "jason@example.com", None, None, None, None, Decimal("2.5"))]
+
+
+class TestExport:
+    """Test the chunks of the streamed worklog export"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("compress", [False, True])
+    async def test_csv_chunks(self, compress):
+        chunks = [chunk async for chunk in ExportService(None)._csv(_batches(), compress=compress)]
+        content = b"".join(chunks)
+        if compress:
+            content = gzip.decompress(content)
+
+        assert all(chunks)
+        assert list(csv.reader(io.StringIO(content.decode()))) == [
+            HEADER,
+            ["2026-05-04", "Jason", "jason@example.com", "Projects", "SCAI", "SCAI, Riyadh", "Task", "3.0"],
+            ["2026-05-05", "Jason", "jason@example.com", "", "", "", "", "2.5"],
+        ]
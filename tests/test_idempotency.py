@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dependencies.idempotency import Idempotent
+from app.models import ActivityTask, User
+from app.services.activity import ActivityService
+
+
+class TestIdempotency:
+    """Test the Idempotency-Key handling of the idempotent routes"""
+
+    def _add_task(self, client: AsyncClient, employee: User, key: str, title: str = "Idempotent task"):
+        activity_id = employee.tasks[0].activity_id
+        return client.post(f"/activity/{activity_id}/task", json={"title": title}, headers={"Idempotency-Key": key})
+
+    async def _count_tasks(self, session: AsyncSession, employee: User, title: str = "Idempotent task") -> int:
+        stmt = select(func.count()).where(ActivityTask.user_id == employee.id, ActivityTask.title == title)
+        return await session.scalar(stmt)
+
+    @pytest.fixture
+    def paused_route(self, monkeypatch):
+        """Keep the route of the first request running (holding the in-flight lock) until the event is set"""
+        started, release = asyncio.Event(), asyncio.Event()
+        add_activity_task = ActivityService.add_activity_task
+
+        async def paused(service, *args, **kwargs):
+            started.set()
+            await release.wait()
+            return await add_activity_task(service, *args, **kwargs)
+
+        monkeypatch.setattr(ActivityService, "add_activity_task", paused)
+        return started, release
+
+    @pytest.mark.asyncio
+    async def test_retry_is_replayed(self, employee_client: AsyncClient, employee: User, async_session: AsyncSession):
+        first = await self._add_task(employee_client, employee, "retry-key")
+        assert first.status_code == status.HTTP_200_OK
+        assert "Idempotent-Replayed" not in first.headers
+
+        retry = await self._add_task(employee_client, employee, "retry-key")
+        assert retry.status_code == status.HTTP_200_OK
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert retry.json() == first.json()
+
+        assert await self._count_tasks(async_session, employee) == 1
+
+    @pytest.mark.asyncio
+    async def test_key_reused_for_another_request(self, employee_client: AsyncClient, employee: User):
+        first = await self._add_task(employee_client, employee, "reused-key")
+        assert first.status_code == status.HTTP_200_OK
+
+        other = await self._add_task(employee_client, employee, "reused-key", title="Another task")
+        assert other.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicate_receives_first_response(
+        self, employee_client: AsyncClient, employee: User, async_session: AsyncSession, paused_route
+    ):
+        started, release = paused_route
+        first = asyncio.create_task(self._add_task(employee_client, employee, "concurrent-key"))
+        await started.wait()
+
+        duplicate = asyncio.create_task(self._add_task(employee_client, employee, "concurrent-key"))
+        await asyncio.sleep(0.3)
+        # the duplicate waits on the in-flight lock of the first request
+        assert not duplicate.done()
+
+        release.set()
+        first_response, duplicate_response = await asyncio.gather(first, duplicate)
+        assert first_response.status_code == status.HTTP_200_OK
+        assert duplicate_response.headers["Idempotent-Replayed"] == "true"
+        assert duplicate_response.json() == first_response.json()
+
+        assert await self._count_tasks(async_session, employee) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicate_finds_lock_held(
+        self, employee_client: AsyncClient, employee: User, async_session: AsyncSession, paused_route, monkeypatch
+    ):
+        started, release = paused_route
+        monkeypatch.setattr(Idempotent.__metadata__[0].dependency, "wait_seconds", 0.2)
+
+        first = asyncio.create_task(self._add_task(employee_client, employee, "locked-key"))
+        await started.wait()
+
+        duplicate = await self._add_task(employee_client, employee, "locked-key")
+        assert duplicate.status_code == status.HTTP_409_CONFLICT
+
+        release.set()
+        assert (await first).status_code == status.HTTP_200_OK
+        assert await self._count_tasks(async_session, employee) == 1
@@ -0,0 +1,32 @@
+import time
+from uuid import RFC_4122
+
+from app.core.database.ids import uuid7
+from app.models import Session, Worklog, WorklogDailyTotal
+
+
+class TestUUID7:
+    """Test the time-ordered ids of the primary keys"""
+
+    def test_layout(self):
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+
+        assert value.version == 7
+        assert value.variant == RFC_4122
+        assert before <= value.int >> 80 <= after + 1
+
+    def test_ids_are_increasing(self):
+        ids = [uuid7() for _ in range(10_000)]
+
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+        # Postgres compares uuids bytewise
+        assert [item.bytes for item in ids] == sorted(item.bytes for item in ids)
+
+    def test_models_default_to_uuid7(self):
+        for model in (Session, Worklog):
+            assert model.__table__.c.id.default.arg(None).version == 7
+
+        assert "id" not in WorklogDailyTotal.__table__.c
@@ -0,0 +1,101 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.tombstone import SyncTombstoneBase
+from app.dto.journal import GetJournalDto
+from app.models import User, Worklog
+from app.redis_client import RedisClient
+from app.services.journal import JournalService
+from app.services.journal_snapshot import JournalSnapshots
+
+
+class TestJournalDelta:
+    """Test the journal changes sent since a watermark"""
+
+    PERIOD = {"startDate": "2026-03-01", "endDate": "2026-03-31"}
+
+    async def _delta(self, client: AsyncClient, since: str):
+        return await client.get("/journal/", params={**self.PERIOD, "since": since})
+
+    @pytest.mark.asyncio
+    async def test_changes_and_deletions(self, employee_client: AsyncClient, employee: User):
+        task_id = employee.tasks[0].id
+        since = datetime.now(timezone.utc) - timedelta(minutes=1)
+
+        response = await employee_client.patch(f"/activity/task/{task_id}/worklog/2026-03-02", json={"duration": 2})
+        worklog_id = response.json()["data"]["id"]
+
+        response = await self._delta(employee_client, since.isoformat())
+        assert response.status_code == status.HTTP_200_OK
+        delta = response.json()["data"]
+        assert [worklog["id"] for worklog in delta["worklogs"]] == [worklog_id]
+        assert delta["deletedWorklogs"] == []
+
+        await employee_client.patch(f"/activity/task/{task_id}/worklog/2026-03-02", json={"duration": None})
+
+        response = await self._delta(employee_client, delta["watermark"])
+        assert response.status_code == status.HTTP_200_OK
+        delta = response.json()["data"]
+        assert delta["worklogs"] == []
+        assert delta["deletedWorklogs"] == [worklog_id]
+
+    @pytest.mark.asyncio
+    async def test_naive_watermark_is_rejected(self, employee_client: AsyncClient):
+        # compared with the timestamps of the database, a watermark without its offset is ambiguous
+        response = await self._delta(employee_client, "2026-05-02T10:00:00")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+    @pytest.mark.asyncio
+    async def test_expired_watermark_is_gone(self, employee_client: AsyncClient):
+        since = datetime.now(timezone.utc) - timedelta(days=SyncTombstoneBase.RETENTION_DAYS + 1)
+        response = await self._delta(employee_client, since.isoformat())
+        assert response.status_code == status.HTTP_410_GONE
+
+
+class TestJournalSnapshots:
+    """Test the month journals served from their Redis snapshot"""
+
+    MARCH = GetJournalDto(start_date=date(2026, 3, 1), end_date=date(2026, 3, 31))
+
+    def _cells(self, journal) -> dict:
+        [activity] = journal
+        return {
+            (task["id"], worklog["date"]): worklog["duration"]
+            for task in activity["tasks"]
+            for worklog in task["worklogs"]
+        }
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_saved_and_served(self, async_session: AsyncSession, employee: User, redis: RedisClient):
+        journal = await JournalService(async_session).get_journal(self.MARCH, employee.id)
+        assert await redis.exists(JournalSnapshots._key(employee.id, "2026-03")) == 1
+        assert await JournalService(async_session).get_journal(self.MARCH, employee.id) == journal
+
+    @pytest.mark.asyncio
+    async def test_missed_invalidation_is_not_served(
+        self, async_session: AsyncSession, employee: User, redis: RedisClient
+    ):
+        task_id = employee.tasks[0].id
+        assert self._cells(await JournalService(async_session).get_journal(self.MARCH, employee.id)) == {}
+
+        # written without bumping the versions of the snapshots, as when Redis fails on the invalidation
+        async_session.add(Worklog(date=date(2026, 3, 2), duration=2, activity_task_id=task_id, user_id=employee.id))
+        await async_session.flush()
+
+        journal = await JournalService(async_session).get_journal(self.MARCH, employee.id)
+        assert self._cells(journal) == {(str(task_id), "2026-03-02"): 2}
+
+    @pytest.mark.asyncio
+    async def test_failed_save_still_returns_journal(
+        self, async_session: AsyncSession, employee: User, redis: RedisClient, monkeypatch
+    ):
+        async def timeout(*args, **kwargs):
+            raise TimeoutError("Timeout reading from redis")
+
+        monkeypatch.setattr(redis, "set", timeout)
+        journal = await JournalService(async_session).get_journal(self.MARCH, employee.id)
+        assert [task["title"] for task in journal[0]["tasks"]] == ["Design", "Review"]
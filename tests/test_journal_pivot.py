@@ -0,0 +1,57 @@
+from datetime import date
+from types import SimpleNamespace
+
+from app.services.journal_matrix import build_team_matrix
+from app.services.journal_pivot import JournalPivot
+
+
+class TestJournalPivot:
+    """Test the scattering and the totals of the journal pivot grid"""
+
+    def test_scatter_and_totals(self):
+        pivot = JournalPivot(date(2026, 5, 1), date(2026, 5, 3), ["a", "b"])
+        pivot.scatter(["a", "b", "a", "unknown"], [0, 0, 2, 1], [2.5, 0.1, 4, 3], ids=["w1", "w2", "w3", "w4"])
+
+        assert pivot.duration_rows() == [[2.5, None, 4.0], [0.1, None, None]]
+        assert pivot.id_rows() == [["w1", None, "w3"], ["w2", None, None]]
+        assert pivot.hours(pivot.task_totals) == [6.5, 0.1]
+        assert pivot.hours(pivot.day_totals) == [2.6, 0.0, 4.0]
+
+    def test_scatter_clears_and_ignores_out_of_period(self):
+        pivot = JournalPivot(date(2026, 5, 1), date(2026, 5, 2), ["a"])
+        pivot.scatter(["a", "a"], pivot.offsets(["2026-05-01", "2026-05-03"]), [3, 5], ids=["w1", "w2"])
+        pivot.scatter(["a"], [0], [None])
+
+        assert pivot.duration_rows() == [[None, None]]
+        assert pivot.id_rows() == [[None, None]]
+        assert pivot.task_totals.tolist() == [0]
+
+    def test_over_cap_per_user(self):
+        pivot = JournalPivot(date(2026, 5, 1), date(2026, 5, 2), ["a", "b", "c"], task_users=["u1", "u1", "u2"])
+        pivot.scatter(["a", "b", "c", "a"], [0, 0, 0, 1], [5, 3.5, 8, 8])
+
+        assert pivot.users == ["u1", "u2"]
+        assert pivot.hours(pivot.user_day_totals) == [[8.5, 8.0], [8.0, 0.0]]
+        assert pivot.over_cap.tolist() == [[True, False], [False, False]]
+
+
+class TestTeamMatrix:
+    """Test the users × tasks × days matrix of a team journal"""
+
+    def test_users_tasks_and_totals(self):
+        users = [SimpleNamespace(id="u1", full_name="Ann"), SimpleNamespace(id="u2", full_name="Bob")]
+        tasks = [
+            SimpleNamespace(id="a", title="A", activity_id="x", activity_code="X", user_id="u1"),
+            SimpleNamespace(id="b", title="B", activity_id="x", activity_code="X", user_id="u1"),
+        ]
+        pivot = JournalPivot(date(2026, 5, 1), date(2026, 5, 2), ["a", "b"], task_users=["u1", "u1"])
+        pivot.scatter(["a", "b", "b"], [0, 0, 1], [2, 1.5, 4])
+
+        matrix = build_team_matrix(pivot, users, tasks)
+
+        assert matrix["dayTotals"] == [3.5, 4.0]
+        assert matrix["total"] == 7.5
+        ann, bob = matrix["users"]
+        assert ann["dayTotals"] == [3.5, 4.0]
+        assert [task["durations"] for task in ann["tasks"]] == [[2.0, None], [1.5, 4.0]]
+        assert bob == {"id": "u2", "fullName": "Bob", "dayTotals": [0.0, 0.0], "total": 0.0, "tasks": []}
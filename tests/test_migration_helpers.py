@@ -0,0 +1,88 @@
+from typing import AsyncGenerator, Callable
+
+import pytest
+import pytest_asyncio
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.database.url import DATABASE_URL
+from migrations.helpers import create_index_concurrently, invalid_indexes
+
+SCRATCH_TABLES = """
+CREATE TABLE scratch_events (id integer NOT NULL, day date NOT NULL) PARTITION BY RANGE (day);
+CREATE TABLE scratch_events_p2026_01 PARTITION OF scratch_events FOR VALUES FROM ('2026-01-01') TO ('2026-02-01');
+CREATE TABLE scratch_events_default PARTITION OF scratch_events DEFAULT;
+CREATE TABLE scratch_tokens (id integer NOT NULL, token text NOT NULL);
+INSERT INTO scratch_events SELECT n, date '2026-01-01' + n % 60 FROM generate_series(1, 200) n;
+INSERT INTO scratch_tokens SELECT n, 'token-' || n % 100 FROM generate_series(1, 200) n;
+"""
+
+
+class TestCreateIndexConcurrently:
+    """Test the concurrent index builds of the migrations, on scratch tables"""
+
+    @pytest_asyncio.fixture
+    async def engine(self) -> AsyncGenerator[AsyncEngine]:
+        engine = create_async_engine(DATABASE_URL)
+        async with engine.begin() as connection:
+            for statement in SCRATCH_TABLES.strip().split(";\n"):
+                await connection.execute(text(statement))
+        try:
+            yield engine
+        finally:
+            async with engine.begin() as connection:
+                await connection.execute(text("DROP TABLE IF EXISTS scratch_events, scratch_tokens"))
+            await engine.dispose()
+
+    async def _migrate(self, engine: AsyncEngine, operation: Callable[[], None]) -> None:
+        def run(connection: Connection) -> None:
+            with Operations.context(MigrationContext.configure(connection)):
+                operation()
+
+        async with engine.connect() as connection:
+            await connection.run_sync(run)
+
+    async def _scalar(self, engine: AsyncEngine, sql: str):
+        async with engine.connect() as connection:
+            return await connection.scalar(text(sql))
+
+    @pytest.mark.asyncio
+    async def test_partitioned_table_is_indexed_per_partition(self, engine: AsyncEngine):
+        await self._migrate(
+            engine, lambda: create_index_concurrently("ix_scratch_events_day", "scratch_events", ["day"])
+        )
+
+        assert await self._scalar(
+            engine, "SELECT indisvalid FROM pg_index WHERE indexrelid = 'ix_scratch_events_day'::regclass"
+        )
+        attached = await self._scalar(
+            engine, "SELECT count(*) FROM pg_inherits WHERE inhparent = 'ix_scratch_events_day'::regclass"
+        )
+        assert attached == 2
+
+        # built already, running the migration again is a no-op
+        await self._migrate(
+            engine, lambda: create_index_concurrently("ix_scratch_events_day", "scratch_events", ["day"])
+        )
+
+    @pytest.mark.asyncio
+    async def test_invalid_index_is_built_again(self, engine: AsyncEngine):
+        def build() -> None:
+            create_index_concurrently("ix_scratch_tokens_token", "scratch_tokens", ["token"], unique=True)
+
+        with pytest.raises(IntegrityError):
+            await self._migrate(engine, build)
+
+        async with engine.connect() as connection:
+            assert "ix_scratch_tokens_token" in await connection.run_sync(invalid_indexes)
+
+        async with engine.begin() as connection:
+            await connection.execute(text("DELETE FROM scratch_tokens WHERE id > 100"))
+
+        await self._migrate(engine, build)
+        assert await self._scalar(
+            engine, "SELECT indisvalid FROM pg_index WHERE indexrelid = 'ix_scratch_tokens_token'::regclass"
+        )
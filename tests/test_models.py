@@ -0,0 +1,45 @@
+from typing import List, Tuple
+
+from sqlalchemy import ForeignKeyConstraint, Table
+
+from app.core.security.jwt import hash_token
+
+# the models are imported along with the base so that they are all registered on its metadata
+from app.models import Base
+
+
+def _leading_columns(table: Table) -> List[Tuple[str, ...]]:
+    """Key columns of the indexes, unique constraints and the primary key of a table"""
+    keys = [tuple(column.name for column in index.columns) for index in table.indexes]
+    keys += [
+        tuple(column.name for column in constraint.columns)
+        for constraint in table.constraints
+        if not isinstance(constraint, ForeignKeyConstraint) and constraint.columns
+    ]
+    return keys
+
+
+class TestModels:
+    """Test the schema declared by the models"""
+
+    def test_foreign_keys_are_indexed(self):
+        """Every foreign key is the leading part of an index, a unique constraint or the primary key"""
+        missing = []
+        for table in Base.metadata.sorted_tables:
+            keys = _leading_columns(table)
+            for foreign_key in table.foreign_key_constraints:
+                columns = set(foreign_key.column_keys)
+                if not any(set(key[: len(columns)]) == columns for key in keys):
+                    missing.append(f"{table.name}({', '.join(foreign_key.column_keys)})")
+
+        assert not missing, f"Foreign keys without a supporting index: {missing}"
+
+    def test_token_hashes_fit_their_columns(self):
+        """Token digests are the 32 bytes the sessions check constraints require, hex text no longer"""
+        digest = hash_token("a.refresh.token")
+        assert isinstance(digest, bytes) and len(digest) == 32
+        assert digest == hash_token("a.refresh.token") != hash_token("an.access.token")
+
+        sessions = Base.metadata.tables["sessions"]
+        methods = {index.name: index.dialect_options["postgresql"]["using"] for index in sessions.indexes}
+        assert methods["ix_sessions_refresh_token_hash"] == methods["ix_sessions_access_token_hash"] == "hash"
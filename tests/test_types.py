@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.types import Tenths
+from app.domain.worklog import WorklogBase
+from app.models import ActivityTask, User, Worklog
+
+
+class TestTenths:
+    """Test the hours stored as tenths of an hour"""
+
+    def test_conversion(self):
+        tenths = Tenths()
+        dialect = postgresql.dialect()
+
+        assert [tenths.process_bind_param(value, dialect) for value in (1, 7.5, 2.25, 2.35, None)] == [
+            10,
+            75,
+            23,
+            24,
+            None,
+        ]
+        assert tenths.process_result_value(75, dialect) == 7.5
+        assert tenths.process_result_value(None, dialect) is None
+
+    def test_comparisons_are_bound_as_tenths(self):
+        stmt = select(Worklog.id).where(Worklog.duration > 2.5)
+        assert "worklogs.duration > 25" in str(stmt.compile(compile_kwargs={"literal_binds": True}))
+
+    @pytest.mark.asyncio
+    async def test_stored_as_integers(self, async_session: AsyncSession):
+        user = User(full_name="Tenths Tester", email="tenths-tester@example.com", hashed_password="-")
+        task = ActivityTask(title="Tenths task", user=user)
+        async_session.add_all([task, Worklog(date=date(2026, 3, 2), duration=2.5, activity_task=task, user=user)])
+        await async_session.flush()
+
+        stored = await async_session.scalar(text("SELECT duration FROM worklogs WHERE user_id = :id"), {"id": user.id})
+        assert stored == 25
+
+        total = await async_session.scalar(select(func.sum(Worklog.duration)).where(Worklog.user_id == user.id))
+        assert total == 2.5
+
+        result = await WorklogBase.set_cell(async_session, user.id, task.id, date(2026, 3, 2), 3.5)
+        assert (result.duration, result.day_total) == (3.5, 3.5)
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pytest
+from asyncpg.exceptions import DeadlockDetectedError
+from sqlalchemy.exc import DBAPIError
+
+from app.core.database.unit_of_work import UnitOfWork, in_unit_of_work
+
+
+class TestUnitOfWork:
+    """Test the commit and retry behaviour of the unit of work"""
+
+    @pytest.fixture
+    def session(self, mocker):
+        session = mocker.AsyncMock()
+        session.info = {}
+        return session
+
+    @pytest.mark.asyncio
+    async def test_nested_commits_once(self, session):
+        async with UnitOfWork(session):
+            async with UnitOfWork(session):
+                assert in_unit_of_work(session)
+            session.commit.assert_not_awaited()
+
+        assert not in_unit_of_work(session)
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_rollback_on_error(self, session):
+        with pytest.raises(ValueError):
+            async with UnitOfWork(session):
+                raise ValueError("failed")
+
+        session.commit.assert_not_awaited()
+        session.rollback.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_run_retries_deadlocks(self, session):
+        deadlock = DBAPIError("stmt", {}, SimpleNamespace(sqlstate=DeadlockDetectedError.sqlstate))
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            if len(calls) < 3:
+                raise deadlock
+            return "done"
+
+        result = await UnitOfWork(session, backoff_seconds=0).run(operation)
+
+        assert result == "done"
+        assert len(calls) == 3
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_run_gives_up_after_max_retries(self, session):
+        deadlock = DBAPIError("stmt", {}, SimpleNamespace(sqlstate=DeadlockDetectedError.sqlstate))
+
+        async def operation():
+            raise deadlock
+
+        with pytest.raises(DBAPIError):
+            await UnitOfWork(session, max_retries=2, backoff_seconds=0).run(operation)
+
+        assert session.rollback.await_count == 3
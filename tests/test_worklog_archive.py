@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import BadRequestException
+from app.domain.worklog import WorklogBase
+from app.domain.worklog_archive import WorklogArchiveBase
+from app.models import Activity, ActivityHoursMonthly, ActivityTask, ActivityType, User, Worklog, WorklogMonthlySummary
+
+MONTH = date(2003, 1, 1)
+
+
+class TestWorklogArchive:
+    """Test the archival of a month of worklogs and the reads of archived periods"""
+
+    @pytest_asyncio.fixture
+    async def task(self, async_session: AsyncSession):
+        await async_session.execute(select(func.create_worklog_partitions(MONTH, MONTH)))
+        user = User(full_name="Archive Tester", email="archive-tester@example.com", hashed_password="-")
+        activity = Activity(title="Archive", code="ARC-TEST", activity_type=ActivityType(title="Archive test"))
+        task = ActivityTask(title="Archived task", activity=activity, user=user)
+        async_session.add_all(
+            [
+                task,
+                Worklog(date=date(2003, 1, 6), duration=3, activity_task=task, user=user),
+                Worklog(date=date(2003, 1, 7), duration=4.5, activity_task=task, user=user),
+            ]
+        )
+        await async_session.flush()
+        return task
+
+    def test_horizon(self):
+        assert WorklogArchiveBase.horizon(date(2026, 10, 19)) == date(2024, 10, 1)
+        assert WorklogArchiveBase.horizon(date(2026, 1, 31)) == date(2024, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_archived_month_is_still_read(self, async_session: AsyncSession, task: ActivityTask):
+        user_id, task_id = task.user_id, task.id
+        hours = select(ActivityHoursMonthly.hours).where(
+            ActivityHoursMonthly.user_id == user_id, ActivityHoursMonthly.month == MONTH
+        )
+        assert await async_session.scalar(hours) == 7.5
+
+        assert await WorklogArchiveBase.archive_month(async_session, MONTH) == 2
+        assert await WorklogArchiveBase.archive_month(async_session, MONTH) is None
+        assert not await async_session.scalar(select(func.count()).where(Worklog.user_id == user_id))
+
+        summary = await async_session.get(WorklogMonthlySummary, (user_id, task_id, MONTH))
+        assert (summary.hours, summary.worklogs) == (7.5, 2)
+        assert await async_session.scalar(hours) == 7.5
+
+        columns = await WorklogBase.get_columns(async_session, [user_id], date(2002, 12, 30), date(2003, 1, 12))
+        assert sorted(zip(columns.offsets, columns.durations)) == [(7, 3.0), (8, 4.5)]
+
+        with pytest.raises(BadRequestException):
+            await WorklogBase.set_cell(async_session, user_id, task_id, date(2003, 1, 8), 2)
@@ -0,0 +1,130 @@
+import asyncio
+from datetime import date
+from typing import AsyncGenerator
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.database.url import DATABASE_URL
+from app.domain.worklog import WorklogBase
+from app.dto.activity import SetWorklogCellDto
+from app.models import ActivityTask, User, Worklog
+from app.redis_client import RedisClient
+from app.services.activity import ActivityService
+
+
+class TestSetWorklogCell:
+    """Test setting the hours of a single journal cell"""
+
+    @pytest_asyncio.fixture
+    async def other_session(self) -> AsyncGenerator[AsyncSession]:
+        """A second connection, writing concurrently with the session of the test"""
+        engine = create_async_engine(DATABASE_URL)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+        await engine.dispose()
+
+    async def _set(self, client: AsyncClient, task_id, duration, day: str = "2026-03-02"):
+        return await client.patch(f"/activity/task/{task_id}/worklog/{day}", json={"duration": duration})
+
+    async def _foreign_task(self, session: AsyncSession) -> ActivityTask:
+        """A task of another employee"""
+        user = User(full_name="Other Employee", email=f"other-{uuid4().hex[:8]}@example.com", hashed_password="-")
+        task = ActivityTask(title="Not yours", user=user)
+        session.add(task)
+        await session.flush()
+        return task
+
+    @pytest.mark.asyncio
+    async def test_insert_update_and_clear(self, employee_client: AsyncClient, employee: User):
+        design, review = (task.id for task in employee.tasks)
+
+        response = await self._set(employee_client, design, 2)
+        assert response.status_code == status.HTTP_200_OK
+        cell = response.json()["data"]
+        assert cell["id"] is not None
+        assert (cell["taskId"], cell["date"], cell["duration"], cell["dayTotal"]) == (str(design), "2026-03-02", 2, 2)
+
+        response = await self._set(employee_client, design, 3.5)
+        updated = response.json()["data"]
+        assert (updated["id"], updated["duration"], updated["dayTotal"]) == (cell["id"], 3.5, 3.5)
+
+        # the day total includes the other tasks of the day
+        response = await self._set(employee_client, review, 1.5)
+        assert response.json()["data"]["dayTotal"] == 5
+
+        response = await self._set(employee_client, design, None)
+        assert response.status_code == status.HTTP_200_OK
+        cleared = response.json()["data"]
+        assert (cleared["id"], cleared["duration"], cleared["dayTotal"]) == (None, None, 1.5)
+
+        # clearing an empty cell changes nothing
+        response = await self._set(employee_client, design, None)
+        assert response.json()["data"]["dayTotal"] == 1.5
+
+    @pytest.mark.asyncio
+    async def test_daily_limit(self, employee_client: AsyncClient, employee: User, async_session: AsyncSession):
+        user_id = employee.id
+        design, review = (task.id for task in employee.tasks)
+        await self._set(employee_client, design, 6)
+
+        response = await self._set(employee_client, review, 3)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        # the failed write is rolled back, expiring the employee
+        stmt = select(func.sum(Worklog.duration)).where(Worklog.user_id == user_id)
+        assert await async_session.scalar(stmt) == 6
+
+    @pytest.mark.asyncio
+    async def test_duration_out_of_range(self, employee_client: AsyncClient, employee: User):
+        response = await self._set(employee_client, employee.tasks[0].id, 9)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+    @pytest.mark.asyncio
+    async def test_unknown_or_foreign_task(self, employee_client: AsyncClient, async_session: AsyncSession):
+        response = await self._set(employee_client, uuid4(), 2)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        task = await self._foreign_task(async_session)
+        for duration in (2, None):
+            response = await self._set(employee_client, task.id, duration)
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.asyncio
+    async def test_set_cell_of_foreign_task(self, async_session: AsyncSession, employee: User):
+        task = await self._foreign_task(async_session)
+        async_session.add(Worklog(date=date(2026, 3, 2), duration=2, activity_task=task, user_id=task.user_id))
+        await async_session.flush()
+
+        for duration in (4, None):
+            assert await WorklogBase.set_cell(async_session, employee.id, task.id, date(2026, 3, 2), duration) is None
+
+        stmt = select(Worklog.duration).where(Worklog.activity_task_id == task.id)
+        assert (await async_session.scalars(stmt)).all() == [2]
+
+    @pytest.mark.asyncio
+    async def test_waits_for_other_writes_of_the_user(
+        self, async_session: AsyncSession, other_session: AsyncSession, employee: User, redis: RedisClient
+    ):
+        design, review = (task.id for task in employee.tasks)
+        # another tab of the employee is saving the same day
+        await WorklogBase.lock_user(async_session, employee.id)
+        async_session.add(Worklog(date=date(2026, 3, 2), duration=3, activity_task_id=design, user_id=employee.id))
+        await async_session.flush()
+
+        cell = asyncio.create_task(
+            ActivityService(other_session).set_worklog_cell(
+                review, date(2026, 3, 2), SetWorklogCellDto(duration=2), employee.id
+            )
+        )
+        await asyncio.sleep(0.3)
+        assert not cell.done()
+
+        await async_session.commit()
+        # the day total includes the hours saved by the other tab
+        assert (await cell).day_total == 5